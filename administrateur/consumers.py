@@ -0,0 +1,32 @@
+# administrateur/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from developpement.live import DASHBOARD_GROUP, compteurs
+
+
+class DashboardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Flux des événements d'inscription pour le tableau de bord.
+
+    À la connexion, un instantané des compteurs est envoyé ; ensuite seuls
+    les deltas publiés par ``developpement.live`` transitent.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not (user.is_authenticated and user.is_staff):
+            await self.close()
+            return
+        await self.channel_layer.group_add(DASHBOARD_GROUP, self.channel_name)
+        await self.accept()
+        await self.send_json({
+            "event": "instantane",
+            "compteurs": await database_sync_to_async(compteurs)(),
+        })
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(DASHBOARD_GROUP, self.channel_name)
+
+    async def dashboard_event(self, message):
+        await self.send_json({k: v for k, v in message.items() if k != "type"})
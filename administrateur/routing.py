@@ -0,0 +1,8 @@
+# administrateur/routing.py
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    path("ws/administrateur/dashboard/", consumers.DashboardConsumer.as_asgi()),
+]
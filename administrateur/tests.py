@@ -1,3 +1,102 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from PIL import Image
+
+from developpement.models import ImageActivite, Inscription, Presence
+from developpement.presences import MAX_JETONS, jeton
+from developpement.tests import CacheTestCase, creer_inscription
+
+
+class SelectionStatutTests(CacheTestCase):
+    url = "/administrateur/changer-statut-selection/"
+
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_user("admin", password="motdepasse", is_staff=True)
+        self.inscription = creer_inscription(1)
+        self.donnees = {"inscrits_ids": json.dumps([self.inscription.pk]), "statut": "V"}
+
+    def test_visiteur_anonyme_redirige(self):
+        response = self.client.post(self.url, self.donnees)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Inscription.objects.get(pk=self.inscription.pk).statut, "E")
+
+    def test_jeton_csrf_exige(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.admin)
+        for url in (self.url, "/administrateur/valider-selection/"):
+            self.assertEqual(client.post(url, self.donnees).status_code, 403)
+
+    def test_changement_par_un_administrateur(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(self.url, self.donnees)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(Inscription.objects.get(pk=self.inscription.pk).statut, "V")
+
+    def test_statut_inconnu(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(self.url, {**self.donnees, "statut": "X"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(THROTTLE_RATES={"upload": {"compte": "1/h"}})
+class AjouterActiviteTests(CacheTestCase):
+    url = "/administrateur/administrateur/activites/ajouter/"
+
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_user("admin", password="motdepasse", is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_debit_limite_par_utilisateur(self):
+        donnees = {"title": "Sortie", "description": "d", "category": "nature"}
+        self.assertNotEqual(self.client.post(self.url, donnees).status_code, 429)
+        self.assertEqual(self.client.post(self.url, donnees).status_code, 429)
+
+    def test_empreinte_calculee_a_la_reception(self):
+        contenu = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(contenu, "PNG")
+        image = SimpleUploadedFile("photo.png", contenu.getvalue())
+        donnees = {"title": "Sortie", "description": "d", "category": "nature", "images": [image]}
+        with self.settings(MEDIA_ROOT=tempfile.mkdtemp(prefix="institut-tests-")), \
+                mock.patch("administrateur.views.empreinte") as empreinte:
+            self.client.post(self.url, donnees)
+        empreinte.assert_not_called()
+        self.assertEqual(
+            ImageActivite.objects.get().sha256, hashlib.sha256(contenu.getvalue()).hexdigest()
+        )
+
+
+class PointerPresenceTests(CacheTestCase):
+    url = "/administrateur/presences/pointer/"
+
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_user("admin", password="motdepasse", is_staff=True)
+        self.client.force_login(self.admin)
+        self.inscription = creer_inscription(1, statut="V")
+
+    def envoyer(self, corps):
+        return self.client.post(self.url, json.dumps(corps), content_type="application/json")
+
+    def test_pointage(self):
+        response = self.envoyer({"jetons": [jeton(self.inscription)], "poste": "Porte A"})
+        self.assertEqual(response.json()["resultats"][0]["statut"], "present")
+        self.assertEqual(Presence.objects.get().pointe_par, self.admin)
+
+    def test_corps_json_qui_n_est_pas_un_objet(self):
+        for corps in ([jeton(self.inscription)], "texte", 3):
+            self.assertEqual(self.envoyer(corps).status_code, 400)
+
+    def test_lot_trop_grand_refuse(self):
+        response = self.envoyer({"jetons": [jeton(self.inscription)] * (MAX_JETONS + 1)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["max_jetons"], MAX_JETONS)
+        self.assertFalse(Presence.objects.exists())
@@ -18,6 +18,7 @@ urlpatterns = [
         name="supprimer_inscrit",
     ),
     path("inscrits/exporter/", views.exporter_inscrits, name="exporter_inscrits"),
+    path("inscrits/emargement/", views.feuilles_emargement, name="feuilles_emargement"),
     path(
         "inscrits/<int:pk>/envoyer-email/",
         views.envoyer_email_inscrit,
@@ -25,6 +26,11 @@ urlpatterns = [
     ),
     # Actions groupées
     path("valider-selection/", views.valider_selection, name="valider_selection"),
+    path(
+        "changer-statut-selection/",
+        views.changer_statut_selection,
+        name="changer_statut_selection",
+    ),
     path("supprimer-selection/", views.supprimer_selection, name="supprimer_selection"),
     # Emails
     path("envoyer-mail/", views.envoyer_mail, name="envoyer_mail"),
@@ -57,8 +63,20 @@ urlpatterns = [
         views.detail_activite,
         name="detail_activite",
     ),
+    path(
+        "administrateur/activites/<int:activite_id>/galerie/",
+        views.importer_galerie,
+        name="importer_galerie",
+    ),
+    path(
+        "administrateur/activites/<int:activite_id>/galerie/<str:import_id>/",
+        views.progression_galerie,
+        name="progression_galerie",
+    ),
     path("creer-compte-admin/", views.creer_compte_admin, name="creer_compte_admin"),
     path("generer-convocation/", views.generer_convocation, name="generer_convocation"),
+    path("presences/pointer/", views.pointer_presence, name="pointer_presence"),
+    path("presences/liste/", views.liste_presence_hors_ligne, name="liste_presence_hors_ligne"),
     path("modifier-document/", views.modifier_document, name="modifier_document"),
     path("gerer-documents/", views.gerer_documents, name="gerer_documents"),
     
@@ -1,6 +1,6 @@
 # administrateur/views.py
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
@@ -9,13 +9,16 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from django.utils.text import slugify
 from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.db.models import Q
+from django.urls import reverse
 
 import json
 import csv
@@ -39,8 +42,17 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 
 # Importations des modèles et formulaires
-from developpement.models import Inscription, Activite, ImageActivite, ConvocationExamen
-from developpement.forms import DocumentForm
+from developpement.models import Inscription, Activite, ImageActivite, ConvocationExamen, PlaceExamen
+from developpement.forms import DocumentForm, MultipleImageUploadForm
+from developpement.workflow import changer_statut, TransitionInvalide
+from developpement.decorators import limiter_debit, verifier_uploads
+from developpement.limitation import Surcharge
+from developpement.live import compteurs
+from developpement.galeries import empreinte, programmer_import, progression
+from developpement.presences import MAX_JETONS, jeton, liste_hors_ligne, pointer
+from developpement.pdf import STYLE_INFOS, qr_code, styles as styles_pdf
+from developpement.emargement import nom_archive, feuilles
+from developpement.uploads import MAX_UPLOAD_SIZE, TYPES_ARCHIVES, TYPES_DOCUMENTS, TYPES_IMAGES
 from .forms import ActiviteForm
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -49,6 +61,7 @@ from django.contrib.auth.models import User as CustomUser
 
 
 logger = logging.getLogger(__name__)
+mail_logger = logging.getLogger("institut.mail")
 
 # Fonctions utilitaires
 def is_administrateur(user):
@@ -56,6 +69,7 @@ def is_administrateur(user):
     return user.is_authenticated and user.is_staff
 
 # Vues d'authentification
+@limiter_debit("connexion", compte="username")
 def admin_login_page(request):
     """Page de login spécifique pour les administrateurs"""
     # Si l'utilisateur est déjà connecté et est staff, rediriger vers le dashboard
@@ -148,6 +162,12 @@ def creer_compte_admin(request):
                 )
                 return redirect("administrateur:admin_login_page")
 
+        except Surcharge:
+            # Compte créé, connexion refusée faute de capacité
+            messages.success(
+                request, "Compte créé avec succès. Veuillez vous connecter."
+            )
+            return redirect("admin_login_page")
         except Exception as e:
             messages.error(request, f"Erreur lors de la création du compte: {str(e)}")
             return redirect("administrateur:admin_login_page")
@@ -162,36 +182,32 @@ def creer_compte_admin(request):
 def dashboard(request):
     """Vue du tableau de bord administrateur"""
     try:
-        inscriptions = Inscription.objects.all()
-
-        # Statistiques
-        total_inscriptions = inscriptions.count() or 0
-        inscriptions_valides = inscriptions.filter(statut="V").count() or 0
-        inscriptions_attente = inscriptions.filter(statut="E").count() or 0
-        inscriptions_rejetees = inscriptions.filter(statut="R").count() or 0
+        # Les mises à jour arrivent ensuite par WebSocket (developpement.live)
+        stats = compteurs()
+        total_inscriptions = stats["total"]
+        inscriptions_valides = stats["statuts"].get("V", 0)
+        inscriptions_attente = stats["statuts"].get("E", 0)
+        inscriptions_rejetees = stats["statuts"].get("R", 0)
 
         # Inscriptions récentes (7 derniers jours)
         date_limite = timezone.now() - timedelta(days=7)
-        inscriptions_recentes = inscriptions.filter(date_inscription__gte=date_limite).count() or 0
+        inscriptions_recentes = Inscription.objects.filter(date_inscription__gte=date_limite).count()
 
         # Répartition par formation
-        formations_stats = []
-        formations_existantes = list(set([
-            inscrit.formation for inscrit in inscriptions 
-            if inscrit.formation and inscrit.formation.strip()
-        ]))
-
-        for formation_nom in formations_existantes:
-            count = inscriptions.filter(formation=formation_nom).count() or 0
-            if count > 0:
-                formations_stats.append({
-                    "nom": formation_nom,
-                    "count": count,
-                    "pourcentage": (count / total_inscriptions * 100) if total_inscriptions > 0 else 0,
-                })
+        formations_stats = [
+            {
+                "nom": formation_nom,
+                "count": count,
+                "pourcentage": (count / total_inscriptions * 100) if total_inscriptions > 0 else 0,
+            }
+            for formation_nom, count in sorted(stats["formations"].items())
+            if count > 0
+        ]
 
         # Dernières inscriptions
-        dernieres_inscriptions = inscriptions.order_by("-date_inscription")[:10]
+        dernieres_inscriptions = Inscription.objects.only(
+            "id", "nom", "prenom", "formation", "date_inscription", "statut"
+        ).order_by("-date_inscription")[:10]
 
         context = {
             "total_inscriptions": total_inscriptions,
@@ -222,49 +238,17 @@ def dashboard(request):
 @login_required
 @user_passes_test(is_administrateur, login_url='admin_login_page')
 def liste_inscrits(request):
-    """Vue pour afficher la liste des inscrits avec support AngularJS"""
+    """Vue pour afficher la liste des inscrits (mise à jour en direct par WebSocket)"""
     inscriptions = Inscription.objects.all()
-
-    # Compter les différents statuts
-    total_inscriptions = inscriptions.count()
-    inscriptions_valides = inscriptions.filter(statut="V")
-    inscriptions_attente = inscriptions.filter(statut="E")
-    inscriptions_rejetees = inscriptions.filter(statut="R")
-
-    # Extraire les formations uniques pour le filtre
-    formations_uniques = list(set([
-        inscrit.formation for inscrit in inscriptions 
-        if inscrit.formation and inscrit.formation.strip()
-    ]))
-
-    # Préparer les données pour le template
-    inscriptions_data = []
-    for inscrit in inscriptions:
-        inscriptions_data.append({
-            "id": inscrit.id,
-            "nom": inscrit.nom,
-            "prenom": inscrit.prenom,
-            "email": inscrit.email,
-            "telephone": inscrit.telephone or "Non renseigné",
-            "formation": inscrit.formation or "Non spécifiée",
-            "statut": inscrit.get_statut_display(),
-            "photo_identite": inscrit.photo_identite.url if inscrit.photo_identite else "",
-            "bac_scan": inscrit.bac_scan.url if inscrit.bac_scan else "",
-            "diplome_scan": inscrit.diplome_scan.url if inscrit.diplome_scan else "",
-            "extrait_naissance": inscrit.extrait_naissance.url if inscrit.extrait_naissance else "",
-            "cmu": inscrit.cmu or "Non renseigné",
-            "cni": inscrit.cni or "Non renseigné",
-            "selected": False,
-        })
+    stats = compteurs()
 
     context = {
         "inscriptions": inscriptions,
-        "total_inscriptions": total_inscriptions,
-        "inscriptions_valides": inscriptions_valides.count(),
-        "inscriptions_attente": inscriptions_attente.count(),
-        "inscriptions_rejetees": inscriptions_rejetees.count(),
-        "inscriptions_json": json.dumps(inscriptions_data),
-        "formations": sorted(formations_uniques),
+        "total_inscriptions": stats["total"],
+        "inscriptions_valides": stats["statuts"].get("V", 0),
+        "inscriptions_attente": stats["statuts"].get("E", 0),
+        "inscriptions_rejetees": stats["statuts"].get("R", 0),
+        "formations": sorted(stats["formations"]),
     }
 
     return render(request, "administrateur/liste_inscrits.html", context)
@@ -303,11 +287,9 @@ def inscrit_details(request, pk):
 @user_passes_test(is_administrateur, login_url='admin_login_page')
 def valider_inscrit(request, pk):
     """Valider une inscription"""
-    inscrit = get_object_or_404(Inscription, pk=pk)
+    inscrit = get_object_or_404(Inscription.objects.only("id", "nom", "prenom"), pk=pk)
     
-    if inscrit.statut == 'E':  # Seulement si en attente
-        inscrit.statut = 'V'
-        inscrit.save()
+    if changer_statut([inscrit.pk], "V", user=request.user):  # Seulement si en attente
         messages.success(request, f"Inscription de {inscrit.nom} {inscrit.prenom} validée avec succès!")
     else:
         messages.warning(request, "Cette inscription ne peut pas être validée.")
@@ -318,11 +300,9 @@ def valider_inscrit(request, pk):
 @user_passes_test(is_administrateur, login_url='admin_login_page')
 def rejeter_inscrit(request, pk):
     """Rejeter une inscription"""
-    inscrit = get_object_or_404(Inscription, pk=pk)
+    inscrit = get_object_or_404(Inscription.objects.only("id", "nom", "prenom"), pk=pk)
     
-    if inscrit.statut == 'E':  # Seulement si en attente
-        inscrit.statut = 'R'
-        inscrit.save()
+    if changer_statut([inscrit.pk], "R", user=request.user):  # Seulement si en attente
         messages.success(request, f"Inscription de {inscrit.nom} {inscrit.prenom} rejetée.")
     else:
         messages.warning(request, "Cette inscription ne peut pas être rejetée.")
@@ -379,6 +359,21 @@ def exporter_inscrits(request):
     
     return response
 
+@login_required
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+def feuilles_emargement(request):
+    """Listes d'émargement (PDF par formation et par salle) dans une archive ZIP"""
+    formations = request.GET.getlist('formation')
+    salle = request.GET.get('salle') or None
+    if not Inscription.objects.filter(statut='V', **({'formation__in': formations} if formations else {})).exists():
+        messages.warning(request, "Aucun candidat validé pour ces listes d'émargement.")
+        return redirect('liste_inscrits')
+
+    # Chaque feuille est envoyée dès qu'elle est prête
+    response = StreamingHttpResponse(feuilles(formations, salle), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{nom_archive(formations, salle)}"'
+    return response
+
 @login_required
 @user_passes_test(is_administrateur, login_url='admin_login_page')
 def envoyer_email_inscrit(request, pk):
@@ -400,39 +395,45 @@ def envoyer_email_inscrit(request, pk):
     return redirect('liste_inscrits')
 
 # Vues pour l'envoi d'emails
+@login_required
+@user_passes_test(is_administrateur, login_url='admin_login_page')
 @require_POST
-@csrf_exempt
 def valider_selection(request):
     """Valider une sélection d'inscrits"""
     try:
         inscrits_ids = json.loads(request.POST.get("inscrits_ids", "[]"))
-        inscriptions = Inscription.objects.filter(id__in=inscrits_ids)
-        count = inscriptions.update(statut="V")
+        # Seules les inscriptions en attente sont validées ; emails envoyés après commit
+        count = len(changer_statut(inscrits_ids, "V", user=request.user))
 
-        # Envoyer des emails de confirmation
-        for inscrit in inscriptions:
-            sujet = "Votre inscription a été validée"
-            message_html = render_to_string(
-                "emails/inscription_validee.html", {"inscrit": inscrit}
-            )
-            message_texte = strip_tags(message_html)
+        return JsonResponse(
+            {
+                "success": True,
+                "count": count,
+                "message": f"{count} inscrits validés avec succès",
+            }
+        )
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)})
 
-            send_mail(
-                sujet,
-                message_texte,
-                settings.DEFAULT_FROM_EMAIL,
-                [inscrit.email],
-                html_message=message_html,
-                fail_silently=True,
-            )
+@login_required
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+@require_POST
+def changer_statut_selection(request):
+    """Changer le statut d'une sélection d'inscrits (validation, rejet ou remise en attente)"""
+    try:
+        inscrits_ids = json.loads(request.POST.get("inscrits_ids", "[]"))
+        statut = request.POST.get("statut", "")
+        count = len(changer_statut(inscrits_ids, statut, user=request.user))
 
         return JsonResponse(
             {
                 "success": True,
                 "count": count,
-                "message": f"{count} inscrits validés avec succès",
+                "message": f"{count} inscrits mis à jour",
             }
         )
+    except TransitionInvalide as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
 
@@ -459,6 +460,10 @@ def supprimer_selection(request):
             send_mail(
                 sujet, message, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=True
             )
+        mail_logger.info(
+            "Notification de suppression envoyée",
+            extra={"view": "supprimer_selection", "count": len(emails)},
+        )
 
         return JsonResponse(
             {
@@ -470,6 +475,7 @@ def supprimer_selection(request):
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
 
+@limiter_debit("mail", compte="user", json=True)
 @require_POST
 @csrf_exempt
 def envoyer_mail(request):
@@ -540,8 +546,10 @@ def envoyer_mail(request):
             server.quit()
 
             # Logger l'envoi
-            logger.info(
-                f"Email envoyé à {len(emails)} destinataires: {', '.join(emails)}"
+            mail_logger.info(
+                "Email envoyé : %s",
+                sujet,
+                extra={"view": "envoyer_mail", "count": len(emails), "destinataires": emails},
             )
 
             return JsonResponse(
@@ -553,7 +561,11 @@ def envoyer_mail(request):
             )
 
         except smtplib.SMTPException as e:
-            logger.error(f"Erreur SMTP: {str(e)}")
+            mail_logger.error(
+                "Erreur SMTP : %s",
+                e,
+                extra={"view": "envoyer_mail", "count": len(emails), "destinataires": emails},
+            )
             return JsonResponse(
                 {"success": False, "error": f"Erreur d'envoi SMTP: {str(e)}"}
             )
@@ -592,38 +604,44 @@ def gestion_activites(request):
 
 @login_required
 @user_passes_test(is_administrateur, login_url='admin_login_page')
+@limiter_debit("upload", compte="user")
+@verifier_uploads(
+    {"images": TYPES_IMAGES, "archive": TYPES_ARCHIVES},
+    max_size={"images": MAX_UPLOAD_SIZE, "archive": settings.GALLERY_ZIP_MAX_SIZE},
+)
 def ajouter_activite(request):
     if request.method == 'POST':
         form = ActiviteForm(request.POST)
-        if form.is_valid():
-            activite = form.save(commit=False)
-            activite.created_by = request.user
-            activite.save()
-            
-            # Gestion des images multiples
-            images = request.FILES.getlist('images')
-            for image in images:
-                # Vérifier la taille du fichier (max 5MB)
-                if image.size > 5 * 1024 * 1024:
-                    messages.warning(request, f"L'image {image.name} est trop volumineuse (max 5MB).")
-                    continue
-                
-                # Vérifier le type de fichier
-                allowed_types = ['image/jpeg', 'image/png', 'image/gif']
-                if image.content_type not in allowed_types:
-                    messages.warning(request, f"Le format {image.content_type} n'est pas supporté.")
-                    continue
-                
-                # Créer l'instance ImageActivite
-                ImageActivite.objects.create(
-                    activite=activite,
-                    image=image,
-                    uploaded_by=request.user
-                )
-            
+        images_form = MultipleImageUploadForm(request.POST, request.FILES)
+        if form.is_valid() and images_form.is_valid():
+            with transaction.atomic():
+                activite = form.save(commit=False)
+                activite.created_by = request.user
+                activite.save()
+
+                # Type et taille déjà vérifiés à la réception : une seule insertion
+                # Empreinte comme pour l'import ZIP : doublons détectés ensuite.
+                # Déjà calculée à la réception par FichierVerifieUploadHandler
+                ImageActivite.objects.bulk_create([
+                    ImageActivite(
+                        activite=activite, image=image, uploaded_by=request.user,
+                        sha256=getattr(image, 'sha256', None) or empreinte(image),
+                    )
+                    for image in images_form.cleaned_data['images']
+                ])
+
+                archive = images_form.cleaned_data['archive']
+                if archive:
+                    import_id = programmer_import(activite, archive, request.user)
+
             messages.success(request, "L'activité a été ajoutée avec succès !")
+            if archive:
+                messages.info(request, "Import de la galerie en cours : suivez sa progression ci-dessous.")
+                return redirect(f"{reverse('detail_activite', args=[activite.id])}?import={import_id}")
             return redirect('liste_activites')
         else:
+            for erreur in images_form.errors.get('images', []):
+                messages.error(request, erreur)
             messages.error(request, "Veuillez corriger les erreurs ci-dessous.")
     else:
         form = ActiviteForm()
@@ -640,7 +658,41 @@ def liste_activites(request):
 @user_passes_test(is_administrateur, login_url='admin_login_page')
 def detail_activite(request, activite_id):
     activite = get_object_or_404(Activite, id=activite_id)
-    return render(request, 'administrateur/detail_activite.html', {'activite': activite})
+    return render(request, 'administrateur/detail_activite.html', {
+        'activite': activite,
+        'nombre_images': activite.images.count(),
+        'import_id': request.GET.get('import', ''),
+    })
+
+@login_required
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+@limiter_debit("upload", compte="user")
+@verifier_uploads({"archive": TYPES_ARCHIVES}, max_size=settings.GALLERY_ZIP_MAX_SIZE)
+@require_POST
+def importer_galerie(request, activite_id):
+    """Reçoit une archive ZIP de photos et programme son import en arrière-plan."""
+    activite = get_object_or_404(Activite, id=activite_id)
+    archive = request.FILES.get('archive')
+    if archive is None:
+        messages.error(request, "Veuillez choisir une archive ZIP.")
+        return redirect('detail_activite', activite_id=activite.id)
+    import_id = programmer_import(activite, archive, request.user)
+    if request.accepts('application/json') and not request.accepts('text/html'):
+        return JsonResponse({
+            'import': import_id,
+            'progression': reverse('progression_galerie', args=[activite.id, import_id]),
+        }, status=202)
+    messages.info(request, "Import de la galerie en cours : suivez sa progression ci-dessous.")
+    return redirect(f"{reverse('detail_activite', args=[activite.id])}?import={import_id}")
+
+@login_required
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+def progression_galerie(request, activite_id, import_id):
+    """État d'un import de galerie (interrogé par la page de l'activité)."""
+    etat = progression(import_id)
+    if etat is None or etat.get('activite') != activite_id:
+        return JsonResponse({'etat': 'inconnu'}, status=404)
+    return JsonResponse(etat)
 
 @login_required
 @user_passes_test(is_administrateur, login_url='admin_login_page')
@@ -678,11 +730,55 @@ def supprimer_image_activite(request, image_id):
     messages.success(request, "L'image a été supprimée avec succès!")
     return redirect("modifier_activite", activite_id=activite_id)
 
+# Pointage le jour de l'examen
+@login_required(login_url='admin_login_page')
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+@require_POST
+def pointer_presence(request):
+    """
+    Enregistre les QR codes lus à l'entrée. Corps JSON :
+    ``{"jetons": [...], "poste": "Porte A", "formation": "..."}`` (ou
+    ``"jeton"`` pour une seule lecture) ; un appareil resté hors ligne
+    envoie ses lectures en lot, chacune avec son heure (``pointe_le``).
+    """
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' else request.POST.dict()
+    except ValueError:
+        return JsonResponse({'error': 'JSON invalide'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Objet JSON attendu'}, status=400)
+    jetons = data.get('jetons') or ([data['jeton']] if data.get('jeton') else [])
+    if not isinstance(jetons, list) or not jetons:
+        return JsonResponse({'error': 'Aucun jeton'}, status=400)
+    if len(jetons) > MAX_JETONS:
+        # Rien n'est enregistré : l'appareil renvoie son lot en plusieurs fois
+        return JsonResponse(
+            {'error': f'Au plus {MAX_JETONS} jetons par envoi', 'max_jetons': MAX_JETONS}, status=400
+        )
+    resultats = pointer(
+        jetons, poste=str(data.get('poste') or ''), user=request.user,
+        formation=data.get('formation') or None,
+    )
+    return JsonResponse({'resultats': resultats})
+
+
+@login_required(login_url='admin_login_page')
+@user_passes_test(is_administrateur, login_url='admin_login_page')
+def liste_presence_hors_ligne(request):
+    """Liste signée des candidats attendus, pour les appareils de contrôle."""
+    formation = request.GET.get('formation', '')
+    if not ConvocationExamen.objects.filter(formation=formation).exists():
+        return JsonResponse({'error': 'Aucune convocation pour cette formation'}, status=404)
+    response = JsonResponse(liste_hors_ligne(formation), json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')})
+    response['Content-Disposition'] = f'attachment; filename="presences_{slugify(formation)}.json"'
+    return response
+
+
 # Vues pour la gestion des documents et convocations
 @login_required
 def generer_convocation(request):
     try:
-        inscription = Inscription.objects.get(user=request.user)
+        inscription = request.candidat.get_inscription()
     except Inscription.DoesNotExist:
         messages.error(request, "Aucune inscription trouvée.")
         return redirect('espace_candidat')
@@ -698,22 +794,10 @@ def generer_convocation(request):
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     elements = []
     
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-        alignment=1  # Centered
-    )
-    
-    normal_style = styles['BodyText']
-    bold_style = ParagraphStyle(
-        'BoldText',
-        parent=styles['BodyText'],
-        fontName='Helvetica-Bold'
-    )
+    # Styles (partagés, construits une seule fois)
+    title_style = styles_pdf()['titre']
+    normal_style = styles_pdf()['normal']
+    bold_style = styles_pdf()['gras']
     
     # Contenu du PDF
     elements.append(Paragraph("CONVOCATION AU CONCOURS D'ENTRÉE", title_style))
@@ -730,12 +814,7 @@ def generer_convocation(request):
     ]
     
     candidate_table = Table(candidate_info, colWidths=[60*mm, 100*mm])
-    candidate_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    candidate_table.setStyle(STYLE_INFOS)
     
     elements.append(candidate_table)
     elements.append(Spacer(1, 20))
@@ -744,22 +823,25 @@ def generer_convocation(request):
     elements.append(Paragraph("INFORMATIONS SUR L'EXAMEN", bold_style))
     elements.append(Spacer(1, 10))
     
+    # Place attribuée par la répartition (commande allocate_rooms)
+    place = PlaceExamen.objects.select_related('salle').filter(inscription=inscription).first()
     exam_info = [
         ["Date:", convocation_exam.date_examen.strftime("%d/%m/%Y")],
         ["Heure:", convocation_exam.heure_examen],
-        ["Lieu:", convocation_exam.lieu_examen],
-        ["Salle:", convocation_exam.salle or "À préciser"],
+        ["Lieu:", (place and place.salle.lieu) or convocation_exam.lieu_examen],
+        ["Salle:", place.salle.nom if place else convocation_exam.salle or "À préciser"],
     ]
+    if place:
+        exam_info.append(["Place:", f"N° {place.numero}"])
     
     exam_table = Table(exam_info, colWidths=[30*mm, 130*mm])
-    exam_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    exam_table.setStyle(STYLE_INFOS)
     
     elements.append(exam_table)
+    elements.append(Spacer(1, 10))
+
+    # QR code lu au contrôle d'accès (jeton signé, voir developpement.presences)
+    elements.append(qr_code(jeton(inscription), 35*mm))
     elements.append(Spacer(1, 20))
     
     # Instructions
@@ -792,6 +874,7 @@ def generer_convocation(request):
     return response
 
 @login_required
+@verifier_uploads(TYPES_DOCUMENTS, redirect_to="espace_candidat")
 def modifier_document(request):
     if request.method == 'POST':
         form = DocumentForm(request.POST, request.FILES)
@@ -800,7 +883,7 @@ def modifier_document(request):
             document_file = request.FILES['document_file']
             
             try:
-                inscription = Inscription.objects.get(user=request.user)
+                inscription = request.candidat.get_inscription()
                 
                 # Mise à jour du document selon le type
                 if document_type == 'photo_identite':
@@ -830,9 +913,10 @@ def modifier_document(request):
     return redirect('espace_candidat')
 
 @login_required
+@verifier_uploads(TYPES_DOCUMENTS, redirect_to="espace_candidat")
 def gerer_documents(request):
     try:
-        inscription = Inscription.objects.get(user=request.user)
+        inscription = request.candidat.get_inscription()
     except Inscription.DoesNotExist:
         messages.error(request, "Aucune inscription trouvée.")
         return redirect('espace_candidat')
@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import  TeamMember,Partenaire,Activite
+from .models import SalleExamen, PlaceExamen, Presence, DoublonSuspect
+from django.utils import timezone
 from .models import Expertise
 from django.utils.html import format_html
 from .models import Inscription
@@ -224,3 +226,58 @@ class InscriptionAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 admin.site.register(Inscription, InscriptionAdmin)
+
+
+@admin.register(SalleExamen)
+class SalleExamenAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'lieu', 'capacite', 'ordre', 'active')
+    list_editable = ('ordre', 'active')
+    search_fields = ('nom', 'lieu')
+
+
+@admin.register(PlaceExamen)
+class PlaceExamenAdmin(admin.ModelAdmin):
+    # Attribuées par la commande allocate_rooms
+    list_display = ('inscription', 'salle', 'numero', 'date_examen', 'heure_examen')
+    list_filter = ('salle', 'date_examen', 'inscription__formation')
+    search_fields = ('inscription__nom', 'inscription__prenom', 'inscription__email')
+    list_select_related = ('inscription', 'salle')
+    readonly_fields = ('updated_at',)
+    raw_id_fields = ('inscription',)
+
+
+@admin.register(Presence)
+class PresenceAdmin(admin.ModelAdmin):
+    list_display = ('inscription', 'pointe_le', 'poste', 'pointe_par')
+    list_filter = ('inscription__formation', 'poste')
+    search_fields = ('inscription__nom', 'inscription__prenom', 'inscription__email')
+    list_select_related = ('inscription', 'pointe_par')
+    raw_id_fields = ('inscription',)
+
+
+@admin.register(DoublonSuspect)
+class DoublonSuspectAdmin(admin.ModelAdmin):
+    # Paires détectées par la commande find_duplicates, les plus probables en tête
+    list_display = ('inscription', 'autre', 'score', 'motifs', 'statut', 'detecte_le')
+    list_filter = ('statut',)
+    search_fields = ('inscription__nom', 'inscription__prenom', 'autre__nom', 'autre__prenom')
+    list_select_related = ('inscription', 'autre')
+    readonly_fields = ('inscription', 'autre', 'score', 'motifs', 'detecte_le', 'examine_par', 'examine_le')
+    actions = ['marquer_doublons', 'marquer_distincts']
+
+    def _examiner(self, request, queryset, statut):
+        queryset.update(statut=statut, examine_par=request.user, examine_le=timezone.now())
+
+    @admin.action(description=_("Confirmer : même personne"))
+    def marquer_doublons(self, request, queryset):
+        self._examiner(request, queryset, 'D')
+
+    @admin.action(description=_("Personnes distinctes"))
+    def marquer_distincts(self, request, queryset):
+        self._examiner(request, queryset, 'N')
+
+    def save_model(self, request, obj, form, change):
+        if change and 'statut' in form.changed_data:
+            obj.examine_par = request.user
+            obj.examine_le = timezone.now()
+        super().save_model(request, obj, form, change)
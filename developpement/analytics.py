@@ -0,0 +1,146 @@
+# developpement/analytics.py
+"""
+Séries temporelles des inscriptions (par jour ou par semaine), éventuellement
+ventilées par formation, statut, sexe ou série du bac.
+
+Les comptages sont faits en SQL (``GROUP BY`` période, dimension). Une
+période close ne reçoit plus de nouvelles inscriptions (``date_inscription``
+est fixée à la création) : son résultat est mis en cache sans expiration et
+seule la période en cours est recalculée. Les modifications et suppressions
+d'inscriptions changent la version de l'espace de noms, ce qui invalide
+toutes les périodes d'un coup.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncDay, TruncWeek
+from django.utils import timezone
+
+from institut.cache import bump_namespace, namespace_version
+
+from .models import Inscription
+
+ANALYTICS_NAMESPACE = "analytics"
+ANALYTICS_KEY = "analytics:{version}:{granularite}:{dimension}:{periode}"
+
+GRANULARITES = {
+    "jour": (TruncDay, timedelta(days=1)),
+    "semaine": (TruncWeek, timedelta(weeks=1)),
+}
+DIMENSIONS = {
+    "formation": None,
+    "statut": dict(Inscription.VALIDATION_CHOICES),
+    "sexe": dict(Inscription.SEXE_CHOICES),
+    "serie_bac": dict(Inscription.SERIE_BAC_CHOICES),
+}
+PERIODES_DEFAUT = {"jour": 30, "semaine": 12}
+MAX_PERIODES = 400
+TOTAL = "total"
+
+
+def invalider_statistiques():
+    """À appeler quand une inscription existante change ou disparaît."""
+    return bump_namespace(ANALYTICS_NAMESPACE)
+
+
+def debut_periode(jour, granularite):
+    if granularite == "semaine":
+        return jour - timedelta(days=jour.weekday())
+    return jour
+
+
+def _minuit(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def _compter(granularite, dimension, debut, fin):
+    """``{periode: {valeur: n}}`` pour les périodes de ``[debut, fin[``."""
+    trunc, _pas = GRANULARITES[granularite]
+    champs = ["periode", dimension] if dimension else ["periode"]
+    lignes = (
+        Inscription.objects.filter(
+            date_inscription__gte=_minuit(debut), date_inscription__lt=_minuit(fin)
+        )
+        .order_by()
+        .annotate(periode=trunc("date_inscription", output_field=DateField()))
+        .values(*champs)
+        .annotate(n=Count("id"))
+        .values_list(*champs, "n")
+    )
+    comptes = {}
+    for ligne in lignes:
+        valeur = (ligne[1] or "") if dimension else TOTAL
+        comptes.setdefault(ligne[0], {})[valeur] = ligne[-1]
+    return comptes
+
+
+def series_inscriptions(granularite="jour", dimension=None, debut=None, fin=None):
+    """
+    Retourne ``periodes`` (dates de début), ``total`` et, si ``dimension`` est
+    fournie, ``series`` (``{valeur: [n par période]}``) avec leurs libellés.
+    """
+    if granularite not in GRANULARITES:
+        raise ValueError(f"Granularité inconnue : {granularite}")
+    if dimension and dimension not in DIMENSIONS:
+        raise ValueError(f"Dimension inconnue : {dimension}")
+    _trunc, pas = GRANULARITES[granularite]
+
+    aujourd_hui = timezone.localdate()
+    courante = debut_periode(aujourd_hui, granularite)
+    fin = debut_periode(fin or aujourd_hui, granularite)
+    if debut:
+        debut = debut_periode(debut, granularite)
+    else:
+        debut = fin - pas * (PERIODES_DEFAUT[granularite] - 1)
+    if debut > fin:
+        raise ValueError("La date de début doit précéder la date de fin")
+    nombre = (fin - debut) // pas + 1
+    if nombre > MAX_PERIODES:
+        raise ValueError(f"Au plus {MAX_PERIODES} périodes par requête")
+    periodes = [debut + pas * i for i in range(nombre)]
+
+    # Périodes closes : servies depuis le cache
+    version = namespace_version(ANALYTICS_NAMESPACE)
+    cles = {
+        periode: ANALYTICS_KEY.format(
+            version=version,
+            granularite=granularite,
+            dimension=dimension or TOTAL,
+            periode=periode.isoformat(),
+        )
+        for periode in periodes
+        if periode < courante
+    }
+    en_cache = cache.get_many(cles.values())
+    comptes = {periode: en_cache[cle] for periode, cle in cles.items() if cle in en_cache}
+
+    # Le reste (périodes closes absentes et période en cours) en une requête
+    manquantes = [periode for periode in periodes if periode not in comptes]
+    if manquantes:
+        calcules = _compter(granularite, dimension, manquantes[0], manquantes[-1] + pas)
+        for periode in manquantes:
+            comptes[periode] = calcules.get(periode, {})
+        cache.set_many(
+            {cles[periode]: comptes[periode] for periode in manquantes if periode in cles},
+            None,
+        )
+
+    resultat = {
+        "granularite": granularite,
+        "dimension": dimension,
+        "periodes": [periode.isoformat() for periode in periodes],
+        "total": [sum(comptes[periode].values()) for periode in periodes],
+    }
+    if dimension:
+        valeurs = sorted({valeur for compte in comptes.values() for valeur in compte})
+        resultat["series"] = {
+            valeur: [comptes[periode].get(valeur, 0) for periode in periodes]
+            for valeur in valeurs
+        }
+        libelles = DIMENSIONS[dimension]
+        resultat["libelles"] = {
+            valeur: libelles.get(valeur, valeur) if libelles else valeur
+            for valeur in valeurs
+        }
+    return resultat
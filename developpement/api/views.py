@@ -1,11 +1,144 @@
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, etag
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from ..analytics import series_inscriptions
+from ..catalog import get_catalog, catalog_etag
+from ..conditional import queryset_version, version_etag
 from ..models import TeamMember
 from ..serializers import TeamMemberSerializer
+from ..verifications import verifier_inscription
+
+CHAMPS_VERIFIES = (
+    "nom", "prenom", "date_naissance", "email", "email_confirmation", "telephone",
+    "cmu", "cni", "numero_bac", "annee_obtentionbac", "annee_obtentionlicence",
+)
 
 class TeamMemberDetailAPI(APIView):
     def get(self, request, pk):
         member = get_object_or_404(TeamMember, pk=pk)
         serializer = TeamMemberSerializer(member, context={"request": request})
         return Response(serializer.data)
+
+
+@method_decorator(cache_control(public=True, max_age=300), name="dispatch")
+@method_decorator(etag(catalog_etag), name="dispatch")
+class CatalogueAPIView(APIView):
+    """Catalogue des formations en lecture seule (servi depuis le cache)."""
+    permission_classes = [AllowAny]
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request):
+        catalog = get_catalog()
+        return Response({
+            "version": catalog["version"],
+            "formations": catalog["formations"],
+        })
+
+
+class TeamMemberCursorPagination(CursorPagination):
+    ordering = ("display_order", "id")
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+
+
+def _team_members_version(request):
+    # Mémorisé sur la requête : etag et last_modified partagent le même agrégat
+    if not hasattr(request, "_team_members_version"):
+        request._team_members_version = queryset_version(TeamMember.objects.all())
+    return request._team_members_version
+
+
+def team_members_etag(request, *args, **kwargs):
+    total, last = _team_members_version(request)
+    return version_etag("team", total, last, request.GET.urlencode())
+
+
+def team_members_last_modified(request, *args, **kwargs):
+    return _team_members_version(request)[1]
+
+
+@method_decorator(
+    condition(etag_func=team_members_etag, last_modified_func=team_members_last_modified),
+    name="dispatch",
+)
+@method_decorator(cache_control(public=True, max_age=0, must_revalidate=True), name="dispatch")
+class TeamMemberListAPIView(ListAPIView):
+    """Liste des membres, filtrable par ``category`` et ``expertise``."""
+    serializer_class = TeamMemberSerializer
+    pagination_class = TeamMemberCursorPagination
+
+    def get_queryset(self):
+        queryset = TeamMember.objects.prefetch_related("expertises")
+        category = self.request.query_params.get("category")
+        if category:
+            queryset = queryset.filter(category=category)
+        expertise = self.request.query_params.get("expertise")
+        if expertise:
+            if expertise.isdigit():
+                queryset = queryset.filter(expertises__id=expertise)
+            else:
+                queryset = queryset.filter(expertises__name__iexact=expertise)
+            queryset = queryset.distinct()
+        return queryset
+
+
+class InscriptionVerificationAPIView(APIView):
+    """
+    Pré-vérification des champs du formulaire d'inscription (clés uniques,
+    dates, téléphone) avant l'envoi des documents.
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "inscription_verification"
+    http_method_names = ["post", "options"]
+
+    def post(self, request):
+        data = {
+            champ: str(request.data.get(champ, ""))[:255]
+            for champ in CHAMPS_VERIFIES
+        }
+        erreurs = verifier_inscription(data)
+        return Response({"valide": not erreurs, "erreurs": erreurs})
+
+
+class InscriptionSeriesAPIView(APIView):
+    """
+    Nombre d'inscriptions par jour ou par semaine, éventuellement ventilé
+    (``?granularite=semaine&dimension=formation&debut=2025-01-06``).
+    """
+    permission_classes = [IsAdminUser]
+    http_method_names = ["get", "head", "options"]
+
+    def _date(self, nom):
+        valeur = self.request.query_params.get(nom)
+        if not valeur:
+            return None
+        try:
+            jour = parse_date(valeur)
+        except ValueError:
+            jour = None
+        if jour is None:
+            raise ValidationError({nom: "Date invalide (AAAA-MM-JJ attendu)"})
+        return jour
+
+    def get(self, request):
+        try:
+            series = series_inscriptions(
+                granularite=request.query_params.get("granularite", "jour"),
+                dimension=request.query_params.get("dimension") or None,
+                debut=self._date("debut"),
+                fin=self._date("fin"),
+            )
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+        return Response(series)
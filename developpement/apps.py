@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DeveloppementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'developpement'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .live import verifier_couche
+
+        verifier_couche()
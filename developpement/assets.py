@@ -0,0 +1,244 @@
+# developpement/assets.py
+"""
+Construction des bundles CSS/JS déclarés dans ``settings.ASSET_BUNDLES``.
+
+Chaque bundle concatène ses sources statiques, purge les sélecteurs CSS
+absents des templates (et des scripts du bundle), minifie le résultat et
+l'écrit dans ``settings.ASSETS_BUILD_DIR``. ``collectstatic`` se charge
+ensuite du hachage des noms et de la précompression gzip/Brotli.
+"""
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.utils import get_app_template_dirs
+
+BUNDLE_DIR = "bundles"
+MANIFEST_NAME = "manifest.json"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_LICENSE_RE = re.compile(r"/\*!.*?\*/", re.S)
+_CHARSET_RE = re.compile(r"@charset\s+[^;]+;")
+_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)")
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]+")
+_URL_RE = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+# Blocs conservés tels quels (pas de sélecteurs à purger à l'intérieur)
+_OPAQUE_AT_RULES = ("@font-face", "@keyframes", "@-webkit-keyframes", "@page", "@property")
+
+
+def bundle_path(name, kind):
+    """Chemin statique (relatif) d'un bundle construit."""
+    return posixpath.join(BUNDLE_DIR, f"{name}.{kind}")
+
+
+def collect_used_tokens(extra_texts=()):
+    """Tous les mots présents dans les templates et les scripts fournis."""
+    tokens = set()
+    template_dirs = list(get_app_template_dirs("templates"))
+    for config in settings.TEMPLATES:
+        template_dirs.extend(Path(d) for d in config.get("DIRS", []))
+    for directory in template_dirs:
+        for root, _dirs, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith((".html", ".txt", ".js")):
+                    with open(os.path.join(root, filename), encoding="utf-8", errors="ignore") as fh:
+                        tokens.update(_TOKEN_RE.findall(fh.read()))
+    for text in extra_texts:
+        tokens.update(_TOKEN_RE.findall(text))
+    return tokens
+
+
+def _split_top_level(text, separator=","):
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _find_block_end(css, start):
+    """Index de l'accolade fermante correspondant à ``css[start] == '{'``."""
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == "{":
+            depth += 1
+        elif css[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(css) - 1
+
+
+def safelist_patterns():
+    """Motifs de classes jamais purgées (``settings.ASSET_PURGE_SAFELIST``)."""
+    return [re.compile(pattern) for pattern in getattr(settings, "ASSET_PURGE_SAFELIST", ())]
+
+
+def _is_used(cls, used_tokens, safelist):
+    return cls in used_tokens or any(pattern.match(cls) for pattern in safelist)
+
+
+def purge_css(css, used_tokens, safelist=()):
+    """Supprime les règles dont aucun sélecteur n'utilise de classe connue."""
+    output = []
+    position = 0
+    length = len(css)
+    while position < length:
+        brace = css.find("{", position)
+        semicolon = css.find(";", position)
+        if brace == -1:
+            break
+        # Règle sans bloc (@charset, @import...)
+        if semicolon != -1 and semicolon < brace and css[position:semicolon].strip().startswith("@"):
+            output.append(css[position:semicolon + 1].strip())
+            position = semicolon + 1
+            continue
+        prelude = css[position:brace].strip()
+        end = _find_block_end(css, brace)
+        body = css[brace + 1:end]
+        position = end + 1
+
+        if prelude.startswith("@"):
+            if prelude.startswith(_OPAQUE_AT_RULES):
+                output.append(f"{prelude}{{{body}}}")
+            else:
+                inner = purge_css(body, used_tokens, safelist)
+                if inner:
+                    output.append(f"{prelude}{{{inner}}}")
+            continue
+
+        kept = [
+            selector.strip()
+            for selector in _split_top_level(prelude)
+            if all(_is_used(cls, used_tokens, safelist) for cls in _CLASS_RE.findall(selector))
+        ]
+        if kept:
+            output.append(f"{','.join(kept)}{{{body.strip()}}}")
+    return "".join(output)
+
+
+def missing_classes(source_css, built_css, required):
+    """Classes ``required`` définies dans les sources mais absentes du bundle."""
+    defined = set(_CLASS_RE.findall(_COMMENT_RE.sub("", source_css)))
+    built = set(_CLASS_RE.findall(built_css))
+    return sorted(cls for cls in required if cls in defined and cls not in built)
+
+
+def minify_css(css):
+    css = _COMMENT_RE.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    # Les sources sont déjà minifiées : on retire seulement les sourcemaps
+    return re.sub(r"^//# sourceMappingURL=.*$", "", js, flags=re.M).strip()
+
+
+def _rebase_urls(css, source_path, output_path):
+    """Réécrit les ``url()`` relatives par rapport à l'emplacement du bundle."""
+    source_dir = posixpath.dirname(source_path)
+    output_dir = posixpath.dirname(output_path)
+
+    def replace(match):
+        url = match.group(2)
+        if url.startswith(("data:", "http:", "https:", "/", "#")):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(source_dir, url))
+        return f'url("{posixpath.relpath(target, output_dir)}")'
+
+    return _URL_RE.sub(replace, css)
+
+
+def _read_static(path):
+    absolute = finders.find(path)
+    if not absolute:
+        raise FileNotFoundError(f"Fichier statique introuvable : {path}")
+    with open(absolute, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def build_bundles(bundles=None, purge=True):
+    """Construit tous les bundles et retourne le manifeste écrit sur disque."""
+    bundles = bundles if bundles is not None else settings.ASSET_BUNDLES
+    build_dir = Path(settings.ASSETS_BUILD_DIR)
+    (build_dir / BUNDLE_DIR).mkdir(parents=True, exist_ok=True)
+
+    sources = {
+        name: {kind: [(path, _read_static(path)) for path in paths] for kind, paths in spec.items()}
+        for name, spec in bundles.items()
+    }
+    used_tokens = None
+    safelist = safelist_patterns()
+    if purge:
+        scripts = [text for spec in sources.values() for path, text in spec.get("js", [])]
+        used_tokens = collect_used_tokens(scripts)
+
+    manifest = {}
+    for name, spec in sources.items():
+        manifest[name] = {}
+        for kind, files in spec.items():
+            output_path = bundle_path(name, kind)
+            if kind == "css":
+                chunks = []
+                for path, text in files:
+                    # Les licences sont conservées en tête, hors de la purge
+                    chunks.extend(_LICENSE_RE.findall(text))
+                    text = _CHARSET_RE.sub("", _COMMENT_RE.sub("", text))
+                    text = _rebase_urls(text, path, output_path)
+                    if used_tokens is not None:
+                        text = purge_css(text, used_tokens, safelist)
+                    chunks.append(minify_css(text))
+                content = "\n".join(chunks)
+                # Classes construites au rendu (alert-{{ message.tags }}...)
+                missing = missing_classes(
+                    "".join(text for _path, text in files), content,
+                    getattr(settings, "ASSET_REQUIRED_CLASSES", ()),
+                )
+                if missing:
+                    raise ValueError(f"Bundle {name} : classes indispensables purgées : {', '.join(missing)}")
+            else:
+                content = ";\n".join(minify_js(text) for path, text in files)
+            (build_dir / output_path).write_text(content, encoding="utf-8")
+            manifest[name][kind] = {
+                "path": output_path,
+                "sources": [path for path, _text in files],
+                "size": len(content.encode("utf-8")),
+                "source_size": sum(len(text.encode("utf-8")) for _path, text in files),
+            }
+
+    (build_dir / BUNDLE_DIR / MANIFEST_NAME).write_text(
+        json.dumps(manifest, indent=2), encoding="utf-8"
+    )
+    return manifest
+
+
+_manifest_cache = {"mtime": None, "data": {}}
+
+
+def load_manifest():
+    """Manifeste des bundles, relu uniquement lorsqu'il change sur disque."""
+    path = Path(settings.ASSETS_BUILD_DIR) / BUNDLE_DIR / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {}
+    if mtime != _manifest_cache["mtime"]:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                _manifest_cache["data"] = json.load(fh)
+        except (OSError, ValueError):
+            _manifest_cache["data"] = {}
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["data"]
@@ -0,0 +1,131 @@
+# developpement/async_views.py
+"""
+Versions asynchrones des pages publiques en lecture seule.
+
+Servies sous ASGI (daphne) lorsque ``settings.ASYNC_PUBLIC_VIEWS`` est actif :
+les requêtes indépendantes sont lancées en parallèle et aucun worker n'est
+bloqué pendant les accès à la base. Le rendu des templates, synchrone,
+passe par ``sync_to_async``.
+"""
+import asyncio
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+
+from .catalog import get_catalog, get_catalog_version
+from .conditional import aactivites_version, ahome_version, apage_version
+from .decorators import conditional_page
+from .equipe import membres_carte, profil_membre
+from .models import Activite, Partenaire
+from .views import IMAGES_AND_SLOGANS, PAGE_CONFIG
+
+arender = sync_to_async(render)
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _formation_context(request):
+    catalog, version = await asyncio.gather(
+        sync_to_async(get_catalog)(), sync_to_async(get_catalog_version)()
+    )
+    return {"formations": catalog["formations"], "catalog_version": version}
+
+
+async def _activite_context(request):
+    activities = await _alist(
+        Activite.objects.prefetch_related("images").order_by("-date")
+    )
+    return {"activities": activities}
+
+
+async def _presentation_context(request):
+    inscription = await sync_to_async(lambda: request.candidat.inscription)()
+    return {"inscription": inscription, "year": datetime.now().year}
+
+
+ASYNC_CONTEXT = {
+    "formation": _formation_context,
+    "activite": _activite_context,
+    "presentation": _presentation_context,
+}
+
+
+@conditional_page(apage_version)
+async def page_view(request, page_name):
+    config = PAGE_CONFIG.get(page_name)
+    if not config:
+        raise Http404("Page introuvable")
+
+    context = {"title": config.get("title", page_name)}
+    if page_name in ASYNC_CONTEXT:
+        context.update(await ASYNC_CONTEXT[page_name](request))
+
+    return await arender(request, config["template"], context)
+
+
+@conditional_page(ahome_version)
+async def home(request):
+    """Page d'accueil : membres et partenaires chargés en parallèle."""
+    team_members, partenaires = await asyncio.gather(
+        _alist(membres_carte()),
+        _alist(Partenaire.objects.all()),
+    )
+    return await arender(request, "acceuil/accueil.html", {
+        "images_and_slogans": IMAGES_AND_SLOGANS,
+        "team_members": team_members,
+        "partenaires": partenaires,
+    })
+
+
+@conditional_page(aactivites_version)
+async def activite(request):
+    """Liste des activités avec affichage par date décroissante."""
+    activities = await _alist(
+        Activite.objects.prefetch_related("images").order_by("-created_at")
+    )
+    return await arender(request, "acceuil/activite.html", {
+        "title": "Activités",
+        "activities": activities,
+    })
+
+
+@conditional_page(aactivites_version)
+async def activite_detail(request, id):
+    """Détail d'une activité avec navigation précédente/suivante."""
+    try:
+        activity = await Activite.objects.prefetch_related("images").aget(id=id)
+    except Activite.DoesNotExist:
+        raise Http404("Activité introuvable")
+
+    if activity.date is not None:
+        previous_qs = Activite.objects.filter(date__lt=activity.date).order_by("-date")
+        next_qs = Activite.objects.filter(date__gt=activity.date).order_by("date")
+    else:
+        previous_qs = Activite.objects.filter(id__lt=activity.id).order_by("-id")
+        next_qs = Activite.objects.filter(id__gt=activity.id).order_by("id")
+    previous_activity, next_activity = await asyncio.gather(
+        previous_qs.afirst(), next_qs.afirst()
+    )
+
+    return await arender(request, "acceuil/activity_detail.html", {
+        "activity": activity,
+        "prev_activity": previous_activity,
+        "next_activity": next_activity,
+    })
+
+
+async def team_member_detail(request, slug):
+    """Équivalent asynchrone de ``TeamMemberAPIView`` (profil servi depuis le cache)."""
+    if request.method not in ("GET", "HEAD"):
+        return JsonResponse({"detail": "Méthode non autorisée."}, status=405)
+    profil = await sync_to_async(profil_membre)(request, slug)
+    if profil is None:
+        return JsonResponse({"detail": "Non trouvé."}, status=404)
+    response = JsonResponse(profil)
+    patch_cache_control(response, public=True, max_age=300)
+    return response
@@ -0,0 +1,165 @@
+# developpement/authentification.py
+"""
+Authentification : recherche indexée par email, hachage réglable et
+vérification des mots de passe dans un pool de threads borné.
+
+- ``EmailBackend`` retrouve le compte par ``LOWER(email)`` (index
+  fonctionnel) puis vérifie le mot de passe ; ``UsernameBackend`` fait de
+  même pour les connexions par identifiant (administrateurs).
+- Le hacheur préféré et son coût se règlent dans les settings
+  (``PASSWORD_HASHER``, ``PBKDF2_ITERATIONS``, ``ARGON2_*``). Un mot de
+  passe haché avec un autre algorithme ou un autre coût est re-haché à la
+  connexion suivante.
+- Le calcul (PBKDF2 ou Argon2 libèrent le GIL) s'exécute dans un pool de
+  ``PASSWORD_HASH_WORKERS`` threads : le nombre de hachages simultanés par
+  processus est borné, et au-delà de ``PASSWORD_HASH_QUEUE`` vérifications
+  en attente, la connexion est refusée (``Surcharge``) au lieu d'occuper
+  un worker de plus.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    make_password,
+    verify_password,
+)
+from django.db.models.functions import Lower
+
+from .limitation import Surcharge
+
+UserModel = get_user_model()
+
+# Vérifications proposées au pool au plus : plusieurs comptes partageant
+# un email restent possibles (le champ n'est pas unique)
+MAX_COMPTES_PAR_EMAIL = 5
+
+
+# Hacheurs
+
+class PBKDF2ReglableHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256, nombre d'itérations lu dans ``settings.PBKDF2_ITERATIONS``."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
+
+
+class Argon2ReglableHasher(Argon2PasswordHasher):
+    """Argon2id, coûts lus dans ``settings.ARGON2_*`` (nécessite argon2-cffi)."""
+
+    @property
+    def time_cost(self):
+        return getattr(settings, "ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism)
+
+
+# Pool de hachage
+
+class _Pool:
+    def __init__(self):
+        self._pid = None
+        self._verrou = threading.Lock()
+
+    def _demarrer(self):
+        # Un pool par processus : recréé après un fork (workers gunicorn)
+        with self._verrou:
+            if self._pid != os.getpid():
+                workers = getattr(settings, "PASSWORD_HASH_WORKERS", 0) or os.cpu_count() or 2
+                attente = getattr(settings, "PASSWORD_HASH_QUEUE", 32)
+                self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hachage")
+                self.places = threading.BoundedSemaphore(workers + attente)
+                self._pid = os.getpid()
+
+    def executer(self, fonction, *args):
+        if self._pid != os.getpid():
+            self._demarrer()
+        if not self.places.acquire(blocking=False):
+            raise Surcharge("Trop de connexions en cours de vérification", retry_after=2)
+        try:
+            return self.executor.submit(fonction, *args).result()
+        finally:
+            self.places.release()
+
+
+pool = _Pool()
+
+
+def _verifier(password, encoded):
+    """``(correct, nouveau hachage ou None)``, exécuté dans le pool."""
+    correct, a_mettre_a_jour = verify_password(password, encoded)
+    if correct and a_mettre_a_jour:
+        return True, make_password(password)
+    return correct, None
+
+
+def verifier_mot_de_passe(user, password):
+    """Vérifie le mot de passe dans le pool et re-hache si nécessaire."""
+    correct, nouveau = pool.executer(_verifier, password, user.password)
+    if nouveau:
+        # Algorithme ou coût changé : mise à jour transparente
+        user.password = nouveau
+        user.save(update_fields=["password"])
+    return correct
+
+
+def _hachage_factice(password):
+    # Compte inconnu : même coût qu'une vraie vérification (pas
+    # d'énumération des comptes par le temps de réponse)
+    pool.executer(make_password, password)
+
+
+def normaliser_email(email):
+    return email.strip().lower()
+
+
+# Backends
+
+class EmailBackend(ModelBackend):
+    """``authenticate(request, email=..., password=...)``, insensible à la casse."""
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        comptes = list(
+            UserModel._default_manager.annotate(email_normalise=Lower("email"))
+            .filter(email_normalise=normaliser_email(email))
+            .order_by("pk")[:MAX_COMPTES_PAR_EMAIL]
+        )
+        if not comptes:
+            _hachage_factice(password)
+            return None
+        for user in comptes:
+            if verifier_mot_de_passe(user, password) and self.user_can_authenticate(user):
+                return user
+        return None
+
+
+class UsernameBackend(ModelBackend):
+    """``ModelBackend`` dont la vérification passe par le pool de hachage."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            _hachage_factice(password)
+            return None
+        if verifier_mot_de_passe(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
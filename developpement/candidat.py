@@ -0,0 +1,125 @@
+# developpement/candidat.py
+"""
+Contexte candidat partagé par toutes les vues de l'espace candidat.
+
+``CandidatContextMiddleware`` attache ``request.candidat`` ; rien n'est chargé
+tant qu'un attribut n'est pas lu. Chaque valeur est mémorisée pour la requête
+et mise en cache quelques instants par utilisateur.
+"""
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from institut.cache import bump_namespace, namespace_version
+
+from .catalog import get_catalog_version
+from .models import Inscription, Formation, ProgrammeFormation, MarquettePedagogique
+
+CANDIDAT_CACHE_TIMEOUT = 60
+CANDIDAT_NAMESPACE = "candidat"
+
+
+def candidat_cache_key(user_id):
+    return candidat_cache_keys([user_id])[0]
+
+
+def candidat_cache_keys(user_ids):
+    # Versions lues une seule fois pour tout le lot
+    version, catalogue = namespace_version(CANDIDAT_NAMESPACE), get_catalog_version()
+    return [f"candidat:{version}:{user_id}:{catalogue}" for user_id in user_ids]
+
+
+def invalider_candidat(user_id):
+    cache.delete(candidat_cache_key(user_id))
+
+
+def invalider_candidats():
+    """Invalide le contexte de tous les candidats (import en masse...)."""
+    bump_namespace(CANDIDAT_NAMESPACE)
+
+
+class CandidatContext:
+    """Inscription, formation, programme et maquette du candidat connecté."""
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def _user(self):
+        user = self._request.user
+        return user if user.is_authenticated else None
+
+    @cached_property
+    def _values(self):
+        if self._user is None:
+            return {}
+        return cache.get(candidat_cache_key(self._user.pk)) or {}
+
+    def _get(self, name, loader):
+        if name not in self._values:
+            self._values[name] = loader()
+            if self._user is not None:
+                cache.set(
+                    candidat_cache_key(self._user.pk),
+                    self._values,
+                    CANDIDAT_CACHE_TIMEOUT,
+                )
+        return self._values[name]
+
+    def _load_inscription(self):
+        if self._user is None:
+            return None
+        try:
+            return Inscription.objects.get(user=self._user)
+        except Inscription.DoesNotExist:
+            return None
+
+    def _load_programme(self):
+        if self.inscription is None:
+            return None
+        return (
+            ProgrammeFormation.objects.select_related("formation")
+            .filter(formation__nom=self.inscription.formation)
+            .first()
+        )
+
+    def _load_maquette(self):
+        if self.inscription is None:
+            return None
+        return (
+            MarquettePedagogique.objects.select_related("formation")
+            .filter(formation__nom=self.inscription.formation)
+            .first()
+        )
+
+    def _load_formation(self):
+        if self.inscription is None:
+            return None
+        # Réutilise la formation jointe au programme ou à la maquette si déjà chargés
+        for related in ("programme", "maquette"):
+            obj = self._values.get(related)
+            if obj is not None:
+                return obj.formation
+        return Formation.objects.filter(nom=self.inscription.formation).first()
+
+    @property
+    def inscription(self):
+        return self._get("inscription", self._load_inscription)
+
+    @property
+    def formation(self):
+        return self._get("formation", self._load_formation)
+
+    @property
+    def programme(self):
+        return self._get("programme", self._load_programme)
+
+    @property
+    def maquette(self):
+        return self._get("maquette", self._load_maquette)
+
+    def get_inscription(self):
+        """Comme ``inscription`` mais lève ``Inscription.DoesNotExist`` si absente."""
+        inscription = self.inscription
+        if inscription is None:
+            raise Inscription.DoesNotExist("Aucune inscription pour cet utilisateur")
+        return inscription
@@ -0,0 +1,115 @@
+# developpement/catalog.py
+"""
+Catalogue des formations mis en cache.
+
+L'arbre Formation → UE → ECUE, avec les programmes, modules et maquettes,
+est construit une seule fois sous forme de dictionnaires simples, puis servi
+depuis le cache tant que la version du catalogue ne change pas. La version
+est incrémentée par les signaux (voir ``developpement.signals``).
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from institut.cache import bump_namespace, namespace_version
+
+from .models import Formation, UE, ProgrammeFormation
+
+CATALOG_NAMESPACE = "catalog"
+CATALOG_KEY = "catalog:tree:{version}"
+
+
+def get_catalog_version():
+    """Version courante du catalogue (initialisée à 1)."""
+    return namespace_version(CATALOG_NAMESPACE)
+
+
+def bump_catalog_version():
+    """Invalide le catalogue en incrémentant sa version."""
+    return bump_namespace(CATALOG_NAMESPACE)
+
+
+def _serialize_formation(formation):
+    return {
+        "id": formation.id,
+        "nom": formation.nom,
+        "duree": formation.duree,
+        "cout": str(formation.cout),
+        "ues": [
+            {
+                "id": ue.id,
+                "nom": ue.nom,
+                "code": ue.code,
+                "ecues": [
+                    {"id": ecue.id, "nom": ecue.nom, "code": ecue.code}
+                    for ecue in ue.ecues.all()
+                ],
+            }
+            for ue in formation.ues.all()
+        ],
+        "programmes": [
+            {
+                "id": programme.id,
+                "duree_totale": programme.duree_totale,
+                "date_debut": programme.date_debut,
+                "date_fin": programme.date_fin,
+                "nombre_modules": programme.nombre_modules,
+                "modules": [
+                    {
+                        "id": module.id,
+                        "nom": module.nom,
+                        "duree_heures": module.duree_heures,
+                        "formateur": module.formateur,
+                    }
+                    for module in programme.modules.all()
+                ],
+            }
+            for programme in formation.programmes.all()
+        ],
+        "maquettes": [
+            {
+                "id": maquette.id,
+                "version": maquette.version,
+                "annee_academique": maquette.annee_academique,
+                "credits_ects": maquette.credits_ects,
+                "fichier": maquette.fichier.url if maquette.fichier else None,
+            }
+            for maquette in formation.maquettes.all()
+        ],
+    }
+
+
+def build_catalog(version):
+    """Construit le catalogue complet (quelques requêtes, une seule fois)."""
+    formations = Formation.objects.order_by("nom").prefetch_related(
+        Prefetch("ues", queryset=UE.objects.prefetch_related("ecues")),
+        Prefetch(
+            "programmes",
+            queryset=ProgrammeFormation.objects.prefetch_related("modules"),
+        ),
+        "maquettes",
+    )
+    data = [_serialize_formation(formation) for formation in formations]
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return {
+        "version": version,
+        "etag": hashlib.md5(payload.encode("utf-8")).hexdigest(),
+        "formations": json.loads(payload),
+    }
+
+
+def get_catalog():
+    """Retourne le catalogue depuis le cache, en le reconstruisant si besoin."""
+    version = get_catalog_version()
+    # Un seul processus reconstruit le catalogue, les autres attendent
+    return cache.get_or_set(
+        CATALOG_KEY.format(version=version), lambda: build_catalog(version), None
+    )
+
+
+def catalog_etag(request, *args, **kwargs):
+    """Fonction ETag pour ``django.views.decorators.http.etag``."""
+    return get_catalog()["etag"]
@@ -0,0 +1,106 @@
+# developpement/conditional.py
+"""
+Validateurs HTTP (ETag / Last-Modified) calculés à partir des modèles.
+
+Une « version » est obtenue par une seule requête d'agrégat
+(``count()`` + ``max(updated_at)``) ; elle suffit pour répondre 304 sans
+exécuter la vue.
+"""
+import asyncio
+import hashlib
+import os
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.template.utils import get_app_template_dirs
+
+from .catalog import get_catalog
+from .models import Activite, ImageActivite, TeamMember, Partenaire
+
+
+def queryset_version(queryset, field="updated_at"):
+    """Retourne ``(nombre, dernière modification)`` pour un queryset."""
+    result = queryset.order_by().aggregate(total=Count("pk"), last=Max(field))
+    return result["total"], result["last"]
+
+
+async def aqueryset_version(queryset, field="updated_at"):
+    """Version asynchrone de ``queryset_version``."""
+    result = await queryset.order_by().aaggregate(total=Count("pk"), last=Max(field))
+    return result["total"], result["last"]
+
+
+def version_etag(*parts):
+    """Construit une valeur d'ETag stable à partir de plusieurs composants."""
+    raw = ":".join(str(part) for part in parts)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def _templates_mtime():
+    latest = 0
+    for directory in get_app_template_dirs("templates"):
+        for root, _dirs, files in os.walk(directory):
+            for filename in files:
+                latest = max(latest, os.path.getmtime(os.path.join(root, filename)))
+    return str(int(latest))
+
+
+# Identifiant du déploiement, identique pour tous les workers : la modification
+# d'un template invalide les pages purement statiques
+DEPLOY_VERSION = os.getenv("DEPLOY_VERSION") or _templates_mtime()
+
+
+def _latest(*dates):
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def activites_version(request, *args, **kwargs):
+    activites = queryset_version(Activite.objects.all())
+    images = queryset_version(ImageActivite.objects.all(), field="uploaded_at")
+    return (activites, images), _latest(activites[1], images[1])
+
+
+def home_version(request, *args, **kwargs):
+    members = queryset_version(TeamMember.objects.all())
+    partenaires = queryset_version(Partenaire.objects.all())
+    return (DEPLOY_VERSION, members, partenaires), _latest(members[1], partenaires[1])
+
+
+def page_version(request, page_name, *args, **kwargs):
+    """Version des pages servies par ``page_view`` (None = pas de validateurs)."""
+    if page_name == "formation":
+        return (DEPLOY_VERSION, get_catalog()["etag"]), None
+    if page_name == "activite":
+        return activites_version(request)
+    if page_name in ("contact", "travaux", "inscription"):
+        return (DEPLOY_VERSION,), None
+    # « presentation » dépend de l'inscription du candidat : pas de cache
+    return None
+
+
+# Équivalents asynchrones, utilisés par ``developpement.async_views``
+
+async def aactivites_version(request, *args, **kwargs):
+    activites, images = await asyncio.gather(
+        aqueryset_version(Activite.objects.all()),
+        aqueryset_version(ImageActivite.objects.all(), field="uploaded_at"),
+    )
+    return (activites, images), _latest(activites[1], images[1])
+
+
+async def ahome_version(request, *args, **kwargs):
+    members, partenaires = await asyncio.gather(
+        aqueryset_version(TeamMember.objects.all()),
+        aqueryset_version(Partenaire.objects.all()),
+    )
+    return (DEPLOY_VERSION, members, partenaires), _latest(members[1], partenaires[1])
+
+
+async def apage_version(request, page_name, *args, **kwargs):
+    if page_name == "formation":
+        catalog = await sync_to_async(get_catalog)()
+        return (DEPLOY_VERSION, catalog["etag"]), None
+    if page_name == "activite":
+        return await aactivites_version(request)
+    return page_version(request, page_name)
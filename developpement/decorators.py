@@ -1,6 +1,23 @@
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib import messages
 from django.shortcuts import redirect
-from django.http import HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .conditional import version_etag
+from .limitation import adresse_ip, liberer_envoi, reserver_envoi, verifier_debit
+from .uploads import MAX_UPLOAD_SIZE, TYPES_DOCUMENTS, FichierVerifieUploadHandler
+
+UPLOAD_RETRY_AFTER = 5  # secondes suggérées quand toutes les places d'envoi sont prises
+
 
 def role_required(role):
     """Vérifie si l'utilisateur appartient à un groupe spécifique ou est superutilisateur."""
@@ -25,3 +42,170 @@ def role_required(role):
             return view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
+
+
+def _validators(request, user, version):
+    parts, last_modified = version
+    user_id = user.pk if user.is_authenticated else None
+    etag = quote_etag(version_etag(
+        parts, user_id, request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+    ))
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp
+
+
+def _patch_validators(response, user, etag, timestamp, max_age):
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if timestamp is not None:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+        if not user.is_authenticated:
+            patch_cache_control(response, public=True, max_age=max_age)
+        else:
+            patch_cache_control(
+                response, private=True, max_age=0, must_revalidate=True
+            )
+        patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def conditional_page(version_func, max_age=60):
+    """
+    Ajoute ETag / Last-Modified à une page publique et répond 304 avant tout
+    rendu si le client possède déjà la version courante.
+
+    ``version_func(request, *args, **kwargs)`` retourne
+    ``(composants_de_version, derniere_modification)`` ou None. Pour une vue
+    asynchrone, ``version_func`` doit être une coroutine.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(request, *args, **kwargs):
+                # Résout l'utilisateur (et la session) sans bloquer la boucle
+                user = request.user = await request.auser()
+                if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+                    return await view_func(request, *args, **kwargs)
+                version = await version_func(request, *args, **kwargs)
+                if version is None:
+                    return await view_func(request, *args, **kwargs)
+                etag, timestamp = _validators(request, user, version)
+                response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _patch_validators(response, user, etag, timestamp, max_age)
+            return _wrapped_async_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+            # Des messages en attente doivent être rendus : pas de 304
+            if len(messages.get_messages(request)):
+                return view_func(request, *args, **kwargs)
+
+            version = version_func(request, *args, **kwargs)
+            if version is None:
+                return view_func(request, *args, **kwargs)
+            etag, timestamp = _validators(request, request.user, version)
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _patch_validators(response, request.user, etag, timestamp, max_age)
+        return _wrapped_view
+    return decorator
+
+
+def verifier_uploads(types=TYPES_DOCUMENTS, max_size=MAX_UPLOAD_SIZE, redirect_to=None, json=False):
+    """
+    Installe ``FichierVerifieUploadHandler`` avant la lecture du corps de la
+    requête. Un envoi refusé n'atteint pas la vue : réponse JSON 400 si
+    ``json``, sinon message d'erreur et redirection vers ``redirect_to``
+    (par défaut, la page courante).
+
+    Le middleware CSRF lit ``request.POST`` avant la vue : la vérification
+    CSRF est donc refaite ici, une fois le gestionnaire installé. À placer
+    sous ``login_required`` pour ne rien lire d'un visiteur non connecté.
+    """
+    def decorator(view_func):
+        protected_view = (
+            view_func if getattr(view_func, "csrf_exempt", False) else csrf_protect(view_func)
+        )
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method != "POST":
+                return protected_view(request, *args, **kwargs)
+            # Places limitées : le corps n'est lu qu'une fois la place obtenue
+            place = reserver_envoi() if request.content_type == "multipart/form-data" else ""
+            if place is None:
+                return _refuser(
+                    503, "Trop d'envois en cours. Merci de réessayer dans un instant.",
+                    UPLOAD_RETRY_AFTER, json,
+                )
+            try:
+                handler = FichierVerifieUploadHandler(request, types=types, max_size=max_size)
+                request.upload_handlers = [handler]
+                request.FILES  # Lecture du corps avec le gestionnaire installé
+                if handler.erreurs:
+                    if json:
+                        return JsonResponse(
+                            {"status": "error", "message": " ".join(handler.erreurs)}, status=400
+                        )
+                    for erreur in handler.erreurs:
+                        messages.error(request, erreur)
+                    return redirect(redirect_to or request.get_full_path())
+                return protected_view(request, *args, **kwargs)
+            finally:
+                liberer_envoi(place)
+        return csrf_exempt(_wrapped_view)
+    return decorator
+
+
+def _refuser(status, message, retry_after, json):
+    if json:
+        response = JsonResponse({"status": "error", "message": message}, status=status)
+    else:
+        response = HttpResponse(message, status=status, content_type="text/plain; charset=utf-8")
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def _identite(request, compte):
+    if compte is None:
+        return None
+    if callable(compte):
+        return compte(request)
+    if compte == "user":
+        return request.user.pk if request.user.is_authenticated else None
+    return request.POST.get(compte, "").strip()
+
+
+def limiter_debit(portee, compte=None, methods=("POST",), json=False):
+    """
+    Limite le débit de la vue selon ``settings.THROTTLE_RATES[portee]`` :
+    un seau par adresse IP et, si ``compte`` est fourni, un par compte.
+    ``compte`` est le nom d'un champ POST (identifiant saisi), ``"user"``
+    (utilisateur connecté) ou une fonction ``compte(request)``.
+
+    Au-delà : réponse 429 avec ``Retry-After`` (une ``Surcharge`` levée par
+    la vue est traitée par ``SurchargeMiddleware``). À placer au-dessus de
+    ``verifier_uploads`` pour refuser avant la lecture des fichiers.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method in methods:
+                attente = verifier_debit(
+                    portee, ip=adresse_ip(request), compte=_identite(request, compte)
+                )
+                if attente:
+                    return _refuser(
+                        429, "Trop de tentatives. Merci de réessayer plus tard.", attente, json
+                    )
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
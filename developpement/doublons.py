@@ -0,0 +1,258 @@
+# developpement/doublons.py
+"""
+Détection des candidats inscrits plusieurs fois (fautes de frappe,
+accents, nom et prénom inversés).
+
+Comparer toutes les paires est hors de portée : chaque inscription reçoit
+des clés de blocage et seules les inscriptions qui partagent une clé sont
+comparées :
+
+- codes phonétiques du nom et du prénom (``code_phonetique``), rangés par
+  ordre alphabétique pour qu'une inversion nom/prénom donne la même clé,
+  avec l'année de naissance, puis avec l'année du bac ;
+- date de naissance complète avec le code du nom, et avec celui du prénom
+  (une faute qui change le code de l'un est rattrapée par l'autre).
+
+Chaque paire reçoit un score (``score``) : similarité de Jaro-Winkler des
+noms (dans les deux ordres), date de naissance, téléphone, email, lieu de
+naissance. Les paires au-dessus du seuil vont dans ``DoublonSuspect``.
+
+``detecter(depuis)`` ne compare que les paires dont une inscription au
+moins a un identifiant supérieur à ``depuis`` : un passage incrémental ne
+lit que les anciennes inscriptions nées ou bachelières les mêmes années
+que les nouvelles (filtre SQL), puis ne garde que celles de leurs blocs.
+"""
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from itertools import combinations
+
+from django.db.models import Q
+
+from .models import DoublonSuspect, Inscription
+
+logger = logging.getLogger(__name__)
+
+SEUIL = 0.8
+MAX_BLOC = 200  # au-delà (nom très courant), le bloc est ignoré
+PAQUET = 2000
+
+CHAMPS = (
+    "pk", "nom", "prenom", "date_naissance", "lieu_naissance",
+    "telephone", "email", "annee_obtentionbac",
+)
+
+_NON_LETTRES = re.compile(r"[^a-z]+")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_CHIFFRES = re.compile(r"\D+")
+# Graphies qui se prononcent de la même façon, appliquées dans l'ordre
+_PHONEMES = [
+    (re.compile(r"eau|au"), "o"),
+    (re.compile(r"ou|w"), "u"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"qu|q|ck"), "k"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"sch|ch|sh"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"gu(?=[eiy])"), "g"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"(?<=[a-z])h|^h"), ""),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+_VOYELLES = re.compile(r"(?<!^)[aeiou]")
+_FINALES_MUETTES = re.compile(r"[stdx]+$")
+
+
+def normaliser_accents(texte):
+    texte = unicodedata.normalize("NFKD", texte or "").encode("ascii", "ignore").decode("ascii")
+    return texte.casefold()
+
+
+def normaliser(texte):
+    """Minuscules sans accents, lettres seules, mots séparés par une espace."""
+    return " ".join(_NON_LETTRES.split(normaliser_accents(texte))).strip()
+
+
+def code_phonetique(texte, longueur=4):
+    """Code phonétique (français) : première lettre et squelette consonantique."""
+    mot = normaliser(texte).replace(" ", "")
+    if not mot:
+        return ""
+    for motif, remplacement in _PHONEMES:
+        mot = motif.sub(remplacement, mot)
+    mot = _FINALES_MUETTES.sub("", mot) or mot
+    return _VOYELLES.sub("", mot)[:longueur]
+
+
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0
+    la, lb = len(a), len(b)
+    if not la or not lb:
+        return 0.0
+    portee = max(max(la, lb) // 2 - 1, 0)
+    vus_a, vus_b = [False] * la, [False] * lb
+    communs = 0
+    for i, lettre in enumerate(a):
+        for j in range(max(0, i - portee), min(i + portee + 1, lb)):
+            if not vus_b[j] and b[j] == lettre:
+                vus_a[i] = vus_b[j] = True
+                communs += 1
+                break
+    if not communs:
+        return 0.0
+    transpositions, j = 0, 0
+    for i in range(la):
+        if vus_a[i]:
+            while not vus_b[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+    jaro = (communs / la + communs / lb + (communs - transpositions / 2) / communs) / 3
+    prefixe = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefixe += 1
+    return jaro + prefixe * 0.1 * (1 - jaro)
+
+
+class Fiche:
+    """Champs normalisés d'une inscription, calculés une seule fois."""
+    __slots__ = ("pk", "nom", "prenom", "nom_complet", "naissance", "lieu", "telephone", "email", "bac", "codes")
+
+    def __init__(self, pk, nom, prenom, date_naissance, lieu_naissance, telephone, email, annee_bac):
+        self.pk = pk
+        self.nom = normaliser(nom)
+        self.prenom = normaliser(prenom)
+        # Mots triés : indépendant de l'ordre et du champ de chaque mot
+        self.nom_complet = " ".join(sorted(f"{self.nom} {self.prenom}".split()))
+        self.naissance = date_naissance
+        self.lieu = normaliser(lieu_naissance)
+        self.telephone = _CHIFFRES.sub("", telephone or "")[-8:]
+        # Partie locale de l'adresse, lettres et chiffres seulement
+        self.email = _NON_ALNUM.sub("", normaliser_accents((email or "").split("@")[0]))
+        self.bac = annee_bac
+        self.codes = (code_phonetique(nom), code_phonetique(prenom))
+
+    def cles(self):
+        paire = tuple(sorted(self.codes))
+        cles = {("n", paire, self.naissance.year if self.naissance else None)}
+        if self.bac:
+            cles.add(("b", paire, self.bac))
+        if self.naissance:
+            cles.update((("d", self.naissance, code) for code in self.codes if code))
+        return cles
+
+
+def _similarite_dates(a, b):
+    if a is None or b is None:
+        return 0.0
+    if a == b:
+        return 1.0
+    # Jour et mois inversés
+    if (a.year, a.month, a.day) == (b.year, b.day, b.month):
+        return 0.7
+    # Un seul chiffre différent (faute de frappe)
+    differences = sum(x != y for x, y in zip(f"{a:%Y%m%d}", f"{b:%Y%m%d}"))
+    return 0.6 if differences == 1 else 0.0
+
+
+def score(a, b):
+    """``(score entre 0 et 1, motifs)`` pour deux ``Fiche``."""
+    direct = (jaro_winkler(a.nom, b.nom) + jaro_winkler(a.prenom, b.prenom)) / 2
+    inverse = (jaro_winkler(a.nom, b.prenom) + jaro_winkler(a.prenom, b.nom)) / 2
+    noms = max(direct, inverse, jaro_winkler(a.nom_complet, b.nom_complet))
+    motifs = []
+    if noms == 1.0:
+        motifs.append("même nom")
+    elif inverse > direct and inverse >= 0.9:
+        motifs.append("nom et prénom inversés")
+    else:
+        motifs.append(f"noms proches ({noms:.2f})")
+
+    dates = _similarite_dates(a.naissance, b.naissance)
+    if dates == 1.0:
+        motifs.append("même date de naissance")
+    elif dates:
+        motifs.append("dates de naissance proches")
+
+    contact = 0.0
+    if a.telephone and a.telephone == b.telephone:
+        contact = 1.0
+        motifs.append("même téléphone")
+    if a.email and (a.email == b.email or (
+        min(len(a.email), len(b.email)) >= 8 and jaro_winkler(a.email, b.email) >= 0.95
+    )):
+        contact = 1.0
+        motifs.append("emails proches")
+    if not contact and a.lieu and a.lieu == b.lieu:
+        contact = 0.5
+        motifs.append("même lieu de naissance")
+    return 0.6 * noms + 0.25 * dates + 0.15 * contact, motifs
+
+
+def _fiches(queryset):
+    for valeurs in queryset.order_by().values_list(*CHAMPS).iterator(chunk_size=PAQUET):
+        yield Fiche(*valeurs)
+
+
+def detecter(depuis=0, seuil=SEUIL):
+    """
+    Compare les inscriptions d'identifiant > ``depuis`` entre elles et avec
+    les plus anciennes de leurs blocs. Enregistre les paires suspectes (une
+    paire déjà connue n'est pas modifiée, ni son examen). Retourne des
+    statistiques, dont ``dernier`` : l'identifiant à passer la fois suivante.
+    """
+    nouvelles = list(_fiches(Inscription.objects.filter(pk__gt=depuis)))
+    stats = {"nouvelles": len(nouvelles), "comparaisons": 0, "suspects": 0, "blocs_ignores": 0, "dernier": depuis}
+    if not nouvelles:
+        return stats
+    stats["dernier"] = max(fiche.pk for fiche in nouvelles)
+
+    blocs = defaultdict(list)
+    for fiche in nouvelles:
+        for cle in fiche.cles():
+            blocs[cle].append(fiche)
+    if depuis:
+        # Anciennes inscriptions : toute clé de bloc porte l'année de
+        # naissance ou celle du bac, la base écarte les autres d'emblée
+        annees = {fiche.naissance.year for fiche in nouvelles if fiche.naissance}
+        bacs = {fiche.bac for fiche in nouvelles if fiche.bac}
+        anciennes = Inscription.objects.filter(pk__lte=depuis).filter(
+            Q(date_naissance__year__in=annees) | Q(annee_obtentionbac__in=bacs)
+        )
+        # Puis seulement celles qui tombent dans un bloc existant
+        for fiche in _fiches(anciennes):
+            for cle in fiche.cles():
+                if cle in blocs:
+                    blocs[cle].append(fiche)
+
+    vues, suspects = set(), []
+    for cle, fiches in blocs.items():
+        if len(fiches) > MAX_BLOC:
+            stats["blocs_ignores"] += 1
+            logger.warning("Bloc de doublons ignoré (%d fiches) : %s", len(fiches), cle)
+            continue
+        for a, b in combinations(fiches, 2):
+            if a.pk > b.pk:
+                a, b = b, a
+            # Deux anciennes inscriptions ont déjà été comparées
+            if b.pk <= depuis or (a.pk, b.pk) in vues:
+                continue
+            vues.add((a.pk, b.pk))
+            stats["comparaisons"] += 1
+            valeur, motifs = score(a, b)
+            if valeur >= seuil:
+                suspects.append(DoublonSuspect(
+                    inscription_id=a.pk, autre_id=b.pk, score=round(valeur, 3),
+                    motifs=", ".join(motifs)[:255],
+                ))
+
+    DoublonSuspect.objects.bulk_create(suspects, batch_size=500, ignore_conflicts=True)
+    stats["suspects"] = len(suspects)
+    return stats
@@ -0,0 +1,161 @@
+# developpement/emargement.py
+"""
+Listes d'émargement des examens, par formation et par salle.
+
+Les candidats validés sont lus par paquets (``values().iterator()``),
+dans l'ordre formation, salle, place : chaque groupe consécutif donne une
+feuille PDF (``PAR_FICHIER`` candidats au plus, au-delà la feuille est
+découpée en plusieurs fichiers). ``feuilles`` produit une archive ZIP
+morceau par morceau : chaque PDF est envoyé au client dès qu'il est prêt,
+et la mémoire utilisée ne dépend que de la taille d'une feuille.
+"""
+import zipfile
+from io import BytesIO, RawIOBase
+from itertools import groupby
+
+from django.utils import timezone
+from django.utils.text import slugify
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .models import ConvocationExamen, Inscription
+from .pdf import STYLE_INFOS, styles
+
+PAQUET = 2000
+PAR_FICHIER = 500
+PREMIERE_PAGE = 17  # lignes sous l'en-tête de la feuille
+PAR_PAGE = 28
+NON_REPARTIS = "Non répartis"
+
+ENTETES = ["Place", "Nom", "Prénom", "N° CNI", "Signature"]
+LARGEURS = [15*mm, 45*mm, 45*mm, 35*mm, 40*mm]
+STYLE_LISTE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+])
+
+
+class _Flux(RawIOBase):
+    """Destination d'écriture dont on récupère le contenu au fur et à mesure."""
+
+    def __init__(self):
+        self.morceaux = []
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self.morceaux.append(bytes(donnees))
+        return len(donnees)
+
+    def vider(self):
+        donnees = b"".join(self.morceaux)
+        self.morceaux.clear()
+        return donnees
+
+
+def _candidats(formations, salle):
+    candidats = Inscription.objects.filter(statut="V")
+    if formations:
+        candidats = candidats.filter(formation__in=formations)
+    if salle:
+        candidats = candidats.filter(place_examen__salle__nom=salle)
+    return candidats.order_by(
+        "formation", "place_examen__salle__ordre", "place_examen__salle__nom",
+        "place_examen__numero", "nom", "prenom",
+    ).values(
+        "nom", "prenom", "cni", "formation",
+        "place_examen__salle__nom", "place_examen__salle__lieu", "place_examen__numero",
+    ).iterator(chunk_size=PAQUET)
+
+
+def groupes(formations=None, salle=None):
+    """``((formation, salle, lieu), [candidats])`` par feuille, dans l'ordre."""
+    cle = lambda c: (c["formation"], c["place_examen__salle__nom"] or NON_REPARTIS, c["place_examen__salle__lieu"] or "")
+    for groupe, candidats in groupby(_candidats(formations, salle), key=cle):
+        lot = []
+        for candidat in candidats:
+            lot.append(candidat)
+            if len(lot) == PAR_FICHIER:
+                yield groupe, lot
+                lot = []
+        if lot:
+            yield groupe, lot
+
+
+def feuille(formation, salle, lieu, candidats, convocation=None):
+    """PDF (``bytes``) de la liste d'émargement d'un groupe."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, title=f"Émargement {formation} - {salle}",
+        topMargin=15*mm, bottomMargin=15*mm,
+    )
+
+    def pied(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(15*mm, 10*mm, f"{formation} - {salle}")
+        canvas.drawRightString(A4[0] - 15*mm, 10*mm, f"Page {doc.page}")
+        canvas.restoreState()
+
+    infos = [
+        ["Formation:", formation.upper()],
+        ["Salle:", salle],
+        ["Lieu:", lieu or (convocation.lieu_examen if convocation else "")],
+        ["Date:", convocation.date_examen.strftime("%d/%m/%Y") if convocation else "À préciser"],
+        ["Heure:", convocation.heure_examen.strftime("%H:%M") if convocation else "À préciser"],
+        ["Effectif:", str(len(candidats))],
+    ]
+    infos_table = Table(infos, colWidths=[30*mm, 150*mm])
+    infos_table.setStyle(STYLE_INFOS)
+
+    lignes = [
+        [c["place_examen__numero"] or "", c["nom"].upper(), c["prenom"], c["cni"] or "", ""]
+        for c in candidats
+    ]
+    elements = [Paragraph("LISTE D'ÉMARGEMENT", styles()['titre']), infos_table, Spacer(1, 10)]
+    # Un tableau par page (découper un long tableau coûte cher à reportlab),
+    # avec des lignes assez hautes pour signer
+    debut, fin = 0, PREMIERE_PAGE
+    while debut < len(lignes):
+        if debut:
+            elements.append(PageBreak())
+        page = lignes[debut:fin]
+        liste = Table([ENTETES] + page, colWidths=LARGEURS, rowHeights=[8*mm] + [9*mm] * len(page))
+        liste.setStyle(STYLE_LISTE)
+        elements.append(liste)
+        debut, fin = fin, fin + PAR_PAGE
+
+    doc.build(elements, onFirstPage=pied, onLaterPages=pied)
+    return buffer.getvalue()
+
+
+def nom_archive(formations=None, salle=None):
+    parties = ["emargement"] + [slugify(f) for f in formations or []] + ([slugify(salle)] if salle else [])
+    return f"{'_'.join(parties)}_{timezone.now():%Y%m%d}.zip"
+
+
+def feuilles(formations=None, salle=None):
+    """Archive ZIP des feuilles, produite par morceaux (``bytes``)."""
+    convocations = {c.formation: c for c in ConvocationExamen.objects.all()}
+    flux = _Flux()
+    # PDF déjà compressés : stockage simple
+    with zipfile.ZipFile(flux, "w", compression=zipfile.ZIP_STORED) as archive:
+        noms = set()
+        for (formation, nom_salle, lieu), candidats in groupes(formations, salle):
+            nom = f"{slugify(formation)}/{slugify(nom_salle)}.pdf"
+            suite = 2
+            while nom in noms:
+                nom = f"{slugify(formation)}/{slugify(nom_salle)}-{suite}.pdf"
+                suite += 1
+            noms.add(nom)
+            archive.writestr(nom, feuille(formation, nom_salle, lieu, candidats, convocations.get(formation)))
+            yield flux.vider()
+    yield flux.vider()
@@ -0,0 +1,49 @@
+# developpement/equipe.py
+"""
+Profils des membres de l'équipe.
+
+La grille de la page d'accueil ne charge que les champs de la carte (nom,
+titre, photo, catégorie) ; le profil complet (biographie, expertises, liens)
+est servi en JSON à l'ouverture de la fenêtre modale, depuis le cache. Toute
+modification d'un membre ou de ses expertises change la version de l'espace
+de noms (voir ``developpement.signals``).
+"""
+from django.core.cache import cache
+
+from institut.cache import bump_namespace, namespace_version
+
+from .models import TeamMember
+from .serializers import TeamMemberSerializer
+
+MEMBRES_NAMESPACE = "team"
+PROFIL_KEY = "team:profil:{version}:{host}:{slug}"
+PROFIL_TIMEOUT = 24 * 3600
+
+CHAMPS_CARTE = (
+    "id", "slug", "first_name", "last_name", "title", "photo", "category", "display_order",
+)
+
+
+def membres_carte():
+    """Membres pour la grille, sans biographie ni liens."""
+    return TeamMember.objects.only(*CHAMPS_CARTE)
+
+
+def invalider_profils():
+    return bump_namespace(MEMBRES_NAMESPACE)
+
+
+def profil_membre(request, slug):
+    """Profil sérialisé (``TeamMemberSerializer``) ou None si le slug est inconnu."""
+    # L'URL de la photo est absolue : une entrée par hôte
+    cle = PROFIL_KEY.format(
+        version=namespace_version(MEMBRES_NAMESPACE), host=request.get_host(), slug=slug
+    )
+
+    def construire():
+        member = TeamMember.objects.prefetch_related("expertises").filter(slug=slug).first()
+        if member is None:
+            return None
+        return dict(TeamMemberSerializer(member, context={"request": request}).data)
+
+    return cache.get_or_set(cle, construire, PROFIL_TIMEOUT)
@@ -31,19 +31,43 @@ class CandidatProfileForm(forms.ModelForm):
 
 
 
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """Champ fichier acceptant plusieurs fichiers ; ``cleaned_data`` est une liste."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(fichier, initial) for fichier in data]
+        return [super().clean(data, initial)] if data else []
+
+
 class MultipleImageUploadForm(forms.Form):
-    images = forms.FileField(
-        widget=forms.FileInput(attrs={'multiple': False}),  # Utilisez FileInput pour gérer plusieurs fichiers
-        required=False  # Les images sont optionnelles
+    MAX_IMAGES = 10
+
+    images = MultipleFileField(required=False)  # Les images sont optionnelles
+    archive = forms.FileField(
+        required=False,
+        help_text="Archive ZIP de photos, importée en arrière-plan.",
     )
 
     def clean_images(self):
-        images = self.files.getlist('images')  # Récupère toutes les images envoyées
+        images = self.cleaned_data["images"]
+        if len(images) > self.MAX_IMAGES:
+            raise forms.ValidationError(
+                f"Maximum {self.MAX_IMAGES} images : utilisez une archive ZIP au-delà."
+            )
+        # Type réel contrôlé à la réception (FichierVerifieUploadHandler)
         for image in images:
-            if not image.content_type.startswith('image/'):
+            if not image.content_type or not image.content_type.startswith('image/'):
                 raise forms.ValidationError("Tous les fichiers doivent être des images.")
         return images
-    
 
 
 class InscriptionForm(forms.ModelForm):
@@ -0,0 +1,295 @@
+# developpement/galeries.py
+"""
+Import d'une galerie de photos d'activité depuis une archive ZIP.
+
+La vue dépose l'archive (déjà reçue sur disque par le gestionnaire
+d'envoi) dans ``GALLERY_IMPORT_DIR`` et programme l'import : elle répond
+aussitôt. Un thread de fond parcourt ensuite l'archive et, pour chaque
+image :
+
+- contrôle du type réel (premiers octets) et de la taille décompressée ;
+- élimination des doublons : SHA-256 du fichier d'origine, comparé aux
+  autres images de l'archive et à celles déjà rattachées à l'activité ;
+- normalisation : orientation EXIF appliquée, ``COTE_MAX`` pixels au plus,
+  JPEG (PNG si l'image a de la transparence) ;
+- enregistrement du fichier, puis création des ``ImageActivite`` par lots
+  (``bulk_create``).
+
+L'avancement est conservé dans le cache partagé (``progression``).
+
+Le thread de fond est propre au processus : si celui-ci s'arrête, ses
+archives restent dans ``GALLERY_IMPORT_DIR``. La commande
+``resume_gallery_imports`` les reprend (ou les abandonne, état ``erreur``).
+"""
+import hashlib
+import logging
+import os
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Activite, ImageActivite
+from .uploads import SIGNATURE_MAX, TYPES_IMAGES, detecter_type
+
+logger = logging.getLogger(__name__)
+
+GALERIE_KEY = "galerie:import:{id}"
+GALERIE_TIMEOUT = 24 * 3600
+
+MAX_IMAGES = 1000
+TAILLE_MAX_IMAGE = 25 * 1024 * 1024  # par image, une fois décompressée
+COTE_MAX = 2000
+QUALITE_JPEG = 85
+LOT = 50
+MAX_REJETS_AFFICHES = 50
+DELAI_ABANDON = 30 * 60  # sans avancement depuis, l'import est abandonné
+DOSSIER_IMAGES = ImageActivite._meta.get_field("image").upload_to
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="galeries")
+
+
+class ArchiveRefusee(Exception):
+    pass
+
+
+def repertoire():
+    return str(getattr(settings, "GALLERY_IMPORT_DIR", os.path.join(settings.BASE_DIR, "var", "imports")))
+
+
+def progression(import_id):
+    """État de l'import (dictionnaire) ou None s'il est inconnu ou expiré."""
+    return cache.get(GALERIE_KEY.format(id=import_id))
+
+
+def _publier(etat):
+    etat["maj"] = time.time()
+    cache.set(GALERIE_KEY.format(id=etat["id"]), etat, GALERIE_TIMEOUT)
+
+
+def programmer_import(activite, archive, user):
+    """
+    Déplace l'archive envoyée (``UploadedFile``) dans le répertoire
+    d'import et met l'import en file. Retourne son identifiant.
+    """
+    import_id = uuid.uuid4().hex
+    os.makedirs(repertoire(), exist_ok=True)
+    chemin = os.path.join(repertoire(), f"{import_id}.zip")
+    if hasattr(archive, "temporary_file_path"):
+        # Déjà sur disque : simple renommage quand c'est possible
+        file_move_safe(archive.temporary_file_path(), chemin)
+    else:
+        with open(chemin, "wb") as fh:
+            for chunk in archive.chunks():
+                fh.write(chunk)
+    _publier({
+        "id": import_id,
+        "activite": activite.pk,
+        "utilisateur": user.pk,
+        "etat": "en_attente",
+        "total": None,
+        "traitees": 0,
+        "ajoutees": 0,
+        "doublons": 0,
+        "rejetees": 0,
+        "rejets": [],
+        "message": "",
+    })
+    transaction.on_commit(
+        lambda: _executor.submit(importer, import_id, chemin, activite.pk, user.pk)
+    )
+    return import_id
+
+
+def imports_abandonnes(delai=DELAI_ABANDON):
+    """
+    ``(import_id, chemin, etat)`` des archives dont l'import n'avance plus
+    depuis ``delai`` secondes (``etat`` vaut None s'il a expiré du cache).
+    """
+    dossier = repertoire()
+    if not os.path.isdir(dossier):
+        return
+    limite = time.time() - delai
+    for nom in sorted(os.listdir(dossier)):
+        import_id, extension = os.path.splitext(nom)
+        if extension != ".zip":
+            continue
+        chemin = os.path.join(dossier, nom)
+        etat = progression(import_id)
+        try:
+            maj = (etat or {}).get("maj") or os.path.getmtime(chemin)
+        except OSError:
+            continue  # traitée entre-temps
+        if maj < limite:
+            yield import_id, chemin, etat
+
+
+def abandonner(import_id, chemin, etat, message):
+    """Supprime l'archive et passe l'import à l'état ``erreur``."""
+    etat = dict(etat or {"id": import_id}, etat="erreur", message=message)
+    _publier(etat)
+    try:
+        os.remove(chemin)
+    except OSError:
+        pass
+
+
+def empreinte(fichier):
+    """
+    SHA-256 d'un fichier envoyé (``UploadedFile``), lu par morceaux. Pour un
+    fichier reçu par ``FichierVerifieUploadHandler``, utiliser ``sha256``.
+    """
+    sha256 = hashlib.sha256()
+    for chunk in fichier.chunks():
+        sha256.update(chunk)
+    fichier.seek(0)
+    return sha256.hexdigest()
+
+
+def _membres(archive):
+    for membre in archive.infolist():
+        nom = membre.filename
+        if membre.is_dir() or nom.startswith("__MACOSX/") or os.path.basename(nom).startswith("."):
+            continue
+        yield membre
+
+
+def normaliser(donnees):
+    """Retourne ``(contenu, extension)`` de l'image normalisée."""
+    with Image.open(BytesIO(donnees)) as image:
+        # JPEG : décodage directement à une résolution réduite
+        image.draft("RGB", (COTE_MAX, COTE_MAX))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((COTE_MAX, COTE_MAX))
+        sortie = BytesIO()
+        transparente = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        if transparente:
+            image.convert("RGBA").save(sortie, "PNG", optimize=True)
+            return sortie.getvalue(), "png"
+        image.convert("RGB").save(sortie, "JPEG", quality=QUALITE_JPEG, optimize=True, progressive=True)
+        return sortie.getvalue(), "jpg"
+
+
+def _enregistrer(lot):
+    try:
+        ImageActivite.objects.bulk_create(lot)
+    except Exception:
+        for image in lot:
+            default_storage.delete(image.image.name)
+        raise
+
+
+def importer(import_id, chemin, activite_id, user_id):
+    """Traite l'archive (exécuté dans le thread de fond)."""
+    close_old_connections()
+    etat = progression(import_id) or {"id": import_id, "activite": activite_id}
+    etat.update(etat="en_cours", traitees=0, ajoutees=0, doublons=0, rejetees=0, rejets=[])
+    _publier(etat)
+    try:
+        _importer(etat, chemin, activite_id, user_id)
+        etat["etat"] = "termine"
+    except zipfile.BadZipFile:
+        etat.update(etat="erreur", message="Archive ZIP invalide.")
+    except ArchiveRefusee as e:
+        etat.update(etat="erreur", message=str(e))
+    except Activite.DoesNotExist:
+        etat.update(etat="erreur", message="Activité supprimée pendant l'import.")
+    except Exception:
+        logger.exception("Import de galerie %s interrompu", import_id)
+        etat.update(etat="erreur", message="Erreur inattendue pendant l'import.")
+    finally:
+        _publier(etat)
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+        close_old_connections()
+
+
+def _rejeter(etat, nom, motif):
+    etat["rejetees"] += 1
+    if len(etat["rejets"]) < MAX_REJETS_AFFICHES:
+        etat["rejets"].append(f"{nom} : {motif}")
+
+
+def _importer(etat, chemin, activite_id, user_id):
+    activite = Activite.objects.get(pk=activite_id)
+    with zipfile.ZipFile(chemin) as archive:
+        membres = list(_membres(archive))
+        if len(membres) > MAX_IMAGES:
+            raise ArchiveRefusee(f"Au plus {MAX_IMAGES} fichiers par archive.")
+        etat["total"] = len(membres)
+        _publier(etat)
+
+        connues = set(
+            ImageActivite.objects.filter(activite=activite)
+            .exclude(sha256="")
+            .values_list("sha256", flat=True)
+        )
+        lot = []
+        for membre in membres:
+            nom = os.path.basename(membre.filename)
+            image = _traiter(etat, archive, membre, nom, connues)
+            if image is not None:
+                image.activite = activite
+                image.uploaded_by_id = user_id
+                lot.append(image)
+            etat["traitees"] += 1
+            if len(lot) >= LOT:
+                _enregistrer(lot)
+                etat["ajoutees"] += len(lot)
+                lot = []
+                _publier(etat)
+            elif etat["traitees"] % 10 == 0:
+                _publier(etat)
+        if lot:
+            _enregistrer(lot)
+            etat["ajoutees"] += len(lot)
+
+
+def _traiter(etat, archive, membre, nom, connues):
+    """``ImageActivite`` non enregistrée, ou None (doublon ou rejet)."""
+    if membre.file_size > TAILLE_MAX_IMAGE:
+        _rejeter(etat, nom, "image trop volumineuse")
+        return None
+    try:
+        with archive.open(membre) as fh:
+            # Lecture bornée : la taille annoncée par l'archive peut mentir
+            donnees = fh.read(TAILLE_MAX_IMAGE + 1)
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError, OSError, EOFError):
+        # CRC incorrect, fichier chiffré, compression non prise en charge
+        _rejeter(etat, nom, "fichier illisible dans l'archive")
+        return None
+    if len(donnees) > TAILLE_MAX_IMAGE:
+        _rejeter(etat, nom, "image trop volumineuse")
+        return None
+    if detecter_type(donnees[:SIGNATURE_MAX]) not in TYPES_IMAGES:
+        _rejeter(etat, nom, "format non supporté")
+        return None
+
+    sha256 = hashlib.sha256(donnees).hexdigest()
+    if sha256 in connues:
+        etat["doublons"] += 1
+        return None
+    try:
+        contenu, extension = normaliser(donnees)
+    except Exception:
+        # Fichier tronqué, bombe de décompression (Image.MAX_IMAGE_PIXELS)...
+        _rejeter(etat, nom, "image illisible")
+        return None
+    connues.add(sha256)
+    chemin = default_storage.save(
+        os.path.join(DOSSIER_IMAGES, f"{sha256[:20]}.{extension}"), ContentFile(contenu)
+    )
+    return ImageActivite(image=chemin, sha256=sha256)
@@ -0,0 +1,55 @@
+# developpement/identifiers.py
+"""
+Attribution d'identifiants uniques suffixés (``dupont_jea``, ``dupont_jea_1``...).
+
+Le prochain suffixe libre est déterminé par une seule requête sur le
+préfixe, quel que soit le nombre d'homonymes. Deux créations simultanées
+peuvent choisir le même identifiant : la contrainte d'unicité tranche et
+le perdant recommence avec un nouveau suffixe.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+
+MAX_TENTATIVES = 5
+
+
+def prochain_identifiant(queryset, field, base, separator="_", max_length=None):
+    """Premier identifiant disponible pour ``base`` (``base``, puis ``base<sep>N``)."""
+    if max_length:
+        # Place réservée au suffixe
+        base = base[:max_length - len(separator) - 6]
+    pattern = re.compile(rf"^{re.escape(base)}(?:{re.escape(separator)}(\d+))?$")
+    existants = queryset.filter(**{f"{field}__startswith": base}).values_list(field, flat=True)
+
+    pris = False
+    dernier = 0
+    for valeur in existants:
+        match = pattern.match(valeur)
+        if not match:
+            continue
+        if match.group(1) is None:
+            pris = True
+        else:
+            dernier = max(dernier, int(match.group(1)))
+    if not pris:
+        return base
+    return f"{base}{separator}{dernier + 1}"
+
+
+def allouer_identifiant(create, queryset, field, base, separator="_", max_length=None):
+    """
+    Appelle ``create(identifiant)`` avec un identifiant libre et recommence si
+    un autre processus l'a pris entre-temps (``IntegrityError`` sur ``field``).
+
+    Retourne le résultat de ``create``.
+    """
+    for tentative in range(MAX_TENTATIVES):
+        identifiant = prochain_identifiant(queryset, field, base, separator, max_length)
+        try:
+            with transaction.atomic():
+                return create(identifiant)
+        except IntegrityError:
+            # Autre contrainte en cause (email, CNI...) : on ne masque rien
+            if tentative == MAX_TENTATIVES - 1 or not queryset.filter(**{field: identifiant}).exists():
+                raise
@@ -0,0 +1,129 @@
+# developpement/limitation.py
+"""
+Limitation de débit et contrôle d'admission des vues coûteuses.
+
+- Seaux à jetons par adresse IP et par compte, stockés dans le cache
+  partagé : tous les workers décomptent les mêmes jetons. Un débit
+  ``"10/h"`` autorise une rafale de 10 requêtes puis une toutes les 6 min.
+- Nombre borné d'envois de fichiers traités simultanément : chaque envoi
+  occupe un emplacement (``cache.add``) pendant la lecture du corps et
+  l'exécution de la vue. Un emplacement abandonné (worker tué) expire seul.
+
+Les débits se règlent par ``settings.THROTTLE_RATES`` et la limite d'envois
+par ``settings.UPLOAD_MAX_CONCURRENT``.
+"""
+import math
+import os
+import random
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+THROTTLE_KEY = "throttle:{portee}:{type}:{ident}"
+UPLOAD_SLOT_KEY = "uploads:slot:{numero}"
+UPLOAD_SLOT_TIMEOUT = 600  # durée maximale d'un envoi
+
+PERIODES = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+DEBIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])")
+
+
+class Surcharge(Exception):
+    """Ressource saturée : la vue répond 503 avec ``Retry-After``."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def analyser_debit(debit):
+    """``"10/h"`` ou ``"5/15m"`` -> ``(capacité, jetons par seconde)``."""
+    correspondance = DEBIT_RE.match(debit)
+    if not correspondance:
+        raise ValueError(f"Débit invalide : {debit!r}")
+    nombre, multiple, unite = correspondance.groups()
+    duree = int(multiple or 1) * PERIODES[unite]
+    return int(nombre), int(nombre) / duree
+
+
+def adresse_ip(request):
+    """
+    Adresse du client. Derrière ``THROTTLE_TRUSTED_PROXIES`` mandataires,
+    on lit ``X-Forwarded-For`` depuis la droite : les entrées de gauche sont
+    fournies par le client et ne sont pas fiables.
+    """
+    mandataires = getattr(settings, "THROTTLE_TRUSTED_PROXIES", 0)
+    if mandataires:
+        adresses = [
+            adresse.strip()
+            for adresse in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+            if adresse.strip()
+        ]
+        if len(adresses) >= mandataires:
+            return adresses[-mandataires]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _prendre(seaux):
+    """Prélève un jeton dans chacun des ``seaux`` (clé, capacité, débit), ou dans aucun."""
+    take_tokens = getattr(cache, "take_tokens", None)
+    if take_tokens is not None:
+        return take_tokens(seaux)
+    # Autre backend : même calcul, sans garantie d'atomicité
+    maintenant = time.time()
+    etats, attente = [], 0.0
+    for cle, capacite, debit in seaux:
+        jetons, dernier = cache.get(cle, (capacite, maintenant))
+        jetons = min(capacite, jetons + max(0.0, maintenant - dernier) * debit)
+        if jetons < 1:
+            attente = max(attente, (1 - jetons) / debit)
+        etats.append((cle, capacite, debit, jetons))
+    if attente:
+        return False, attente
+    for cle, capacite, debit, jetons in etats:
+        cache.set(cle, (jetons - 1, maintenant), math.ceil((capacite - jetons + 1) / debit) + 1)
+    return True, 0.0
+
+
+def verifier_debit(portee, ip=None, compte=None):
+    """
+    Consomme un jeton dans chaque seau configuré pour ``portee``. Retourne
+    None si la requête est admise, sinon le délai (secondes) avant qu'elle
+    le soit. Une requête refusée ne consomme aucun jeton, dans aucun seau.
+    Une identité absente (``None`` ou vide) n'est pas limitée.
+    """
+    regles = getattr(settings, "THROTTLE_RATES", {}).get(portee, {})
+    seaux = []
+    for type_, ident in (("ip", ip), ("compte", compte)):
+        if type_ not in regles or not ident:
+            continue
+        capacite, debit = analyser_debit(regles[type_])
+        cle = THROTTLE_KEY.format(portee=portee, type=type_, ident=str(ident).lower()[:200])
+        seaux.append((cle, capacite, debit))
+    if not seaux:
+        return None
+    accepte, attente = _prendre(seaux)
+    return None if accepte else max(1, math.ceil(attente))
+
+
+def reserver_envoi():
+    """
+    Réserve un emplacement d'envoi de fichiers. Retourne sa clé (à passer à
+    ``liberer_envoi``) ou None si toutes les places sont prises.
+    """
+    places = getattr(settings, "UPLOAD_MAX_CONCURRENT", 0)
+    if not places:
+        return ""
+    # Départ aléatoire : les workers ne se disputent pas tous la place 0
+    depart = random.randrange(places)
+    for i in range(places):
+        cle = UPLOAD_SLOT_KEY.format(numero=(depart + i) % places)
+        if cache.add(cle, os.getpid(), UPLOAD_SLOT_TIMEOUT):
+            return cle
+    return None
+
+
+def liberer_envoi(cle):
+    if cle:
+        cache.delete(cle)
@@ -0,0 +1,122 @@
+# developpement/live.py
+"""
+Événements temps réel du tableau de bord administrateur.
+
+Les modifications d'inscriptions publient de petits messages (création,
+changement de statut, suppression) accompagnés de la variation des
+compteurs dans le groupe Channels ``DASHBOARD_GROUP`` : les pages ouvertes
+appliquent ces deltas en place, sans recalculer les statistiques.
+
+La couche en mémoire ne relie pas les processus : en production, les
+événements des workers WSGI et des commandes n'atteignent les consommateurs
+daphne que par Redis (``REDIS_URL``), d'où l'avertissement de
+``verifier_couche`` au démarrage.
+"""
+import logging
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Inscription
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_GROUP = "admin_dashboard"
+STATUTS = dict(Inscription.VALIDATION_CHOICES)
+
+
+def verifier_couche():
+    """Avertit si la couche Channels ne partage pas les événements entre processus."""
+    backend = settings.CHANNEL_LAYERS.get("default", {}).get("BACKEND", "")
+    if not settings.DEBUG and backend.endswith("InMemoryChannelLayer"):
+        logger.warning(
+            "CHANNEL_LAYERS en mémoire hors DEBUG : les événements des workers WSGI "
+            "et des commandes n'atteignent pas le tableau de bord temps réel. "
+            "Définissez REDIS_URL."
+        )
+
+
+def compteurs():
+    """Compteurs globaux, par statut et par formation (une requête groupée)."""
+    total = 0
+    statuts = dict.fromkeys(STATUTS, 0)
+    formations = {}
+    rows = (
+        Inscription.objects.order_by()
+        .values("formation", "statut")
+        .annotate(n=Count("id"))
+    )
+    for row in rows:
+        total += row["n"]
+        statuts[row["statut"]] = statuts.get(row["statut"], 0) + row["n"]
+        formation = (row["formation"] or "").strip()
+        if formation:
+            formations[formation] = formations.get(formation, 0) + row["n"]
+    return {"total": total, "statuts": statuts, "formations": formations}
+
+
+def serialiser_inscription(inscription):
+    return {
+        "id": inscription.id,
+        "nom": inscription.nom,
+        "prenom": inscription.prenom,
+        "email": inscription.email,
+        "telephone": inscription.telephone or "",
+        "sexe": inscription.sexe,
+        "formation": inscription.formation or "",
+        "statut": inscription.statut,
+        "statut_display": STATUTS.get(inscription.statut, inscription.statut),
+        "date_inscription": (
+            timezone.localtime(inscription.date_inscription).strftime("%d/%m/%Y %H:%M")
+            if inscription.date_inscription else ""
+        ),
+    }
+
+
+def delta(total=0, statuts=None, formations=None):
+    """Variation des compteurs, sans les entrées nulles."""
+    return {
+        "total": total,
+        "statuts": {k: v for k, v in (statuts or {}).items() if v},
+        "formations": {k: v for k, v in (formations or {}).items() if k and v},
+    }
+
+
+def publier(event, **payload):
+    """Diffuse un événement aux tableaux de bord ouverts, après le commit."""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    message = {"type": "dashboard.event", "event": event, **payload}
+
+    def envoyer():
+        try:
+            async_to_sync(layer.group_send)(DASHBOARD_GROUP, message)
+        except Exception:
+            logger.exception("Diffusion de l'événement %s impossible", event)
+
+    transaction.on_commit(envoyer)
+
+
+def publier_changements_statut(anciens, nouveau_statut):
+    """
+    Événement groupé pour ``changer_statut`` (l'UPDATE ne déclenche pas de
+    signal). ``anciens`` associe chaque identifiant modifié à son ancien statut.
+    """
+    if not anciens:
+        return
+    variation = Counter(anciens.values())
+    variation = {statut: -n for statut, n in variation.items()}
+    variation[nouveau_statut] = variation.get(nouveau_statut, 0) + len(anciens)
+    publier(
+        "statuts",
+        ids=list(anciens),
+        statut=nouveau_statut,
+        statut_display=STATUTS.get(nouveau_statut, nouveau_statut),
+        delta=delta(statuts=variation),
+    )
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from developpement.models import SalleExamen
+from developpement.salles import TRI_DEFAUT, TRIS, RepartitionImpossible, repartir
+
+
+class Command(BaseCommand):
+    help = (
+        "Répartit les candidats validés dans les salles d'examen et leur "
+        "attribue un numéro de place (affiché sur la convocation)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--formation", action="append", dest="formations",
+            help="Formation à traiter (option répétable). Par défaut : toutes celles qui ont une convocation.",
+        )
+        parser.add_argument(
+            "--salle", action="append", dest="salles",
+            help="Salle à utiliser, par nom (option répétable). Par défaut : les salles actives.",
+        )
+        parser.add_argument(
+            "--tri", default=",".join(TRI_DEFAUT),
+            help=f"Ordre d'affectation, règles séparées par des virgules parmi : {', '.join(TRIS)}.",
+        )
+
+    def handle(self, *args, **options):
+        tri = tuple(regle.strip() for regle in options["tri"].split(",") if regle.strip())
+        salles = None
+        if options["salles"]:
+            salles = list(SalleExamen.objects.filter(nom__in=options["salles"]))
+            inconnues = set(options["salles"]) - {salle.nom for salle in salles}
+            if inconnues:
+                raise CommandError(f"Salle inconnue : {', '.join(sorted(inconnues))}")
+
+        debut = time.perf_counter()
+        try:
+            stats = repartir(options["formations"], salles, tri)
+        except (RepartitionImpossible, ValueError) as e:
+            raise CommandError(str(e))
+        duree = time.perf_counter() - debut
+
+        for nom, nombre in sorted(stats["par_salle"].items()):
+            self.stdout.write(f"  {nom:<20} {nombre:6d} candidats")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['candidats']} candidats placés en {duree:.2f} s : "
+            f"{stats['attribuees']} places attribuées, {stats['inchangees']} inchangées, "
+            f"{stats['liberees']} libérées."
+        ))
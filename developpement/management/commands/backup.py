@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from developpement import sauvegarde
+from developpement.sauvegarde import ErreurSauvegarde
+
+
+class Command(BaseCommand):
+    help = (
+        "Sauvegarde en ligne de la base SQLite et instantané incrémental de "
+        "MEDIA_ROOT ; liste, vérification et restauration des sauvegardes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "action", nargs="?", default="create",
+            choices=["create", "list", "verify", "restore", "prune"],
+        )
+        parser.add_argument("nom", nargs="?", help="Sauvegarde visée (défaut : la plus récente).")
+        parser.add_argument("--no-media", action="store_true", help="Ignorer MEDIA_ROOT.")
+        parser.add_argument(
+            "--keep", type=int, default=14,
+            help="Nombre de sauvegardes conservées après create/prune (0 = toutes).",
+        )
+        parser.add_argument(
+            "--full", action="store_true",
+            help="verify : recalculer l'empreinte de chaque fichier média.",
+        )
+        parser.add_argument(
+            "--noinput", "--no-input", action="store_false", dest="interactive",
+            help="restore : ne pas demander de confirmation.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f"_{options['action']}")(options)
+        except ErreurSauvegarde as e:
+            raise CommandError(str(e))
+
+    def _nom(self, options):
+        if options["nom"]:
+            return options["nom"]
+        sauvegardes = sauvegarde.lister()
+        if not sauvegardes:
+            raise CommandError("Aucune sauvegarde disponible.")
+        return sauvegardes[-1]
+
+    def _create(self, options):
+        debut = time.monotonic()
+        nom, manifeste = sauvegarde.sauvegarder(media=not options["no_media"])
+        stats = manifeste["stats"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Sauvegarde {nom} : base {manifeste['base']['taille'] // 1024} Ko, "
+            f"{stats.get('fichiers', 0)} médias dont {stats.get('copies', 0)} copiés "
+            f"({stats.get('octets_copies', 0) // 1024} Ko) et {stats.get('lies', 0)} liés, "
+            f"en {time.monotonic() - debut:.1f} s."
+        ))
+        self._prune(options)
+
+    def _list(self, options):
+        for nom in sauvegarde.lister():
+            manifeste = sauvegarde.lire_manifeste(nom)
+            self.stdout.write(
+                f"{nom}  base {manifeste['base']['taille'] // 1024} Ko  "
+                f"{len(manifeste['media'])} médias"
+            )
+
+    def _verify(self, options):
+        nom = self._nom(options)
+        anomalies = sauvegarde.verifier(nom, complet=options["full"])
+        for anomalie in anomalies:
+            self.stderr.write(anomalie)
+        if anomalies:
+            raise CommandError(f"Sauvegarde {nom} : {len(anomalies)} anomalie(s).")
+        self.stdout.write(self.style.SUCCESS(f"Sauvegarde {nom} vérifiée."))
+
+    def _restore(self, options):
+        nom = self._nom(options)
+        if options["interactive"]:
+            reponse = input(
+                f"La base actuelle sera remplacée par la sauvegarde {nom}. "
+                "Tapez 'oui' pour continuer : "
+            )
+            if reponse != "oui":
+                self.stdout.write("Restauration annulée.")
+                return
+        restaures = sauvegarde.restaurer(nom, media=not options["no_media"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Sauvegarde {nom} restaurée ({restaures} fichiers médias remis en place)."
+        ))
+
+    def _prune(self, options):
+        for nom in sauvegarde.purger(options["keep"]):
+            self.stdout.write(f"Sauvegarde {nom} supprimée.")
@@ -0,0 +1,99 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.functions import Lower
+from django.utils.module_loading import import_string
+
+from developpement.authentification import UserModel, normaliser_email, pool
+from developpement.limitation import Surcharge
+
+MOT_DE_PASSE = "Mot-de-passe-de-test-2024"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit de vérification des mots de passe à la connexion "
+        "(pool de hachage, clients concurrents) pour chaque hacheur configuré."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Connexions simulées par hacheur.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Clients simultanés.")
+        parser.add_argument(
+            "--hasher", choices=["configure", "pbkdf2", "argon2", "django", "tous"], default="tous",
+            help="« django » : PBKDF2 avec le nombre d'itérations par défaut de Django.",
+        )
+
+    def _hacheurs(self, choix):
+        hacheurs = {
+            "configure": import_string(settings.PASSWORD_HASHERS[0])(),
+            "pbkdf2": import_string("developpement.authentification.PBKDF2ReglableHasher")(),
+            "argon2": import_string("developpement.authentification.Argon2ReglableHasher")(),
+            "django": PBKDF2PasswordHasher(),
+        }
+        if choix != "tous":
+            return {choix: hacheurs[choix]}
+        del hacheurs["configure"]
+        return hacheurs
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests et --concurrency doivent être positifs.")
+        self._plan_requete()
+        for nom, hacheur in self._hacheurs(options["hasher"]).items():
+            try:
+                encoded = hacheur.encode(MOT_DE_PASSE, hacheur.salt())
+            except ValueError as e:
+                # Argon2 sans argon2-cffi installé
+                self.stderr.write(f"{nom} : {e}")
+                continue
+            self._mesurer(nom, hacheur, encoded, options["requests"], options["concurrency"])
+
+    def _plan_requete(self):
+        queryset = (
+            UserModel._default_manager.annotate(email_normalise=Lower("email"))
+            .filter(email_normalise=normaliser_email("candidat@example.com"))
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ; ".join(str(ligne[-1]) for ligne in cursor.fetchall())
+        self.stdout.write(f"Recherche par email : {plan}")
+
+    def _mesurer(self, nom, hacheur, encoded, requetes, concurrence):
+        durees, refus = [], 0
+
+        def connexion(_i):
+            debut = time.perf_counter()
+            try:
+                correct = pool.executer(hacheur.verify, MOT_DE_PASSE, encoded)
+            except Surcharge:
+                return None
+            if not correct:
+                raise CommandError(f"{nom} : vérification incorrecte")
+            return time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrence) as clients:
+            for duree in clients.map(connexion, range(requetes)):
+                if duree is None:
+                    refus += 1
+                else:
+                    durees.append(duree)
+        total = time.perf_counter() - debut
+
+        if not durees:
+            self.stdout.write(f"{nom:<10} toutes les connexions refusées (pool saturé)")
+            return
+        centiles = statistics.quantiles(durees, n=20) if len(durees) > 1 else durees * 19
+        self.stdout.write(
+            f"{nom:<10} {len(durees) / total:8.1f} connexions/s  "
+            f"médiane {statistics.median(durees) * 1000:7.1f} ms  "
+            f"p95 {centiles[18] * 1000:7.1f} ms"
+            + (f"  ({refus} refusées)" if refus else "")
+        )
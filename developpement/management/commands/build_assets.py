@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from developpement.assets import build_bundles
+
+
+class Command(BaseCommand):
+    help = "Construit les bundles CSS/JS (concaténation, purge, minification)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-purge",
+            action="store_true",
+            help="Ne pas purger les sélecteurs CSS inutilisés.",
+        )
+
+    def handle(self, *args, **options):
+        manifest = build_bundles(purge=not options["no_purge"])
+        for name, kinds in manifest.items():
+            for kind, info in kinds.items():
+                self.stdout.write(
+                    f"{info['path']}: {info['source_size'] // 1024} Ko -> "
+                    f"{info['size'] // 1024} Ko"
+                )
+        self.stdout.write(self.style.SUCCESS("Bundles construits."))
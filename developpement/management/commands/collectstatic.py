@@ -0,0 +1,22 @@
+from django.contrib.staticfiles.management.commands.collectstatic import (
+    Command as CollectStaticCommand,
+)
+
+from developpement.assets import build_bundles
+
+
+class Command(CollectStaticCommand):
+    """``collectstatic`` précédé de la construction des bundles."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--skip-bundles",
+            action="store_true",
+            help="Ne pas reconstruire les bundles avant la collecte.",
+        )
+
+    def handle(self, **options):
+        if not options["skip_bundles"] and not options["dry_run"]:
+            build_bundles()
+        return super().handle(**options)
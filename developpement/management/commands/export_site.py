@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from developpement.transfert import ErreurTransfert, exporter, resoudre_modeles
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte les données du site en NDJSON (un fichier par modèle), "
+        "avec éventuellement les fichiers médias référencés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("repertoire", help="Répertoire de destination.")
+        parser.add_argument(
+            "--models", nargs="*",
+            help="Applications ou modèles à exporter (app_label ou app_label.Model).",
+        )
+        parser.add_argument("--exclude", nargs="*", default=[], help="Modèles à exclure.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--media", action="store_true", help="Joindre les médias (media.tar).")
+        parser.add_argument("--gzip", action="store_true", help="Compresser les fichiers NDJSON.")
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        try:
+            manifeste = exporter(
+                options["repertoire"],
+                resoudre_modeles(options["models"], options["exclude"]),
+                batch_size=options["batch_size"],
+                media=options["media"],
+                compresser=options["gzip"],
+                log=self.stdout.write,
+            )
+        except ErreurTransfert as e:
+            raise CommandError(str(e))
+        total = sum(entree["total"] for entree in manifeste["modeles"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} objets exportés ({len(manifeste['modeles'])} modèles) "
+            f"en {time.monotonic() - debut:.1f} s."
+        ))
@@ -0,0 +1,57 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from developpement.doublons import SEUIL, detecter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recherche les candidats probablement inscrits plusieurs fois et "
+        "enregistre les paires suspectes, à examiner dans l'administration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--checkpoint", default=os.path.join(settings.BASE_DIR, "var", "doublons.json"),
+            help="Fichier JSON de reprise : seules les nouvelles inscriptions sont traitées.",
+        )
+        parser.add_argument("--full", action="store_true", help="Comparer toutes les inscriptions.")
+        parser.add_argument("--threshold", type=float, default=SEUIL, help=f"Score minimal (défaut : {SEUIL}).")
+
+    def handle(self, *args, **options):
+        if not 0 < options["threshold"] <= 1:
+            raise CommandError("--threshold doit être compris entre 0 et 1.")
+        checkpoint = options["checkpoint"]
+        depuis = 0 if options["full"] else self._load_checkpoint(checkpoint).get("last", 0)
+
+        debut = time.perf_counter()
+        stats = detecter(depuis, options["threshold"])
+        duree = time.perf_counter() - debut
+        self._save_checkpoint(checkpoint, stats["dernier"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['nouvelles']} inscriptions traitées en {duree:.1f} s : "
+            f"{stats['comparaisons']} comparaisons, {stats['suspects']} paires suspectes."
+        ))
+        if stats["blocs_ignores"]:
+            self.stderr.write(f"{stats['blocs_ignores']} blocs trop grands ignorés (voir le journal).")
+
+    @staticmethod
+    def _load_checkpoint(path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_checkpoint(path, last):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"last": last}, fh)
+        os.replace(tmp, path)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from developpement.transfert import ErreurTransfert, importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe un export de ``export_site`` par lots (bulk_create), dans "
+        "l'ordre des dépendances, en une seule transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("repertoire", help="Répertoire produit par export_site.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--media", action="store_true", help="Extraire media.tar dans MEDIA_ROOT.")
+        parser.add_argument(
+            "--ignore-conflicts", action="store_true",
+            help="Importer dans des tables non vides en ignorant les doublons.",
+        )
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        try:
+            totaux = importer(
+                options["repertoire"],
+                batch_size=options["batch_size"],
+                media=options["media"],
+                ignore_conflicts=options["ignore_conflicts"],
+                log=self.stdout.write,
+            )
+        except ErreurTransfert as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(totaux.values())} objets importés ({len(totaux)} modèles) "
+            f"en {time.monotonic() - debut:.1f} s."
+        ))
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+
+
+def iter_media_files(root, start_after=None):
+    """Parcourt ``root`` dans un ordre stable (chemins relatifs triés)."""
+    # Comparaison composant par composant, cohérente avec le tri par nom
+    resume = start_after.split("/") if start_after else None
+
+    def walk(directory, relative):
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in entries:
+            path = f"{relative}/{entry.name}" if relative else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                # Sous-arbre entièrement traité lors d'un passage précédent
+                if resume and not start_after.startswith(path + "/") and path.split("/") < resume:
+                    continue
+                yield from walk(entry.path, path)
+            elif entry.is_file(follow_symlinks=False):
+                if resume and path.split("/") <= resume:
+                    continue
+                yield path
+
+    yield from walk(root, "")
+
+
+def iter_batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def file_fields():
+    """(modèle, nom du champ) pour chaque FileField/ImageField du projet."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field.name
+
+
+def sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Détecte (et supprime) les fichiers de MEDIA_ROOT qui ne sont plus "
+        "référencés en base, et signale les références vers des fichiers absents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Supprimer les orphelins.")
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Ignorer les fichiers plus récents que ce délai (défaut : 24 h).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--limit", type=int, default=0,
+            help="Nombre maximal de fichiers examinés par exécution (0 = tous).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Fichier JSON de reprise pour un parcours incrémental.",
+        )
+        parser.add_argument("--hash", action="store_true", help="Calculer le SHA-256 des orphelins.")
+        parser.add_argument(
+            "--skip-missing", action="store_true",
+            help="Ne pas vérifier les fichiers référencés mais absents.",
+        )
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        grace = options["grace_hours"] * 3600
+        now = time.time()
+
+        referenced = {}
+        for model, field in file_fields():
+            names = model._default_manager.exclude(**{field: ""}).exclude(
+                **{f"{field}__isnull": True}
+            ).values_list("pk", field)
+            for pk, name in names.iterator(chunk_size=2000):
+                referenced.setdefault(name, []).append((model._meta.label, pk, field))
+
+        checkpoint = self._load_checkpoint(options["checkpoint"])
+        start_after = checkpoint.get("last")
+        examined = orphans = deleted = freed = 0
+        last = start_after
+        files = iter_media_files(root, start_after)
+        if options["limit"]:
+            files = islice(files, options["limit"])
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for batch in iter_batches(files, options["batch_size"]):
+                examined += len(batch)
+                last = batch[-1]
+                candidates = [name for name in batch if name not in referenced]
+                paths = [os.path.join(root, name) for name in candidates]
+                stats = list(pool.map(self._stat, paths))
+                old = [
+                    (name, path, stat)
+                    for name, path, stat in zip(candidates, paths, stats)
+                    if stat is not None and now - stat.st_mtime >= grace
+                ]
+                digests = (
+                    list(pool.map(sha256, [path for _name, path, _stat in old]))
+                    if options["hash"] else [None] * len(old)
+                )
+                for (name, path, stat), digest in zip(old, digests):
+                    orphans += 1
+                    line = f"ORPHELIN {name} ({stat.st_size} octets)"
+                    if digest:
+                        line += f" sha256={digest}"
+                    self.stdout.write(line)
+                    if options["delete"]:
+                        try:
+                            os.remove(path)
+                            deleted += 1
+                            freed += stat.st_size
+                        except OSError as e:
+                            self.stderr.write(f"Suppression impossible : {name} ({e})")
+                self._save_checkpoint(options["checkpoint"], last)
+
+            finished = not options["limit"] or examined < options["limit"]
+            if finished:
+                # Parcours complet : la prochaine exécution repart du début
+                self._save_checkpoint(options["checkpoint"], None)
+
+            missing = 0
+            if not options["skip_missing"]:
+                names = list(referenced)
+                exists = pool.map(
+                    os.path.isfile, (os.path.join(root, name) for name in names)
+                )
+                for name, present in zip(names, exists):
+                    if not present:
+                        for label, pk, field in referenced[name]:
+                            missing += 1
+                            self.stdout.write(f"MANQUANT {label}#{pk}.{field} -> {name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{examined} fichiers examinés, {orphans} orphelins, {deleted} supprimés "
+            f"({freed // 1024} Ko libérés), {missing} références manquantes."
+        ))
+
+    @staticmethod
+    def _stat(path):
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _load_checkpoint(path):
+        if not path:
+            return {}
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_checkpoint(path, last):
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"last": last}, fh)
+        os.replace(tmp, path)
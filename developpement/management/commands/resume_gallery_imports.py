@@ -0,0 +1,48 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from developpement.galeries import DELAI_ABANDON, abandonner, importer, imports_abandonnes
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprend les imports de galerie interrompus par l'arrêt d'un processus "
+        "(archives de GALLERY_IMPORT_DIR sans avancement récent). À lancer au "
+        "démarrage du service."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clean", action="store_true",
+            help="Abandonne les imports (état 'erreur') au lieu de les reprendre.",
+        )
+        parser.add_argument(
+            "--age", type=int, default=DELAI_ABANDON // 60,
+            help="Minutes sans avancement avant de considérer un import interrompu.",
+        )
+
+    def handle(self, *args, **options):
+        reprises = abandons = 0
+        for import_id, chemin, etat in imports_abandonnes(options["age"] * 60):
+            if etat and etat.get("etat") in ("termine", "erreur"):
+                # Import fini dont l'archive n'a pas pu être supprimée
+                try:
+                    os.remove(chemin)
+                except OSError:
+                    pass
+                continue
+            if options["clean"] or not etat or not etat.get("utilisateur"):
+                abandonner(
+                    import_id, chemin, etat,
+                    "Import interrompu (redémarrage du serveur) : renvoyez l'archive.",
+                )
+                abandons += 1
+                continue
+            # Les images déjà enregistrées sont reconnues (SHA-256) : doublons
+            self.stdout.write(f"Reprise de l'import {import_id}...")
+            importer(import_id, chemin, etat["activite"], etat["utilisateur"])
+            reprises += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{reprises} import(s) repris, {abandons} abandonné(s)."
+        ))
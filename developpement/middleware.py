@@ -1,4 +1,5 @@
 import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
@@ -8,3 +9,49 @@ class RedirectDebugMiddleware(MiddlewareMixin):
         if 300 <= response.status_code < 400:
             logger.debug(f"Redirection detected: {request.path} -> {response.url}")
         return response
+
+
+class CandidatContextMiddleware:
+    """Attache ``request.candidat`` (chargé à la demande)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        from .candidat import CandidatContext
+
+        request.candidat = CandidatContext(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        from .candidat import CandidatContext
+
+        request.candidat = CandidatContext(request)
+        return await self.get_response(request)
+
+
+class SurchargeMiddleware(MiddlewareMixin):
+    """
+    Une ``Surcharge`` levée par une vue (pool de hachage des mots de passe
+    saturé...) devient une réponse 503 avec ``Retry-After``, quelle que soit
+    la vue : connexion, administration, création de compte.
+    """
+
+    def process_exception(self, request, exception):
+        from .decorators import _refuser
+        from .limitation import Surcharge
+
+        if not isinstance(exception, Surcharge):
+            return None
+        json = request.content_type == "application/json" or "application/json" in request.headers.get("Accept", "")
+        return _refuser(
+            503, "Service momentanément surchargé. Merci de réessayer dans un instant.",
+            exception.retry_after, json,
+        )
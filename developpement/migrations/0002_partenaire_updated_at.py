@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partenaire',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0002_partenaire_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatutHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancien_statut', models.CharField(choices=[('E', 'En attente'), ('V', 'Validé'), ('R', 'Rejeté')], max_length=1)),
+                ('nouveau_statut', models.CharField(choices=[('E', 'En attente'), ('V', 'Validé'), ('R', 'Rejeté')], max_length=1)),
+                ('date_modification', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('inscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historique_statuts', to='developpement.inscription')),
+                ('modifie_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Historique de statut',
+                'verbose_name_plural': 'Historiques de statut',
+                'ordering': ['-date_modification'],
+            },
+        ),
+    ]
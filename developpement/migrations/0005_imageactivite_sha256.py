@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0004_customuser_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageactivite',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:27
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0005_imageactivite_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalleExamen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, unique=True, verbose_name='Salle')),
+                ('lieu', models.CharField(blank=True, max_length=200, verbose_name='Lieu (bâtiment, centre)')),
+                ('capacite', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Capacité')),
+                ('ordre', models.PositiveIntegerField(default=0, verbose_name='Ordre de remplissage')),
+                ('active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': "Salle d'examen",
+                'verbose_name_plural': "Salles d'examen",
+                'ordering': ['ordre', 'nom'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaceExamen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField(verbose_name='Numéro de place')),
+                ('date_examen', models.DateField()),
+                ('heure_examen', models.TimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('inscription', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='place_examen', to='developpement.inscription')),
+                ('salle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='places', to='developpement.salleexamen')),
+            ],
+            options={
+                'verbose_name': "Place d'examen",
+                'verbose_name_plural': "Places d'examen",
+                'ordering': ['date_examen', 'heure_examen', 'salle', 'numero'],
+                'constraints': [models.UniqueConstraint(fields=('salle', 'numero', 'date_examen', 'heure_examen'), name='unique_place_examen')],
+            },
+        ),
+    ]
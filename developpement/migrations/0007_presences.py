@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0006_salles_examen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Presence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pointe_le', models.DateTimeField(verbose_name='Pointé le')),
+                ('poste', models.CharField(blank=True, max_length=50, verbose_name='Poste de contrôle')),
+                ('inscription', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='presence', to='developpement.inscription')),
+                ('pointe_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Présence à l'examen",
+                'verbose_name_plural': "Présences à l'examen",
+                'ordering': ['-pointe_le'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developpement', '0007_presences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoublonSuspect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('motifs', models.CharField(blank=True, max_length=255)),
+                ('statut', models.CharField(choices=[('A', 'À examiner'), ('D', 'Doublon confirmé'), ('N', 'Personnes distinctes')], default='A', max_length=1)),
+                ('detecte_le', models.DateTimeField(auto_now_add=True)),
+                ('examine_le', models.DateTimeField(blank=True, null=True)),
+                ('autre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='developpement.inscription', verbose_name='Doublon possible')),
+                ('examine_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('inscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='developpement.inscription')),
+            ],
+            options={
+                'verbose_name': 'Doublon suspect',
+                'verbose_name_plural': 'Doublons suspects',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['statut', '-score'], name='doublon_statut_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('inscription', 'autre'), name='unique_doublon_suspect')],
+            },
+        ),
+    ]
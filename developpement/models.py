@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models
+from django.db.models.functions import Lower
 from django.conf import settings
 
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -10,6 +11,8 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinLengthValidator
 from django.core.validators import FileExtensionValidator
 
+from .identifiers import allouer_identifiant
+
 import os
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -32,6 +35,12 @@ class CustomUser(AbstractUser):
         blank=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Connexion par email (EmailBackend filtre sur LOWER(email))
+            models.Index(Lower('email'), name='customuser_email_lower_idx'),
+        ]
+
 
 def get_current_year():
     """Fonction utilitaire pour obtenir l'année courante"""
@@ -240,6 +249,27 @@ class Inscription(models.Model):
         super().save(*args, **kwargs)
 
 
+class StatutHistory(models.Model):
+    """Historique des changements de statut d'une inscription."""
+    inscription = models.ForeignKey(
+        Inscription, on_delete=models.CASCADE, related_name="historique_statuts"
+    )
+    ancien_statut = models.CharField(max_length=1, choices=Inscription.VALIDATION_CHOICES)
+    nouveau_statut = models.CharField(max_length=1, choices=Inscription.VALIDATION_CHOICES)
+    modifie_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    date_modification = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Historique de statut"
+        verbose_name_plural = "Historiques de statut"
+        ordering = ["-date_modification"]
+
+    def __str__(self):
+        return f"{self.inscription_id}: {self.ancien_statut} → {self.nouveau_statut}"
+
+
 class Partenaire(models.Model):
     CATEGORY_CHOICES = (
         ('academique', 'Académique'),
@@ -252,6 +282,7 @@ class Partenaire(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='academique')
     description = models.TextField(blank=True, help_text="Description courte pour le tooltip")
     website = models.URLField(blank=True, validators=[URLValidator()])
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.nom
@@ -363,15 +394,27 @@ class TeamMember(models.Model):
         return f"{self.full_name} ({self.get_category_display()})"
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(f"{self.first_name}-{self.last_name}")
-            unique_slug = base_slug
-            num = 1
-            while TeamMember.objects.filter(slug=unique_slug).exists():
-                unique_slug = f"{base_slug}-{num}"
-                num += 1
-            self.slug = unique_slug
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        save = super().save
+
+        def enregistrer(slug):
+            self.slug = slug
+            try:
+                return save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ""
+                raise
+
+        return allouer_identifiant(
+            enregistrer,
+            TeamMember.objects.all(),
+            "slug",
+            slugify(f"{self.first_name}-{self.last_name}"),
+            separator="-",
+            max_length=self._meta.get_field("slug").max_length,
+        )
 
     @property
     def full_name(self):
@@ -465,6 +508,108 @@ class ConvocationExamen(models.Model):
         verbose_name_plural = "Convocations Examens"
 
 
+class SalleExamen(models.Model):
+    """Salle d'examen ; les places sont numérotées de 1 à ``capacite``."""
+    nom = models.CharField(max_length=50, unique=True, verbose_name="Salle")
+    lieu = models.CharField(max_length=200, blank=True, verbose_name="Lieu (bâtiment, centre)")
+    capacite = models.PositiveIntegerField(validators=[MinValueValidator(1)], verbose_name="Capacité")
+    ordre = models.PositiveIntegerField(default=0, verbose_name="Ordre de remplissage")
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Salle d'examen"
+        verbose_name_plural = "Salles d'examen"
+        ordering = ["ordre", "nom"]
+
+    def __str__(self):
+        return f"{self.nom} ({self.capacite} places)"
+
+
+class PlaceExamen(models.Model):
+    """Place attribuée à un candidat validé pour son épreuve."""
+    inscription = models.OneToOneField(
+        Inscription, on_delete=models.CASCADE, related_name="place_examen"
+    )
+    salle = models.ForeignKey(SalleExamen, on_delete=models.CASCADE, related_name="places")
+    numero = models.PositiveIntegerField(verbose_name="Numéro de place")
+    # Créneau recopié de la convocation : une même place peut servir à
+    # plusieurs épreuves, mais pas deux fois sur le même créneau
+    date_examen = models.DateField()
+    heure_examen = models.TimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Place d'examen"
+        verbose_name_plural = "Places d'examen"
+        ordering = ["date_examen", "heure_examen", "salle", "numero"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["salle", "numero", "date_examen", "heure_examen"],
+                name="unique_place_examen",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.salle.nom} - place {self.numero}"
+
+
+class Presence(models.Model):
+    """Pointage d'un candidat à l'entrée de l'examen (un seul par inscription)."""
+    inscription = models.OneToOneField(
+        Inscription, on_delete=models.CASCADE, related_name="presence"
+    )
+    pointe_le = models.DateTimeField(verbose_name="Pointé le")
+    poste = models.CharField(max_length=50, blank=True, verbose_name="Poste de contrôle")
+    pointe_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Présence à l'examen"
+        verbose_name_plural = "Présences à l'examen"
+        ordering = ["-pointe_le"]
+
+    def __str__(self):
+        return f"{self.inscription} - {self.pointe_le:%d/%m/%Y %H:%M}"
+
+
+class DoublonSuspect(models.Model):
+    """Paire d'inscriptions qui concernent peut-être la même personne."""
+    STATUT_CHOICES = [
+        ("A", "À examiner"),
+        ("D", "Doublon confirmé"),
+        ("N", "Personnes distinctes"),
+    ]
+
+    # ``inscription`` est toujours la plus ancienne des deux
+    inscription = models.ForeignKey(Inscription, on_delete=models.CASCADE, related_name="+")
+    autre = models.ForeignKey(
+        Inscription, on_delete=models.CASCADE, related_name="+", verbose_name="Doublon possible"
+    )
+    score = models.FloatField()
+    motifs = models.CharField(max_length=255, blank=True)
+    statut = models.CharField(max_length=1, choices=STATUT_CHOICES, default="A")
+    detecte_le = models.DateTimeField(auto_now_add=True)
+    examine_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    examine_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Doublon suspect"
+        verbose_name_plural = "Doublons suspects"
+        ordering = ["-score"]
+        constraints = [
+            models.UniqueConstraint(fields=["inscription", "autre"], name="unique_doublon_suspect"),
+        ]
+        indexes = [
+            models.Index(fields=["statut", "-score"], name="doublon_statut_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.inscription} / {self.autre} ({self.score:.2f})"
+
+
 class Activite(models.Model):
     CATEGORY_CHOICES = [
         ('nature', 'Nature et Environnement'),
@@ -508,6 +653,8 @@ class ImageActivite(models.Model):
     uploaded_at = models.DateTimeField(default=timezone.now)
     
     caption = models.CharField(max_length=200, blank=True, verbose_name="Légende")
+    # Empreinte du fichier d'origine (import ZIP) : détection des doublons
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
     
     class Meta:
         verbose_name = "Image d'activité"
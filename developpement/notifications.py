@@ -0,0 +1,93 @@
+# developpement/notifications.py
+"""
+Envoi différé des emails de notification.
+
+Les emails sont préparés et envoyés dans un thread de fond, par lots, en
+réutilisant une seule connexion SMTP : la requête qui déclenche la
+notification n'attend jamais le serveur de messagerie.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import Inscription
+
+# Journal des envois (fichier dédié, cf. settings.LOGGING)
+logger = logging.getLogger("institut.mail")
+
+EMAIL_BATCH_SIZE = 100
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notifications")
+
+MESSAGES_STATUT = {
+    "V": (
+        "Votre inscription a été validée",
+        "Bonjour {prenom} {nom},\n\nVotre dossier d'inscription à la formation "
+        "« {formation} » a été validé. Vous pouvez dès à présent consulter votre "
+        "espace candidat.",
+    ),
+    "R": (
+        "Votre inscription n'a pas été retenue",
+        "Bonjour {prenom} {nom},\n\nAprès étude, votre dossier d'inscription à la "
+        "formation « {formation} » n'a pas été retenu. Pour plus d'informations, "
+        "veuillez nous contacter.",
+    ),
+}
+
+
+def _construire_email(sujet, message):
+    message_html = render_to_string(
+        "administrateur/email_template.html",
+        {
+            "sujet": sujet,
+            "message": message,
+            "date_envoi": timezone.now().strftime("%d/%m/%Y à %H:%M"),
+            "site_name": getattr(settings, "SITE_NAME", "Institut de Formation"),
+            "site_url": getattr(settings, "SITE_URL", ""),
+        },
+    )
+    return message_html, strip_tags(message)
+
+
+def envoyer_notifications_statut(ids, statut):
+    """Envoie les emails de changement de statut (exécuté en tâche de fond)."""
+    sujet, modele = MESSAGES_STATUT[statut]
+    try:
+        connection = get_connection(fail_silently=True)
+        for start in range(0, len(ids), EMAIL_BATCH_SIZE):
+            lot = ids[start:start + EMAIL_BATCH_SIZE]
+            emails = []
+            for inscrit in Inscription.objects.filter(id__in=lot).values(
+                "email", "nom", "prenom", "formation"
+            ):
+                message_html, message_texte = _construire_email(sujet, modele.format(**inscrit))
+                email = EmailMultiAlternatives(
+                    sujet,
+                    message_texte,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [inscrit["email"]],
+                    connection=connection,
+                )
+                email.attach_alternative(message_html, "text/html")
+                emails.append(email)
+            envoyes = connection.send_messages(emails) or 0
+            logger.info(
+                "Notifications de statut %s envoyées",
+                statut,
+                extra={"count": envoyes, "destinataires": [email.to[0] for email in emails]},
+            )
+    except Exception:
+        logger.exception("Erreur lors de l'envoi des notifications de statut")
+    finally:
+        close_old_connections()
+
+
+def notifier_changement_statut(ids, statut):
+    """Met en file l'envoi des notifications ; retourne immédiatement."""
+    return _executor.submit(envoyer_notifications_statut, list(ids), statut)
@@ -0,0 +1,46 @@
+# developpement/pdf.py
+"""Éléments reportlab communs aux documents PDF (convocations, émargement)."""
+from functools import lru_cache
+
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import TableStyle
+
+# Tableaux « libellé : valeur » sans bordure
+STYLE_INFOS = TableStyle([
+    ('FONT', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+
+@lru_cache(maxsize=None)
+def styles():
+    """Styles de paragraphe, construits une fois par processus."""
+    base = getSampleStyleSheet()
+    return {
+        'titre': ParagraphStyle(
+            'CustomTitle',
+            parent=base['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=1,  # Centré
+        ),
+        'normal': base['BodyText'],
+        'gras': ParagraphStyle(
+            'BoldText',
+            parent=base['BodyText'],
+            fontName='Helvetica-Bold',
+        ),
+    }
+
+
+def qr_code(donnees, taille):
+    """QR code de ``taille`` points de côté, à insérer dans un PDF."""
+    widget = QrCodeWidget(donnees, barLevel='M')
+    x1, y1, x2, y2 = widget.getBounds()
+    dessin = Drawing(taille, taille, transform=[taille / (x2 - x1), 0, 0, taille / (y2 - y1), 0, 0])
+    dessin.add(widget)
+    return dessin
@@ -0,0 +1,157 @@
+# developpement/presences.py
+"""
+Pointage des candidats à l'entrée de l'examen.
+
+- Jeton imprimé en QR code sur la convocation : ``"<id>:<formation>:<hmac>"``.
+  Le HMAC-SHA256 (tronqué à 128 bits, base64url) porte sur
+  ``"<id>:<formation>"`` ; il se vérifie sans accès à la base, sur le
+  serveur comme sur un appareil de contrôle qui détient
+  ``CHECKIN_SIGNING_KEY``.
+- ``pointer`` enregistre un lot de jetons (un seul à l'entrée, plusieurs
+  lors de la synchronisation d'un appareil resté hors ligne) en trois
+  requêtes : lecture des inscriptions par clé primaire, insertion des
+  nouvelles présences (``bulk_create(ignore_conflicts=True)`` sur l'index
+  unique de l'inscription : un double passage ne crée rien), puis relecture
+  de ces présences : celle qu'un autre poste a enregistrée entre-temps est
+  signalée ``deja_pointe``.
+- ``liste_hors_ligne`` produit la liste signée des candidats attendus
+  d'une formation, que les appareils chargent avant l'examen.
+"""
+import base64
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.dateparse import parse_datetime
+
+from .models import ConvocationExamen, Inscription, Presence
+
+SALT = "developpement.presences"
+MAX_JETONS = 500
+
+
+def cle():
+    if settings.CHECKIN_SIGNING_KEY:
+        return settings.CHECKIN_SIGNING_KEY.encode()
+    return salted_hmac(SALT, "cle-de-pointage").digest()
+
+
+def signature(message):
+    empreinte = hmac.new(cle(), message.encode(), hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(empreinte).rstrip(b"=").decode()
+
+
+def jeton(inscription):
+    valeur = f"{inscription.pk}:{inscription.formation}"
+    return f"{valeur}:{signature(valeur)}"
+
+
+def lire_jeton(texte):
+    """``(id, formation)`` si la signature est valide, sinon None."""
+    valeur, _, signe = str(texte).strip().rpartition(":")
+    identifiant, _, formation = valeur.partition(":")
+    if not (identifiant.isdigit() and formation and hmac.compare_digest(signe, signature(valeur))):
+        return None
+    return int(identifiant), formation
+
+
+def _lecture(element):
+    """Un élément du lot : jeton seul, ou ``{"jeton": ..., "pointe_le": ...}``."""
+    if isinstance(element, dict):
+        moment = parse_datetime(str(element.get("pointe_le") or ""))
+        if moment is not None and timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return str(element.get("jeton", "")), moment
+    return str(element), None
+
+
+def pointer(elements, poste="", user=None, formation=None):
+    """
+    Enregistre la présence des candidats des ``elements`` (liste de jetons
+    lus). ``formation`` restreint le contrôle à une épreuve. Retourne un
+    résultat par élément, dans l'ordre : ``statut`` parmi ``present``,
+    ``deja_pointe``, ``invalide``, ``autre_formation``, ``non_valide``,
+    ``inconnu``. Lève ``ValueError`` au-delà de ``MAX_JETONS`` éléments.
+    """
+    if len(elements) > MAX_JETONS:
+        raise ValueError(f"Au plus {MAX_JETONS} jetons par lot")
+    maintenant = timezone.now()
+    lectures = []
+    for element in elements:
+        texte, moment = _lecture(element)
+        lectures.append((lire_jeton(texte), moment))
+
+    ids = {contenu[0] for contenu, _ in lectures if contenu}
+    fiches = {
+        pk: (nom, prenom, formation_actuelle, statut, deja)
+        for pk, nom, prenom, formation_actuelle, statut, deja in Inscription.objects.filter(pk__in=ids)
+        .values_list("pk", "nom", "prenom", "formation", "statut", "presence__pointe_le")
+    }
+
+    resultats, nouvelles, presents = [], {}, {}
+    for contenu, moment in lectures:
+        if contenu is None:
+            resultats.append({"statut": "invalide"})
+            continue
+        pk, formation_jeton = contenu
+        fiche = fiches.get(pk)
+        if fiche is None:
+            resultats.append({"statut": "inconnu", "inscription": pk})
+            continue
+        nom, prenom, formation_actuelle, statut, deja = fiche
+        resultat = {"inscription": pk, "nom": nom, "prenom": prenom, "formation": formation_actuelle}
+        resultats.append(resultat)
+        if formation_jeton != formation_actuelle or (formation and formation != formation_actuelle):
+            # Convocation d'une autre épreuve, ou candidat qui a changé de formation
+            resultat["statut"] = "autre_formation"
+        elif statut != "V":
+            resultat["statut"] = "non_valide"
+        elif deja is not None or pk in nouvelles:
+            resultat["statut"] = "deja_pointe"
+            resultat["pointe_le"] = (deja or nouvelles[pk].pointe_le).isoformat()
+        else:
+            resultat["statut"] = "present"
+            nouvelles[pk] = Presence(
+                inscription_id=pk, pointe_le=moment or maintenant, poste=poste[:50], pointe_par=user
+            )
+            resultat["pointe_le"] = nouvelles[pk].pointe_le.isoformat()
+            presents[pk] = resultat
+    if nouvelles:
+        # Deux postes peuvent lire le même candidat au même instant : la
+        # ligne de l'autre est conservée, et relue pour corriger la réponse
+        Presence.objects.bulk_create(nouvelles.values(), ignore_conflicts=True)
+        enregistrees = Presence.objects.filter(inscription_id__in=list(nouvelles)).values_list(
+            "inscription_id", "pointe_le", "poste", "pointe_par_id"
+        )
+        for pk, pointe_le, poste_enregistre, pointe_par_id in enregistrees:
+            ecrite = nouvelles[pk]
+            if (pointe_le, poste_enregistre, pointe_par_id) != (ecrite.pointe_le, ecrite.poste, ecrite.pointe_par_id):
+                presents[pk].update(statut="deja_pointe", pointe_le=pointe_le.isoformat())
+    return resultats
+
+
+def liste_hors_ligne(formation):
+    """
+    Liste signée des candidats validés de ``formation`` : l'appareil
+    vérifie ``signature`` (HMAC de ``donnees`` sérialisé en JSON compact,
+    clés triées) avant de l'utiliser.
+    """
+    convocation = ConvocationExamen.objects.filter(formation=formation).first()
+    candidats = (
+        Inscription.objects.filter(formation=formation, statut="V")
+        .order_by("nom", "prenom", "pk")
+        .values_list("pk", "nom", "prenom", "place_examen__salle__nom", "place_examen__numero")
+    )
+    donnees = {
+        "formation": formation,
+        "date": convocation.date_examen.isoformat() if convocation else None,
+        "heure": convocation.heure_examen.strftime("%H:%M") if convocation else None,
+        "genere_le": timezone.now().isoformat(),
+        "colonnes": ["inscription", "nom", "prenom", "salle", "place"],
+        "candidats": [list(ligne) for ligne in candidats.iterator(chunk_size=2000)],
+    }
+    serialise = json.dumps(donnees, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return {"donnees": donnees, "signature": signature(serialise)}
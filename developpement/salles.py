@@ -0,0 +1,158 @@
+# developpement/salles.py
+"""
+Répartition des candidats validés dans les salles d'examen.
+
+``repartir(formations, salles, tri)`` :
+
+1. lit en une requête (``values_list``) les candidats validés des
+   formations, et le créneau (date, heure) de chaque convocation ;
+2. trie les candidats de chaque créneau en un seul appel à ``sorted`` sur
+   une clé composite construite d'après les règles ``TRIS`` (sans accents
+   ni casse) ;
+3. aligne la liste triée sur la liste des places libres des salles, dans
+   leur ordre de remplissage (les places déjà attribuées sur ce créneau à
+   d'autres candidats sont exclues) ;
+4. enregistre le tout dans une transaction : places inchangées conservées,
+   places des candidats déplacés ou qui ne sont plus validés supprimées,
+   nouvelles places créées par ``bulk_create``.
+"""
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .models import ConvocationExamen, Inscription, PlaceExamen, SalleExamen
+
+BATCH_SIZE = 1000
+
+
+class RepartitionImpossible(Exception):
+    pass
+
+
+def _pli(texte):
+    """Forme de comparaison : sans accents, insensible à la casse."""
+    texte = unicodedata.normalize("NFKD", texte or "")
+    return texte.encode("ascii", "ignore").decode("ascii").casefold()
+
+
+# Colonnes lues : (id, nom, prenom, formation, serie_bac)
+TRIS = {
+    "nom": lambda candidat: (_pli(candidat[1]), _pli(candidat[2])),
+    "formation": lambda candidat: (_pli(candidat[3]),),
+    "serie_bac": lambda candidat: (candidat[4] or "",),
+}
+TRI_DEFAUT = ("nom",)
+
+
+def cle_de_tri(tri):
+    regles = [TRIS[regle] for regle in tri]
+    # L'identifiant départage les homonymes : résultat reproductible
+    return lambda candidat: tuple(part for regle in regles for part in regle(candidat)) + (candidat[0],)
+
+
+def _places_libres(salles, occupees):
+    """Liste ``[(salle_id, numero), ...]`` dans l'ordre de remplissage."""
+    return [
+        (salle.pk, numero)
+        for salle in salles
+        for numero in range(1, salle.capacite + 1)
+        if (salle.pk, numero) not in occupees
+    ]
+
+
+def repartir(formations=None, salles=None, tri=TRI_DEFAUT):
+    """
+    Attribue une place à chaque candidat validé des ``formations`` (toutes
+    celles qui ont une convocation par défaut) dans les ``salles`` (les
+    salles actives par défaut). Retourne des statistiques ; lève
+    ``RepartitionImpossible`` si une convocation manque ou si les places
+    ne suffisent pas (rien n'est alors modifié).
+    """
+    inconnues = [regle for regle in tri if regle not in TRIS]
+    if inconnues:
+        raise ValueError(f"Règle de tri inconnue : {', '.join(inconnues)}")
+    salles = list(salles if salles is not None else SalleExamen.objects.filter(active=True))
+    if not salles:
+        raise RepartitionImpossible("Aucune salle d'examen disponible.")
+
+    convocations = ConvocationExamen.objects.all()
+    if formations is not None:
+        convocations = convocations.filter(formation__in=formations)
+    creneaux = {
+        formation: (date, heure)
+        for formation, date, heure in convocations.values_list("formation", "date_examen", "heure_examen")
+    }
+    if formations is not None:
+        sans_convocation = sorted(set(formations) - set(creneaux))
+        if sans_convocation:
+            raise RepartitionImpossible(
+                f"Aucune convocation pour : {', '.join(sans_convocation)}."
+            )
+
+    candidats = Inscription.objects.filter(statut="V", formation__in=list(creneaux)).order_by()
+    par_creneau = defaultdict(list)
+    for candidat in candidats.values_list("id", "nom", "prenom", "formation", "serie_bac"):
+        par_creneau[creneaux[candidat[3]]].append(candidat)
+
+    with transaction.atomic():
+        existantes = {
+            place.inscription_id: place
+            for place in PlaceExamen.objects.filter(inscription__formation__in=list(creneaux))
+        }
+        ids_candidats = set()
+        nouvelles = []
+        cle = cle_de_tri(tri)
+        for (date, heure), liste in par_creneau.items():
+            # Places prises sur ce créneau par des candidats hors répartition
+            occupees = set(
+                PlaceExamen.objects.filter(salle__in=salles, date_examen=date, heure_examen=heure)
+                .exclude(inscription__formation__in=list(creneaux))
+                .values_list("salle_id", "numero")
+            )
+            places = _places_libres(salles, occupees)
+            if len(liste) > len(places):
+                raise RepartitionImpossible(
+                    f"{len(liste)} candidats pour {len(places)} places libres "
+                    f"le {date:%d/%m/%Y} à {heure:%H:%M}."
+                )
+            for candidat, (salle_id, numero) in zip(sorted(liste, key=cle), places):
+                ids_candidats.add(candidat[0])
+                nouvelles.append(PlaceExamen(
+                    inscription_id=candidat[0], salle_id=salle_id, numero=numero,
+                    date_examen=date, heure_examen=heure,
+                ))
+
+        # Seules les places qui changent sont réécrites. Une place déplacée
+        # est supprimée puis recréée : une mise à jour en place buterait sur
+        # la contrainte d'unicité dès que deux candidats échangent leur siège.
+        a_creer, a_supprimer, inchangees = [], [], 0
+        for place in nouvelles:
+            ancienne = existantes.get(place.inscription_id)
+            if ancienne is None:
+                a_creer.append(place)
+            elif (ancienne.salle_id, ancienne.numero, ancienne.date_examen, ancienne.heure_examen) == (
+                place.salle_id, place.numero, place.date_examen, place.heure_examen
+            ):
+                inchangees += 1
+            else:
+                a_supprimer.append(ancienne.pk)
+                a_creer.append(place)
+        # Candidats qui ne sont plus validés
+        liberees = [
+            place.pk for inscription_id, place in existantes.items()
+            if inscription_id not in ids_candidats
+        ]
+        a_supprimer += liberees
+        for debut in range(0, len(a_supprimer), BATCH_SIZE):
+            PlaceExamen.objects.filter(pk__in=a_supprimer[debut:debut + BATCH_SIZE]).delete()
+        PlaceExamen.objects.bulk_create(a_creer, batch_size=BATCH_SIZE)
+
+    noms = {salle.pk: salle.nom for salle in salles}
+    return {
+        "candidats": len(nouvelles),
+        "inchangees": inchangees,
+        "attribuees": len(a_creer),
+        "liberees": len(liberees),
+        "par_salle": dict(Counter(noms[place.salle_id] for place in nouvelles)),
+    }
@@ -0,0 +1,325 @@
+# developpement/sauvegarde.py
+"""
+Sauvegardes cohérentes de la base SQLite et de ``MEDIA_ROOT``.
+
+Chaque sauvegarde est un répertoire horodaté de ``BACKUP_ROOT`` :
+
+- ``db.sqlite3`` : copie faite avec l'API de sauvegarde en ligne de SQLite,
+  par paquets de pages, sans bloquer les écritures du site ;
+- ``media/`` : instantané incrémental. Un fichier inchangé depuis la
+  sauvegarde précédente (taille et date de modification, ou même contenu
+  retrouvé par son SHA-256) est un lien physique vers la copie précédente :
+  seuls les fichiers modifiés occupent de la place ;
+- ``manifest.json`` : empreintes de la base et de chaque fichier.
+
+Le répertoire est construit sous un nom temporaire puis renommé : une
+sauvegarde interrompue n'est jamais prise pour une sauvegarde complète.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+MANIFEST = "manifest.json"
+DB_FILE = "db.sqlite3"
+MEDIA_DIR = "media"
+PARTIAL = ".partial"
+
+PAGES_PAR_ETAPE = 1024
+PAUSE_ETAPE = 0.005  # secondes laissées aux écritures entre deux paquets
+MAX_REPRISES = 3
+CHUNK = 1024 * 1024
+
+
+class ErreurSauvegarde(Exception):
+    pass
+
+
+def racine():
+    return str(getattr(settings, "BACKUP_ROOT", os.path.join(settings.BASE_DIR, "backups")))
+
+
+def chemin_base(alias="default"):
+    reglages = connections[alias].settings_dict
+    if reglages["ENGINE"] != "django.db.backends.sqlite3":
+        raise ErreurSauvegarde("Seules les bases SQLite sont prises en charge")
+    return str(reglages["NAME"])
+
+
+def lister():
+    """Sauvegardes complètes, de la plus ancienne à la plus récente."""
+    try:
+        noms = os.listdir(racine())
+    except FileNotFoundError:
+        return []
+    return sorted(
+        nom for nom in noms
+        if not nom.endswith(PARTIAL) and os.path.isfile(os.path.join(racine(), nom, MANIFEST))
+    )
+
+
+def lire_manifeste(nom):
+    try:
+        with open(os.path.join(racine(), nom, MANIFEST), encoding="utf-8") as fh:
+            return json.load(fh)
+    except OSError:
+        raise ErreurSauvegarde(f"Sauvegarde introuvable : {nom}")
+
+
+def _sha256(chemin):
+    digest = hashlib.sha256()
+    with open(chemin, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _lier_ou_copier(source_precedente, source, destination):
+    if source_precedente:
+        try:
+            os.link(source_precedente, destination)
+            return True
+        except OSError:
+            # Autre système de fichiers ou limite de liens : copie
+            pass
+    shutil.copy2(source, destination)
+    return False
+
+
+# Base de données
+
+class _Reprise(Exception):
+    pass
+
+
+def sauvegarder_base(source, destination, progression=None):
+    """
+    Copie en ligne (``sqlite3.Connection.backup``) puis contrôle d'intégrité.
+
+    En mode WAL, la copie se fait en une étape : la lecture voit un état
+    cohérent sans bloquer les écritures. Sinon elle avance par paquets de
+    pages ; SQLite la recommence chaque fois qu'une autre connexion écrit,
+    et après ``MAX_REPRISES`` reprises on termine en une seule étape (les
+    écritures attendent alors la fin de la lecture).
+    """
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(destination)
+    try:
+        (mode,) = src.execute("PRAGMA journal_mode").fetchone()
+        if mode.lower() == "wal":
+            _copier_base(src, dst, -1, progression)
+        else:
+            try:
+                _copier_base(src, dst, PAGES_PAR_ETAPE, progression)
+            except _Reprise:
+                _copier_base(src, dst, -1, progression)
+        (resultat,) = dst.execute("PRAGMA integrity_check").fetchone()
+    finally:
+        dst.close()
+        src.close()
+    if resultat != "ok":
+        raise ErreurSauvegarde(f"Copie de la base corrompue : {resultat}")
+
+
+def _copier_base(src, dst, pages, progression):
+    etat = {"restant": None, "reprises": 0}
+
+    def suivre(status, restant, total):
+        if etat["restant"] is not None and restant > etat["restant"]:
+            # Copie recommencée après une écriture concurrente
+            etat["reprises"] += 1
+            if etat["reprises"] > MAX_REPRISES:
+                raise _Reprise()
+        etat["restant"] = restant
+        if progression:
+            progression(status, restant, total)
+
+    with dst:
+        src.backup(dst, pages=pages, sleep=PAUSE_ETAPE, progress=suivre)
+
+
+# Médias
+
+def _parcourir(root):
+    for dossier, sous_dossiers, fichiers in os.walk(root):
+        sous_dossiers.sort()
+        for nom in sorted(fichiers):
+            chemin = os.path.join(dossier, nom)
+            if os.path.isfile(chemin) and not os.path.islink(chemin):
+                yield os.path.relpath(chemin, root).replace(os.sep, "/"), chemin
+
+
+def instantane_media(source, destination, precedent=None):
+    """
+    Recopie ``source`` dans ``destination`` en liant les fichiers inchangés
+    depuis la sauvegarde ``precedent`` (``(répertoire, manifeste)``).
+    Retourne ``(fichiers, stats)``.
+    """
+    anciens, dossier_precedent = {}, None
+    if precedent:
+        dossier_precedent, manifeste = precedent
+        anciens = manifeste.get("media", {})
+    par_contenu = {sha: nom for nom, (_taille, _mtime, sha) in anciens.items()}
+
+    fichiers = {}
+    stats = {"fichiers": 0, "lies": 0, "copies": 0, "octets_copies": 0}
+    for nom, chemin in _parcourir(source):
+        stat = os.stat(chemin)
+        cible = os.path.join(destination, nom)
+        os.makedirs(os.path.dirname(cible), exist_ok=True)
+        stats["fichiers"] += 1
+
+        ancien = anciens.get(nom)
+        if ancien and ancien[0] == stat.st_size and ancien[1] == stat.st_mtime_ns:
+            # Inchangé : lien vers la copie précédente, empreinte reprise
+            sha = ancien[2]
+            lie = _lier_ou_copier(os.path.join(dossier_precedent, MEDIA_DIR, nom), chemin, cible)
+        else:
+            sha = _sha256(chemin)
+            existant = par_contenu.get(sha)
+            if existant:
+                # Même contenu sous un autre nom (fichier déplacé ou renommé)
+                lie = _lier_ou_copier(os.path.join(dossier_precedent, MEDIA_DIR, existant), chemin, cible)
+            else:
+                lie = _lier_ou_copier(None, chemin, cible)
+        if lie:
+            stats["lies"] += 1
+        else:
+            stats["copies"] += 1
+            stats["octets_copies"] += stat.st_size
+        fichiers[nom] = [stat.st_size, stat.st_mtime_ns, sha]
+    return fichiers, stats
+
+
+# Sauvegarde, vérification, restauration, rétention
+
+def sauvegarder(media=True, progression=None):
+    """Crée une sauvegarde complète ; retourne ``(nom, manifeste)``."""
+    os.makedirs(racine(), exist_ok=True)
+    nom = timezone.now().strftime("%Y%m%dT%H%M%SZ")
+    final = os.path.join(racine(), nom)
+    if os.path.exists(final):
+        raise ErreurSauvegarde(f"La sauvegarde {nom} existe déjà")
+    temporaire = final + PARTIAL
+    shutil.rmtree(temporaire, ignore_errors=True)
+    os.makedirs(temporaire)
+
+    precedentes = lister()
+    precedent = None
+    if precedentes:
+        dernier = precedentes[-1]
+        precedent = (os.path.join(racine(), dernier), lire_manifeste(dernier))
+
+    try:
+        base = os.path.join(temporaire, DB_FILE)
+        sauvegarder_base(chemin_base(), base, progression)
+        empreinte = _sha256(base)
+        if precedent and precedent[1]["base"]["sha256"] == empreinte:
+            # Base inchangée depuis la dernière sauvegarde
+            precedente = os.path.join(precedent[0], DB_FILE)
+            os.remove(base)
+            _lier_ou_copier(precedente, precedente, base)
+        manifeste = {
+            "date": timezone.now().isoformat(),
+            "base": {"taille": os.path.getsize(base), "sha256": empreinte},
+            "media": {},
+            "stats": {},
+        }
+        if media:
+            fichiers, stats = instantane_media(
+                str(settings.MEDIA_ROOT), os.path.join(temporaire, MEDIA_DIR), precedent
+            )
+            manifeste["media"] = fichiers
+            manifeste["stats"] = stats
+        with open(os.path.join(temporaire, MANIFEST), "w", encoding="utf-8") as fh:
+            json.dump(manifeste, fh)
+    except BaseException:
+        shutil.rmtree(temporaire, ignore_errors=True)
+        raise
+    os.rename(temporaire, final)
+    return nom, manifeste
+
+
+def verifier(nom, complet=False):
+    """
+    Liste des anomalies de la sauvegarde (vide si elle est saine).
+    ``complet`` recalcule l'empreinte de chaque fichier média.
+    """
+    dossier = os.path.join(racine(), nom)
+    manifeste = lire_manifeste(nom)
+    anomalies = []
+
+    base = os.path.join(dossier, DB_FILE)
+    if not os.path.isfile(base):
+        return [f"{DB_FILE} absent"]
+    if _sha256(base) != manifeste["base"]["sha256"]:
+        anomalies.append(f"{DB_FILE} : empreinte différente")
+    connexion = sqlite3.connect(f"file:{base}?mode=ro", uri=True)
+    try:
+        (resultat,) = connexion.execute("PRAGMA integrity_check").fetchone()
+    finally:
+        connexion.close()
+    if resultat != "ok":
+        anomalies.append(f"{DB_FILE} : {resultat}")
+
+    for fichier, (taille, _mtime, sha) in manifeste.get("media", {}).items():
+        chemin = os.path.join(dossier, MEDIA_DIR, fichier)
+        try:
+            if os.path.getsize(chemin) != taille:
+                anomalies.append(f"{fichier} : taille différente")
+            elif complet and _sha256(chemin) != sha:
+                anomalies.append(f"{fichier} : empreinte différente")
+        except OSError:
+            anomalies.append(f"{fichier} : absent")
+    return anomalies
+
+
+def restaurer(nom, media=True, progression=None):
+    """
+    Remet en place la base (via l'API de sauvegarde, qui attend les verrous
+    des autres connexions) puis les fichiers médias absents ou modifiés.
+    Retourne le nombre de fichiers médias restaurés.
+    """
+    anomalies = verifier(nom)
+    if anomalies:
+        raise ErreurSauvegarde(f"Sauvegarde {nom} invalide : " + "; ".join(anomalies[:5]))
+    dossier = os.path.join(racine(), nom)
+    connections.close_all()
+    sauvegarder_base(os.path.join(dossier, DB_FILE), chemin_base(), progression)
+
+    restaures = 0
+    if media:
+        root = str(settings.MEDIA_ROOT)
+        for fichier, (taille, mtime, _sha) in lire_manifeste(nom).get("media", {}).items():
+            cible = os.path.join(root, fichier)
+            try:
+                stat = os.stat(cible)
+                if stat.st_size == taille and stat.st_mtime_ns == mtime:
+                    continue
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(cible), exist_ok=True)
+            shutil.copy2(os.path.join(dossier, MEDIA_DIR, fichier), cible)
+            restaures += 1
+    return restaures
+
+
+def purger(garder):
+    """Supprime les sauvegardes au-delà des ``garder`` plus récentes."""
+    # Les liens physiques maintiennent les fichiers partagés avec les suivantes
+    anciennes = lister()[:-garder] if garder > 0 else []
+    for nom in anciennes:
+        shutil.rmtree(os.path.join(racine(), nom))
+    # Sauvegardes interrompues (plus d'un jour : aucune n'est en cours)
+    limite = time.time() - 86400
+    for nom in os.listdir(racine()) if os.path.isdir(racine()) else ():
+        chemin = os.path.join(racine(), nom)
+        if nom.endswith(PARTIAL) and os.path.getmtime(chemin) < limite:
+            shutil.rmtree(chemin, ignore_errors=True)
+    return anciennes
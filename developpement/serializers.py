@@ -41,10 +41,16 @@ class TeamMemberSerializer(serializers.ModelSerializer):
 
     def get_photo(self, obj):
         # Retourne l'URL complète de la photo ou None
+        if not obj.photo:
+            return None
+        url = obj.photo.url
         request = self.context.get("request")
-        if obj.photo:
-            return (
-                request.build_absolute_uri(obj.photo.url) if request else obj.photo.url
-            )
-        return None
+        if not request or not url.startswith("/"):
+            return url
+        # L'hôte est résolu une seule fois et partagé par toute la liste
+        base_url = self.context.get("_base_url")
+        if base_url is None:
+            base_url = request.build_absolute_uri("/").rstrip("/")
+            self.context["_base_url"] = base_url
+        return base_url + url
     
\ No newline at end of file
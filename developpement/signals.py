@@ -0,0 +1,175 @@
+# developpement/signals.py
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .analytics import invalider_statistiques
+from .candidat import invalider_candidat
+from .equipe import invalider_profils
+from .catalog import bump_catalog_version
+from .live import compteurs, delta, publier, serialiser_inscription
+from .models import (
+    Inscription,
+    TeamMember,
+    Expertise,
+    Formation,
+    UE,
+    ECUE,
+    ProgrammeFormation,
+    ModuleFormation,
+    MarquettePedagogique,
+)
+
+CATALOG_MODELS = (
+    Formation,
+    UE,
+    ECUE,
+    ProgrammeFormation,
+    ModuleFormation,
+    MarquettePedagogique,
+)
+
+
+def invalider_catalogue(sender, **kwargs):
+    """Toute modification du catalogue invalide la version en cache."""
+    bump_catalog_version()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(
+        invalider_catalogue, sender=model, dispatch_uid=f"catalog_save_{model.__name__}"
+    )
+    post_delete.connect(
+        invalider_catalogue, sender=model, dispatch_uid=f"catalog_delete_{model.__name__}"
+    )
+
+
+@receiver(m2m_changed, sender=Formation.ues.through)
+@receiver(m2m_changed, sender=ProgrammeFormation.modules.through)
+def invalider_catalogue_m2m(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalog_version()
+
+
+@receiver(post_save, sender=Inscription)
+@receiver(post_delete, sender=Inscription)
+def invalider_contexte_candidat(sender, instance, **kwargs):
+    invalider_candidat(instance.user_id)
+
+
+# Champs qui déterminent le seau d'une inscription dans les séries
+CHAMPS_SERIES = ("statut", "formation", "sexe", "serie_bac", "date_inscription")
+_INCONNU = object()
+
+
+def _etat_live(instance):
+    # Lecture directe de __dict__ : ne charge pas les champs différés
+    return instance.__dict__.get("statut"), instance.__dict__.get("formation")
+
+
+def _etat_series(instance):
+    return tuple(instance.__dict__.get(champ, _INCONNU) for champ in CHAMPS_SERIES)
+
+
+@receiver(post_init, sender=Inscription)
+def memoriser_etat_inscription(sender, instance, **kwargs):
+    instance._etat_live = _etat_live(instance)
+    instance._etat_series = _etat_series(instance)
+
+
+@receiver(post_save, sender=Inscription)
+def invalider_series(sender, instance, created, update_fields=None, **kwargs):
+    # Une création ne touche que la période en cours, jamais mise en cache ;
+    # une modification qui ne change pas de seau ne change aucune série
+    etat, ancien = _etat_series(instance), instance._etat_series
+    instance._etat_series = etat
+    if created or (update_fields is not None and not set(update_fields) & set(CHAMPS_SERIES)):
+        return
+    if etat != ancien or _INCONNU in ancien:
+        invalider_statistiques()
+
+
+@receiver(post_delete, sender=Inscription)
+def invalider_series_suppression(sender, instance, **kwargs):
+    invalider_statistiques()
+
+
+@receiver(post_save, sender=Inscription)
+def publier_inscription(sender, instance, created, **kwargs):
+    statut, formation = _etat_live(instance)
+    ancien_statut, ancienne_formation = instance._etat_live
+    instance._etat_live = (statut, formation)
+    if created:
+        publier(
+            "creation",
+            inscription=serialiser_inscription(instance),
+            delta=delta(1, {statut: 1}, {formation: 1}),
+        )
+    elif ancien_statut is None or ancienne_formation is None:
+        # État initial inconnu (champs différés) : compteurs complets
+        publier(
+            "modification",
+            inscription=serialiser_inscription(instance),
+            compteurs=compteurs(),
+        )
+    elif (ancien_statut, ancienne_formation) != (statut, formation):
+        publier(
+            "modification",
+            inscription=serialiser_inscription(instance),
+            delta=delta(
+                statuts={ancien_statut: -1, statut: 1} if ancien_statut != statut else {},
+                formations=(
+                    {ancienne_formation: -1, formation: 1}
+                    if ancienne_formation != formation else {}
+                ),
+            ),
+        )
+
+
+@receiver(post_delete, sender=Inscription)
+def publier_suppression_inscription(sender, instance, **kwargs):
+    publier(
+        "suppression",
+        id=instance.pk,
+        delta=delta(-1, {instance.statut: -1}, {instance.formation: -1}),
+    )
+
+
+@receiver(m2m_changed, sender=TeamMember.expertises.through)
+def toucher_membre_expertises(sender, instance, action, reverse, pk_set, **kwargs):
+    """Les expertises ne modifient pas ``updated_at`` : on le met à jour ici."""
+    if action == "pre_clear" and reverse:
+        # Après le clear, plus rien ne relie l'expertise à ses membres
+        instance._membres_avant_clear = list(instance.team_members.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        members = TeamMember.objects.filter(pk=instance.pk)
+    elif action == "post_clear":
+        members = TeamMember.objects.filter(pk__in=instance.__dict__.pop("_membres_avant_clear", []))
+    else:
+        members = TeamMember.objects.filter(pk__in=pk_set or ())
+    members.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Expertise)
+def toucher_membres_expertise(sender, instance, created, **kwargs):
+    if not created:
+        instance.team_members.update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Expertise)
+def toucher_membres_expertise_supprimee(sender, instance, **kwargs):
+    # La suppression en cascade des liens n'émet pas m2m_changed
+    instance.team_members.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=Expertise)
+@receiver(post_delete, sender=Expertise)
+@receiver(m2m_changed, sender=TeamMember.expertises.through)
+def invalider_profils_membres(sender, action=None, **kwargs):
+    if action is None or action in ("post_add", "post_remove", "post_clear"):
+        invalider_profils()
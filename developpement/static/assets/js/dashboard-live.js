@@ -0,0 +1,81 @@
+/**
+ * Mises à jour en direct du tableau de bord administrateur.
+ *
+ * Se connecte au flux WebSocket des inscriptions, tient les compteurs à jour
+ * à partir des deltas reçus et met à jour les éléments [data-compteur="..."]
+ * ("total", "formations" ou un code de statut : "E", "V", "R").
+ */
+(function () {
+  "use strict";
+
+  function appliquerDelta(compteurs, delta) {
+    compteurs.total += delta.total || 0;
+    Object.entries(delta.statuts || {}).forEach(([statut, n]) => {
+      compteurs.statuts[statut] = (compteurs.statuts[statut] || 0) + n;
+    });
+    Object.entries(delta.formations || {}).forEach(([formation, n]) => {
+      const valeur = (compteurs.formations[formation] || 0) + n;
+      if (valeur > 0) {
+        compteurs.formations[formation] = valeur;
+      } else {
+        delete compteurs.formations[formation];
+      }
+    });
+  }
+
+  function afficherCompteurs(compteurs) {
+    document.querySelectorAll("[data-compteur]").forEach((element) => {
+      const cle = element.dataset.compteur;
+      let valeur;
+      if (cle === "total") {
+        valeur = compteurs.total;
+      } else if (cle === "formations") {
+        valeur = Object.keys(compteurs.formations).length;
+      } else {
+        valeur = compteurs.statuts[cle] || 0;
+      }
+      element.textContent = valeur;
+    });
+  }
+
+  window.connecterTableauDeBord = function (options) {
+    const onEvenement = options.onEvenement || function () {};
+    const onCompteurs = options.onCompteurs || function () {};
+    let compteurs = null;
+    let delai = 1000;
+
+    function connecter() {
+      const protocole = window.location.protocol === "https:" ? "wss://" : "ws://";
+      const socket = new WebSocket(protocole + window.location.host + "/ws/administrateur/dashboard/");
+
+      socket.onopen = () => { delai = 1000; };
+
+      socket.onmessage = (message) => {
+        const data = JSON.parse(message.data);
+        if (data.compteurs) {
+          compteurs = data.compteurs;
+        } else if (data.delta && compteurs) {
+          appliquerDelta(compteurs, data.delta);
+        }
+        if (compteurs) {
+          afficherCompteurs(compteurs);
+          onCompteurs(compteurs);
+        }
+        if (data.event !== "instantane") {
+          onEvenement(data);
+        }
+      };
+
+      // Reconnexion progressive ; l'instantané renvoyé à la connexion
+      // resynchronise les compteurs
+      socket.onclose = () => {
+        setTimeout(connecter, delai);
+        delai = Math.min(delai * 2, 30000);
+      };
+    }
+
+    if ("WebSocket" in window) {
+      connecter();
+    }
+  };
+})();
@@ -0,0 +1,26 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from developpement.assets import bundle_path, load_manifest
+
+register = template.Library()
+
+_TAGS = {
+    "css": '<link rel="stylesheet" href="{}">',
+    "js": '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def asset_bundle(name, kind):
+    """
+    Inclut un bundle construit par ``build_assets``. Tant que le bundle n'a
+    pas été construit, les fichiers sources sont inclus séparément.
+    """
+    if name in load_manifest():
+        urls = [static(bundle_path(name, kind))]
+    else:
+        urls = [static(path) for path in settings.ASSET_BUNDLES[name].get(kind, [])]
+    return format_html_join("\n", _TAGS[kind], ((url,) for url in urls))
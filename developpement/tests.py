@@ -1,3 +1,460 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.exceptions import PermissionDenied
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from institut.cache import SQLiteCache, bump_namespace, namespace_version
+
+from .candidat import CANDIDAT_NAMESPACE
+from .catalog import get_catalog, get_catalog_version
+from .decorators import limiter_debit
+from .doublons import Fiche, code_phonetique, detecter, jaro_winkler, score
+from .equipe import MEMBRES_NAMESPACE
+from .models import (
+    ConvocationExamen, DoublonSuspect, Formation, Inscription, PlaceExamen, Presence, SalleExamen,
+    StatutHistory, TeamMember, UE,
+)
+from .presences import MAX_JETONS, jeton, lire_jeton, pointer
+from .transfert import exporter, importer
+from .uploads import FichierVerifieUploadHandler
+from .workflow import TransitionInvalide, changer_statut
+
+# Cache propre aux tests : le fichier partagé des workers n'est pas touché
+CACHE_TESTS = {
+    "default": {
+        "BACKEND": "institut.cache.SQLiteCache",
+        "LOCATION": os.path.join(tempfile.mkdtemp(prefix="institut-tests-"), "cache.sqlite3"),
+        "OPTIONS": {"LOCK_TIMEOUT": 1},
+    }
+}
+
+
+def creer_inscription(numero, **champs):
+    """Inscription complète (documents fictifs) ; ``champs`` remplace les valeurs."""
+    user = get_user_model().objects.create_user(username=f"candidat{numero}", password="motdepasse")
+    valeurs = {
+        "user": user, "nom": f"Nom{numero}", "prenom": f"Prenom{numero}", "sexe": "M",
+        "date_naissance": datetime.date(2000, 1, 1), "lieu_naissance": "Abidjan",
+        "email": f"candidat{numero}@example.com", "email_confirmation": f"candidat{numero}@example.com",
+        "telephone": f"07{numero:08d}", "cmu": f"CMU{numero}", "cni": f"CNI{numero}",
+        "annee_obtentionbac": 2018, "mention_bac": "P", "numero_bac": f"BAC{numero}",
+        "ecole_diplomebac": "Lycée", "annee_obtentionlicence": 2021,
+        "photo_identite": "photos/p.jpg", "bac_scan": "bac/b.pdf",
+        "diplome_scan": "diplomes/d.pdf", "extrait_naissance": "extraits/e.pdf",
+        "formation": "Licence",
+    }
+    valeurs.update(champs)
+    return Inscription.objects.create(**valeurs)
+
+
+# Hachage rapide : les tests créent beaucoup de comptes
+@override_settings(CACHES=CACHE_TESTS, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+
+class CatalogueTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.formation = Formation.objects.create(nom="Licence", duree=120, cout="150000.00")
+        self.formation.ues.add(UE.objects.create(nom="Statistique", code="STA1"))
+
+    def test_catalogue_servi_depuis_le_cache(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            catalogue = get_catalog()
+        self.assertEqual(catalogue["formations"][0]["ues"][0]["code"], "STA1")
+
+    def test_modification_invalide_le_catalogue(self):
+        version = get_catalog_version()
+        etag = get_catalog()["etag"]
+        self.formation.nom = "Licence professionnelle"
+        self.formation.save()
+        self.assertGreater(get_catalog_version(), version)
+        self.assertNotEqual(get_catalog()["etag"], etag)
+        self.assertEqual(get_catalog()["formations"][0]["nom"], "Licence professionnelle")
+
+    def test_ajout_ue_invalide_le_catalogue(self):
+        version = get_catalog_version()
+        self.formation.ues.add(UE.objects.create(nom="Algèbre", code="ALG1"))
+        self.assertGreater(get_catalog_version(), version)
+        self.assertEqual(len(get_catalog()["formations"][0]["ues"]), 2)
+
+    def test_api_catalogue(self):
+        response = self.client.get("/api/catalogue/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["formations"][0]["nom"], "Licence")
+
+
+class WorkflowTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_user("admin", password="motdepasse", is_staff=True)
+        self.inscriptions = [creer_inscription(i) for i in range(3)]
+
+    def test_transition_groupee_historisee(self):
+        ids = [inscription.pk for inscription in self.inscriptions]
+        modifies = changer_statut(ids, "V", user=self.admin, notifier=False)
+        self.assertEqual(sorted(modifies), sorted(ids))
+        self.assertEqual(Inscription.objects.filter(statut="V").count(), 3)
+        self.assertEqual(
+            StatutHistory.objects.filter(ancien_statut="E", nouveau_statut="V", modifie_par=self.admin).count(), 3
+        )
+
+    def test_statut_de_depart_non_autorise_ignore(self):
+        valide = self.inscriptions[0]
+        changer_statut([valide.pk], "V", notifier=False)
+        # V -> R interdit : seules les inscriptions en attente sont rejetées
+        modifies = changer_statut([i.pk for i in self.inscriptions], "R", notifier=False)
+        self.assertNotIn(valide.pk, modifies)
+        self.assertEqual(len(modifies), 2)
+        valide.refresh_from_db()
+        self.assertEqual(valide.statut, "V")
+
+    def test_statut_inconnu(self):
+        with self.assertRaises(TransitionInvalide):
+            changer_statut([self.inscriptions[0].pk], "X")
+
+    def test_visiteur_anonyme_refuse(self):
+        with self.assertRaises(PermissionDenied):
+            changer_statut([self.inscriptions[0].pk], "V", user=AnonymousUser())
+        self.assertFalse(StatutHistory.objects.exists())
+
+
+class FichierVerifieUploadHandlerTests(SimpleTestCase):
+    PDF = b"%PDF-1.4\n" + b"0" * 2000
+
+    def envoyer(self, contenu, nom="document.pdf", **options):
+        requete = RequestFactory().post("/", {"fichier": SimpleUploadedFile(nom, contenu)})
+        handler = FichierVerifieUploadHandler(requete, **options)
+        requete.upload_handlers = [handler]
+        return requete.FILES, handler
+
+    def test_fichier_accepte_type_et_empreinte(self):
+        fichiers, handler = self.envoyer(self.PDF)
+        fichier = fichiers["fichier"]
+        self.assertEqual(handler.erreurs, [])
+        self.assertEqual(fichier.content_type, "application/pdf")
+        self.assertEqual(fichier.sha256, hashlib.sha256(self.PDF).hexdigest())
+        self.assertEqual(fichier.read(), self.PDF)
+
+    def test_type_reel_controle(self):
+        # Exécutable renommé en .pdf : le nom et le type annoncé ne comptent pas
+        fichiers, handler = self.envoyer(b"MZ\x90\x00" + b"0" * 100)
+        self.assertNotIn("fichier", fichiers)
+        self.assertIn("type de fichier non autorisé", handler.erreurs[0])
+
+    def test_taille_maximale(self):
+        fichiers, handler = self.envoyer(self.PDF, max_size=1000)
+        self.assertNotIn("fichier", fichiers)
+        self.assertIn("taille maximale", handler.erreurs[0])
+
+    def test_types_par_champ(self):
+        fichiers, handler = self.envoyer(self.PDF, types={"photo": ("image/jpeg",)})
+        self.assertNotIn("fichier", fichiers)
+        self.assertEqual(len(handler.erreurs), 1)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        dossier = tempfile.mkdtemp(prefix="institut-tests-")
+        self.cache = SQLiteCache(
+            os.path.join(dossier, "cache.sqlite3"), {"OPTIONS": {"LOCK_TIMEOUT": 1, "MAX_ENTRIES": 50}}
+        )
+
+    def test_operations_de_base(self):
+        self.cache.set("a", {"x": 1})
+        self.assertEqual(self.cache.get("a"), {"x": 1})
+        self.assertFalse(self.cache.add("a", 2))
+        self.assertTrue(self.cache.add("b", 2))
+        self.assertEqual(self.cache.incr("b", 3), 5)
+        self.cache.set("court", 1, timeout=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("court"))
+        self.assertTrue(self.cache.add("court", 2))
+
+    def test_taille_bornee(self):
+        for i in range(200):
+            self.cache.set(f"cle{i}", i)
+        (nombre,) = self.cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()
+        # Nettoyage toutes les CULL_EVERY écritures
+        self.assertLessEqual(nombre, 50)
+
+    def test_espaces_de_noms(self):
+        self.assertEqual(namespace_version("ns", self.cache), 1)
+        self.assertEqual(bump_namespace("ns", self.cache), 2)
+        self.assertEqual(namespace_version("ns", self.cache), 2)
+
+    def test_get_or_set_calcule_une_seule_fois(self):
+        appels = []
+
+        def lent():
+            appels.append(1)
+            time.sleep(0.2)
+            return "valeur"
+
+        resultats = []
+        threads = [
+            threading.Thread(target=lambda: resultats.append(self.cache.get_or_set("k", lent)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(resultats, ["valeur"] * 4)
+        self.assertEqual(len(appels), 1)
+        self.assertIsNone(self.cache.get("k:lock"))
+
+    def test_get_or_set_verrou_d_un_autre_processus(self):
+        self.cache.add("k:lock", 12345, 30)
+        # Délai dépassé : valeur calculée pour l'appelant, rien n'est écrit
+        self.assertEqual(self.cache.get_or_set("k", lambda: "calcul"), "calcul")
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.get("k:lock"), 12345)
+
+    def test_verrou_d_un_autre_non_libere(self):
+        def calcul():
+            # Notre verrou a expiré et un autre processus l'a repris
+            self.cache.set("k:lock", 999, 30)
+            return "valeur"
+
+        self.assertEqual(self.cache.get_or_set("k", calcul), "valeur")
+        self.assertEqual(self.cache.get("k:lock"), 999)
+
+
+class TransfertTests(CacheTestCase):
+    def test_import_invalide_les_caches_derives(self):
+        TeamMember.objects.create(first_name="Awa", last_name="Koné", category="recherche")
+        repertoire = tempfile.mkdtemp(prefix="institut-tests-")
+        exporter(repertoire, [TeamMember])
+        versions = (
+            namespace_version(MEMBRES_NAMESPACE), namespace_version(CANDIDAT_NAMESPACE), get_catalog_version()
+        )
+        importer(repertoire, ignore_conflicts=True)
+        apres = (
+            namespace_version(MEMBRES_NAMESPACE), namespace_version(CANDIDAT_NAMESPACE), get_catalog_version()
+        )
+        self.assertTrue(all(b > a for a, b in zip(versions, apres)))
+
+
+class SeauxAJetonsTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = SQLiteCache(
+            os.path.join(tempfile.mkdtemp(prefix="institut-tests-"), "cache.sqlite3"), {}
+        )
+
+    def test_rafale_puis_attente(self):
+        for _ in range(3):
+            self.assertTrue(self.cache.take_token("seau", 3, 1 / 60)[0])
+        accepte, attente = self.cache.take_token("seau", 3, 1 / 60)
+        self.assertFalse(accepte)
+        self.assertAlmostEqual(attente, 60, delta=1)
+
+    def test_tout_ou_rien(self):
+        self.cache.take_token("plein", 1, 1 / 3600)
+        accepte, _attente = self.cache.take_tokens([("libre", 5, 1), ("plein", 1, 1 / 3600)])
+        self.assertFalse(accepte)
+        # Refus : aucun jeton n'a été pris dans le seau qui en avait
+        for _ in range(5):
+            self.assertTrue(self.cache.take_token("libre", 5, 1e-6)[0])
+        self.assertFalse(self.cache.take_token("libre", 5, 1e-6)[0])
+
+
+@override_settings(THROTTLE_RATES={"essai": {"ip": "3/h", "compte": "2/h"}}, THROTTLE_TRUSTED_PROXIES=0)
+class LimiterDebitTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.vue = limiter_debit("essai", compte="username")(lambda request: HttpResponse("ok"))
+        self.factory = RequestFactory()
+
+    def envoyer(self, username="alice", ip="10.0.0.1"):
+        return self.vue(self.factory.post("/", {"username": username}, REMOTE_ADDR=ip))
+
+    def test_limite_par_compte(self):
+        self.assertEqual(self.envoyer().status_code, 200)
+        self.assertEqual(self.envoyer(ip="10.0.0.2").status_code, 200)
+        # Même compte depuis une autre adresse : toujours limité
+        response = self.envoyer(ip="10.0.0.3")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_limite_par_adresse(self):
+        for username in ("a", "b", "c"):
+            self.assertEqual(self.envoyer(username).status_code, 200)
+        self.assertEqual(self.envoyer("d").status_code, 429)
+
+    def test_refus_sans_consommation(self):
+        self.envoyer("a")
+        self.envoyer("a")
+        self.assertEqual(self.envoyer("a").status_code, 429)
+        # Le refus n'a pas pris de jeton au seau de l'adresse
+        self.assertEqual(self.envoyer("b").status_code, 200)
+
+    def test_get_non_limite(self):
+        for _ in range(5):
+            self.assertEqual(self.vue(self.factory.get("/", REMOTE_ADDR="10.0.0.1")).status_code, 200)
+
+
+class RepartitionSallesTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        ConvocationExamen.objects.create(
+            formation="Licence", date_examen=datetime.date(2026, 7, 1),
+            heure_examen=datetime.time(8, 0), lieu_examen="Campus",
+        )
+        self.petite = SalleExamen.objects.create(nom="A", capacite=2, ordre=1)
+        self.grande = SalleExamen.objects.create(nom="B", capacite=4, ordre=2)
+        # Tri sans accents ni casse : Abou, Émile, Koné, yao, Zadi
+        for numero, nom in enumerate(["Zadi", "Émile", "Abou", "yao", "Koné"]):
+            creer_inscription(numero, nom=nom, statut="V")
+        creer_inscription(9, nom="Attente")  # non validée : pas de place
+
+    def places(self):
+        return [
+            (nom.upper(), salle, numero)
+            for nom, salle, numero in PlaceExamen.objects.order_by("salle__ordre", "numero")
+            .values_list("inscription__nom", "salle__nom", "numero")
+        ]
+
+    def test_repartition_dans_l_ordre(self):
+        call_command("allocate_rooms", stdout=io.StringIO())
+        self.assertEqual(self.places(), [
+            ("ABOU", "A", 1), ("ÉMILE", "A", 2), ("KONÉ", "B", 1), ("YAO", "B", 2), ("ZADI", "B", 3),
+        ])
+
+    def test_relance_sans_changement_puis_place_liberee(self):
+        call_command("allocate_rooms", stdout=io.StringIO())
+        sortie = io.StringIO()
+        call_command("allocate_rooms", stdout=sortie)
+        self.assertIn("0 places attribuées, 5 inchangées", sortie.getvalue())
+        Inscription.objects.filter(cni="CNI4").update(statut="R")  # Koné
+        call_command("allocate_rooms", stdout=io.StringIO())
+        self.assertEqual([place[0] for place in self.places()], ["ABOU", "ÉMILE", "YAO", "ZADI"])
+
+    def test_places_insuffisantes(self):
+        with self.assertRaisesMessage(CommandError, "5 candidats pour 2 places"):
+            call_command("allocate_rooms", salles=["A"], stdout=io.StringIO())
+        self.assertFalse(PlaceExamen.objects.exists())
+
+    def test_convocation_manquante(self):
+        with self.assertRaisesMessage(CommandError, "Master"):
+            call_command("allocate_rooms", formations=["Master"], stdout=io.StringIO())
+
+
+@override_settings(CHECKIN_SIGNING_KEY="cle-de-test")
+class PointageTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.inscription = creer_inscription(1, statut="V")
+
+    def test_jeton_signe(self):
+        self.assertEqual(lire_jeton(jeton(self.inscription)), (self.inscription.pk, "Licence"))
+        identifiant, formation, signe = jeton(self.inscription).split(":")
+        # Autre candidat, autre formation ou signature tronquée : refusés
+        self.assertIsNone(lire_jeton(f"{int(identifiant) + 1}:{formation}:{signe}"))
+        self.assertIsNone(lire_jeton(f"{identifiant}:Master:{signe}"))
+        self.assertIsNone(lire_jeton(f"{identifiant}:{formation}:{signe[:-1]}"))
+        signe = jeton(self.inscription)
+        with self.settings(CHECKIN_SIGNING_KEY="autre-cle"):
+            self.assertIsNone(lire_jeton(signe))
+
+    def test_statuts(self):
+        en_attente = creer_inscription(2)
+        resultats = pointer([
+            jeton(self.inscription), jeton(self.inscription), jeton(en_attente), "1:Licence:faux",
+        ], poste="Porte A")
+        self.assertEqual(
+            [r["statut"] for r in resultats], ["present", "deja_pointe", "non_valide", "invalide"]
+        )
+        self.assertEqual(Presence.objects.get().poste, "Porte A")
+        self.assertEqual(pointer([jeton(self.inscription)])[0]["statut"], "deja_pointe")
+        self.assertEqual(
+            pointer([jeton(self.inscription)], formation="Master")[0]["statut"], "autre_formation"
+        )
+
+    def test_pointage_simultane_par_un_autre_poste(self):
+        autre = timezone.now() - datetime.timedelta(seconds=5)
+        bulk_create = Presence.objects.bulk_create
+
+        def concurrent(objets, **kwargs):
+            # L'autre poste enregistre le candidat entre la lecture et l'insertion
+            Presence.objects.create(inscription=self.inscription, pointe_le=autre, poste="Porte B")
+            return bulk_create(objets, **kwargs)
+
+        with mock.patch.object(Presence.objects, "bulk_create", side_effect=concurrent):
+            resultat = pointer([jeton(self.inscription)], poste="Porte A")[0]
+        self.assertEqual(resultat["statut"], "deja_pointe")
+        self.assertEqual(resultat["pointe_le"], autre.isoformat())
+        self.assertEqual(Presence.objects.get().poste, "Porte B")
+
+    def test_lot_trop_grand(self):
+        with self.assertRaises(ValueError):
+            pointer([jeton(self.inscription)] * (MAX_JETONS + 1))
+        self.assertFalse(Presence.objects.exists())
+
+
+class DoublonsTests(CacheTestCase):
+    def test_jaro_winkler_valeurs_de_reference(self):
+        self.assertAlmostEqual(jaro_winkler("martha", "marhta"), 0.961, places=3)
+        self.assertAlmostEqual(jaro_winkler("dwayne", "duane"), 0.840, places=3)
+        self.assertAlmostEqual(jaro_winkler("dixon", "dicksonx"), 0.813, places=3)
+        self.assertEqual(jaro_winkler("abc", "abc"), 1.0)
+        self.assertEqual(jaro_winkler("abc", ""), 0.0)
+
+    def test_code_phonetique(self):
+        self.assertEqual(code_phonetique("Kouamé"), code_phonetique("Kwame"))
+        self.assertEqual(code_phonetique("Philippe"), code_phonetique("FILIPE"))
+        self.assertNotEqual(code_phonetique("Konan"), code_phonetique("Touré"))
+
+    def fiche(self, pk, nom, prenom, naissance=datetime.date(2000, 5, 3), telephone="0701020304", email=""):
+        return Fiche(pk, nom, prenom, naissance, "Abidjan", telephone, email, 2018)
+
+    def test_score(self):
+        reference = self.fiche(1, "Kouassi", "Aya Marie")
+        inverse, motifs = score(reference, self.fiche(2, "Aya Marie", "KOUASSI"))
+        self.assertGreaterEqual(inverse, 0.95)
+        self.assertIn("même nom", motifs)
+        faute, _motifs = score(reference, self.fiche(3, "Kouasi", "Aya Marie", datetime.date(2000, 3, 5)))
+        self.assertGreaterEqual(faute, 0.8)
+        homonyme, _motifs = score(
+            reference, self.fiche(4, "Kouassi", "Aya Marie", datetime.date(1998, 11, 20), "0500000000")
+        )
+        self.assertLess(homonyme, 0.8)
+
+    def test_detection_complete_puis_incrementale(self):
+        creer_inscription(1, nom="Kouassi", prenom="Aya")
+        creer_inscription(2, nom="Traoré", prenom="Moussa", date_naissance=datetime.date(1999, 2, 1))
+        creer_inscription(
+            3, nom="Zadi", prenom="Paul", date_naissance=datetime.date(1990, 1, 1), annee_obtentionbac=2008
+        )
+        stats = detecter()
+        self.assertEqual(stats["suspects"], 0)
+
+        doublon = creer_inscription(4, nom="Aya", prenom="Kouassi")  # nom et prénom inversés
+        with mock.patch("developpement.doublons.Fiche", wraps=Fiche) as fiches:
+            stats = detecter(stats["dernier"])
+        # Ancienne inscription d'autres années (naissance, bac) : jamais lue
+        self.assertEqual(fiches.call_count, 3)
+        self.assertEqual(stats["nouvelles"], 1)
+        suspect = DoublonSuspect.objects.get()
+        self.assertEqual(suspect.autre_id, doublon.pk)
+        self.assertIn("même nom", suspect.motifs)
+        # Relance complète : aucune paire en double
+        detecter()
+        self.assertEqual(DoublonSuspect.objects.count(), 1)
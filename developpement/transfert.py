@@ -0,0 +1,360 @@
+# developpement/transfert.py
+"""
+Export et import des données du site en flux NDJSON (``export_site`` /
+``import_site``).
+
+Chaque modèle est écrit dans son propre fichier : une ligne d'en-tête
+(``{"model": ..., "fields": [...]}``) puis une ligne par objet (liste des
+valeurs, clés primaires comprises). Les lignes sont lues et écrites au fil
+de l'eau, sans jamais charger une table entière en mémoire ; l'import
+insère par lots avec ``bulk_create`` (pas de ``save()`` ni de signaux),
+dans l'ordre des dépendances entre modèles.
+
+Les permissions sont référencées par clé naturelle (leurs identifiants
+diffèrent d'une base à l'autre). Les fichiers médias référencés peuvent
+être joints dans une archive tar écrite en flux.
+"""
+import datetime
+import gzip
+import json
+import os
+import tarfile
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .analytics import invalider_statistiques
+from .candidat import invalider_candidats
+from .catalog import bump_catalog_version
+from .equipe import invalider_profils
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+MEDIA_ARCHIVE = "media.tar"
+
+# Modèles exportés par défaut (applications entières ou modèles isolés)
+MODELES_PAR_DEFAUT = ("auth.Group", "developpement", "administrateur")
+
+# Référencés par clé naturelle plutôt que par identifiant
+CLES_NATURELLES = (Permission,)
+
+# Valeurs que JSON ne restitue pas avec leur type
+TYPES_A_CONVERTIR = (
+    models.DateField, models.TimeField, models.DecimalField,
+    models.UUIDField, models.DurationField,
+)
+
+
+class ErreurTransfert(Exception):
+    pass
+
+
+class _Encodeur(DjangoJSONEncoder):
+    # DjangoJSONEncoder tronque les microsecondes (format ECMA-262)
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _lots(iterable, taille):
+    iterator = iter(iterable)
+    while lot := list(islice(iterator, taille)):
+        yield lot
+
+
+def resoudre_modeles(labels=None, exclus=()):
+    """Modèles désignés par ``app_label`` ou ``app_label.Model``, tables M2M comprises."""
+    modeles = []
+    for label in labels or MODELES_PAR_DEFAUT:
+        try:
+            if "." in label:
+                modeles.append(apps.get_model(label))
+            else:
+                modeles.extend(apps.get_app_config(label).get_models())
+        except LookupError as e:
+            raise ErreurTransfert(str(e))
+    # Tables intermédiaires créées automatiquement pour les ManyToMany
+    for model in list(modeles):
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            if through._meta.auto_created and through not in modeles:
+                modeles.append(through)
+    exclus = {apps.get_model(label) for label in exclus}
+    return [
+        model for model in modeles
+        if model not in exclus and not model._meta.proxy and model._meta.managed
+    ]
+
+
+def ordre_dependances(modeles):
+    """Tri topologique : un modèle vient après ceux qu'il référence."""
+    restants = {model: {
+        field.related_model
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model in modeles and field.related_model is not model
+    } for model in modeles}
+    ordre = []
+    while restants:
+        prets = [model for model, deps in restants.items() if not deps - set(ordre)]
+        if not prets:
+            cycle = ", ".join(model._meta.label for model in restants)
+            raise ErreurTransfert(f"Dépendances circulaires entre : {cycle}")
+        for model in sorted(prets, key=lambda model: model._meta.label):
+            ordre.append(model)
+            del restants[model]
+    return ordre
+
+
+def _nom_fichier(model, compresser):
+    return f"{model._meta.label_lower}.ndjson" + (".gz" if compresser else "")
+
+
+def _ouvrir(chemin, mode):
+    if chemin.endswith(".gz"):
+        return gzip.open(chemin, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(chemin, mode, encoding="utf-8")
+
+
+# Export
+
+def exporter(repertoire, modeles, batch_size=2000, media=False, compresser=False, log=None):
+    """Écrit un fichier par modèle et ``manifest.json`` ; retourne le manifeste."""
+    log = log or (lambda message: None)
+    os.makedirs(repertoire, exist_ok=True)
+    archive = None
+    fichiers_media = set()
+    if media:
+        archive = tarfile.open(os.path.join(repertoire, MEDIA_ARCHIVE), mode="w|")
+    manifeste = {
+        "version": FORMAT_VERSION,
+        "date": timezone.now().isoformat(),
+        "modeles": [],
+        "media": MEDIA_ARCHIVE if media else None,
+    }
+    try:
+        for model in ordre_dependances(modeles):
+            nom = _nom_fichier(model, compresser)
+            total = _exporter_modele(
+                model, os.path.join(repertoire, nom), batch_size, archive, fichiers_media
+            )
+            manifeste["modeles"].append({"model": model._meta.label, "fichier": nom, "total": total})
+            log(f"{model._meta.label} : {total}")
+    finally:
+        if archive is not None:
+            archive.close()
+
+    with open(os.path.join(repertoire, MANIFEST), "w", encoding="utf-8") as fh:
+        json.dump(manifeste, fh, indent=2)
+    return manifeste
+
+
+def _exporter_modele(model, chemin, batch_size, archive, fichiers_media):
+    fields = model._meta.concrete_fields
+    colonnes = []
+    naturels = {}
+    for index, field in enumerate(fields):
+        if field.is_relation and issubclass(field.related_model, CLES_NATURELLES):
+            # Jointure sur la cible : clé naturelle lue dans la même requête
+            cible = field.related_model
+            colonnes.extend(f"{field.name}__{part}" for part in _chemins_naturels(cible))
+            naturels[index] = len(_chemins_naturels(cible))
+        else:
+            colonnes.append(field.attname)
+    fichiers = [i for i, field in enumerate(fields) if isinstance(field, models.FileField)]
+
+    total = 0
+    lignes = model._base_manager.order_by("pk").values_list(*colonnes).iterator(chunk_size=batch_size)
+    with _ouvrir(chemin, "w") as fh:
+        fh.write(json.dumps({"model": model._meta.label, "fields": [f.attname for f in fields]}) + "\n")
+        for brute in lignes:
+            ligne = _regrouper(brute, naturels, len(fields))
+            fh.write(json.dumps(ligne, cls=_Encodeur, ensure_ascii=False) + "\n")
+            total += 1
+            if archive is not None:
+                for index in fichiers:
+                    _archiver(archive, ligne[index], fichiers_media)
+    return total
+
+
+def _chemins_naturels(model):
+    if model is Permission:
+        return ("content_type__app_label", "content_type__model", "codename")
+    raise ErreurTransfert(f"Clé naturelle non gérée : {model._meta.label}")
+
+
+def _regrouper(brute, naturels, nombre):
+    """Rassemble les colonnes d'une clé naturelle en une seule valeur (liste)."""
+    if not naturels:
+        return list(brute)
+    ligne = []
+    position = 0
+    for index in range(nombre):
+        largeur = naturels.get(index)
+        if largeur:
+            cle = list(brute[position:position + largeur])
+            ligne.append(None if all(part is None for part in cle) else cle)
+            position += largeur
+        else:
+            ligne.append(brute[position])
+            position += 1
+    return ligne
+
+
+def _archiver(archive, nom, deja):
+    if not nom or nom in deja:
+        return
+    deja.add(nom)
+    chemin = os.path.join(settings.MEDIA_ROOT, nom)
+    if os.path.isfile(chemin):
+        archive.add(chemin, arcname=nom, recursive=False)
+
+
+# Import
+
+@contextmanager
+def _sans_dates_automatiques(model):
+    """Conserve les dates exportées (``auto_now``/``auto_now_add`` suspendus)."""
+    champs = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    for field, _now, _now_add in champs:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, now, now_add in champs:
+            field.auto_now, field.auto_now_add = now, now_add
+
+
+def lire_manifeste(repertoire):
+    try:
+        with open(os.path.join(repertoire, MANIFEST), encoding="utf-8") as fh:
+            manifeste = json.load(fh)
+    except OSError as e:
+        raise ErreurTransfert(f"Manifeste illisible : {e}")
+    if manifeste.get("version") != FORMAT_VERSION:
+        raise ErreurTransfert(f"Version de format non gérée : {manifeste.get('version')}")
+    return manifeste
+
+
+def importer(repertoire, batch_size=2000, media=False, ignore_conflicts=False, log=None):
+    """Insère les données exportées par ``exporter`` ; retourne ``{label: total}``."""
+    log = log or (lambda message: None)
+    manifeste = lire_manifeste(repertoire)
+    modeles = [(apps.get_model(entree["model"]), entree) for entree in manifeste["modeles"]]
+
+    if not ignore_conflicts:
+        occupes = [model._meta.label for model, _entree in modeles if model._base_manager.exists()]
+        if occupes:
+            raise ErreurTransfert(
+                "Tables non vides : " + ", ".join(occupes)
+                + " (utiliser --ignore-conflicts pour ignorer les doublons)"
+            )
+
+    totaux = {}
+    with transaction.atomic():
+        for model, entree in modeles:
+            chemin = os.path.join(repertoire, entree["fichier"])
+            totaux[model._meta.label] = _importer_modele(model, chemin, batch_size, ignore_conflicts)
+            log(f"{model._meta.label} : {totaux[model._meta.label]}")
+        # Séquences (PostgreSQL) recalées après insertion de clés explicites
+        sequences = connection.ops.sequence_reset_sql(no_style(), [model for model, _entree in modeles])
+        if sequences:
+            with connection.cursor() as cursor:
+                for sql in sequences:
+                    cursor.execute(sql)
+
+    # bulk_create n'émet pas de signaux : caches dérivés invalidés ici
+    bump_catalog_version()
+    invalider_statistiques()
+    invalider_profils()
+    invalider_candidats()
+
+    if media and manifeste.get("media"):
+        extraire_media(os.path.join(repertoire, manifeste["media"]))
+    return totaux
+
+
+def _importer_modele(model, chemin, batch_size, ignore_conflicts):
+    with _ouvrir(chemin, "r") as fh:
+        entete = json.loads(fh.readline())
+        if entete.get("model") != model._meta.label:
+            raise ErreurTransfert(f"{chemin} : modèle inattendu {entete.get('model')}")
+        fields = [model._meta.get_field(_champ(model, attname)) for attname in entete["fields"]]
+        conversions = [
+            field.to_python if isinstance(field, TYPES_A_CONVERTIR) else None
+            for field in fields
+        ]
+        naturels = {
+            index: _resolveur_naturel(field.related_model)
+            for index, field in enumerate(fields)
+            if field.is_relation and issubclass(field.related_model, CLES_NATURELLES)
+        }
+        attnames = entete["fields"]
+
+        def objets():
+            for numero, texte in enumerate(fh, start=2):
+                valeurs = json.loads(texte)
+                for index, convertir in enumerate(conversions):
+                    if convertir and valeurs[index] is not None:
+                        valeurs[index] = convertir(valeurs[index])
+                for index, resoudre in naturels.items():
+                    valeurs[index] = resoudre(valeurs[index], chemin, numero)
+                yield model(**dict(zip(attnames, valeurs)))
+
+        total = 0
+        with _sans_dates_automatiques(model):
+            for lot in _lots(objets(), batch_size):
+                model._base_manager.bulk_create(lot, ignore_conflicts=ignore_conflicts)
+                total += len(lot)
+    return total
+
+
+def _champ(model, attname):
+    for field in model._meta.concrete_fields:
+        if field.attname == attname:
+            return field.name
+    raise ErreurTransfert(f"{model._meta.label} : champ inconnu {attname}")
+
+
+def _resolveur_naturel(model):
+    if model is not Permission:
+        raise ErreurTransfert(f"Clé naturelle non gérée : {model._meta.label}")
+    index = {
+        (app_label, nom, codename): pk
+        for pk, app_label, nom, codename in Permission.objects.values_list(
+            "pk", "content_type__app_label", "content_type__model", "codename"
+        )
+    }
+
+    def resoudre(cle, chemin, numero):
+        if cle is None:
+            return None
+        try:
+            return index[tuple(cle)]
+        except KeyError:
+            raise ErreurTransfert(f"{chemin}:{numero} : permission inconnue {'.'.join(cle)}")
+
+    return resoudre
+
+
+def extraire_media(chemin, destination=None):
+    """Extrait l'archive en flux dans ``MEDIA_ROOT`` (chemins absolus et ``..`` refusés)."""
+    destination = destination or settings.MEDIA_ROOT
+    total = 0
+    with tarfile.open(chemin, mode="r|") as archive:
+        for membre in archive:
+            if membre.isfile():
+                archive.extract(membre, destination, filter="data")
+                total += 1
+    return total
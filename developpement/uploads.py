@@ -0,0 +1,153 @@
+# developpement/uploads.py
+"""
+Contrôle des fichiers envoyés pendant la réception du corps de la requête.
+
+``FichierVerifieUploadHandler`` se place devant les gestionnaires standard
+(mémoire / fichier temporaire) : il identifie le type réel du fichier à
+partir de ses premiers octets, coupe la connexion dès qu'un type interdit
+ou un dépassement de taille est détecté et calcule le SHA-256 au fil de
+l'eau. Le fichier obtenu porte ``content_type`` (type détecté, et non plus
+celui annoncé par le client) et ``sha256``.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    StopFutureHandlers,
+    StopUpload,
+    load_handler,
+)
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB par fichier
+
+# Signatures (« magic bytes ») des formats acceptés
+SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),
+)
+SIGNATURE_MAX = max(len(signature) for signature, _type in SIGNATURES)
+
+TYPES_DOCUMENTS = ("application/pdf", "image/jpeg", "image/png")
+TYPES_IMAGES = ("image/jpeg", "image/png", "image/gif")
+TYPES_ARCHIVES = ("application/zip",)
+TYPES_INSCRIPTION = {
+    "photo_identite": ("image/jpeg", "image/png"),
+    "bac_scan": TYPES_DOCUMENTS,
+    "diplome_scan": TYPES_DOCUMENTS,
+    "extrait_naissance": TYPES_DOCUMENTS,
+}
+
+
+def detecter_type(debut):
+    """Type MIME correspondant aux premiers octets, ou None."""
+    for signature, content_type in SIGNATURES:
+        if debut.startswith(signature):
+            return content_type
+    return None
+
+
+class FichierVerifieUploadHandler(FileUploadHandler):
+    """
+    ``types`` : types autorisés pour tous les champs, ou dictionnaire
+    ``{champ: types}`` (un champ absent du dictionnaire est refusé).
+    ``max_size`` : taille maximale (octets) pour tous les champs, ou
+    dictionnaire ``{champ: taille}`` (``MAX_UPLOAD_SIZE`` par défaut).
+    """
+
+    def __init__(self, request=None, types=TYPES_DOCUMENTS, max_size=MAX_UPLOAD_SIZE):
+        super().__init__(request)
+        self.types = types
+        self.max_size = max_size
+        self.erreurs = []
+        self.handlers = [load_handler(path, request) for path in settings.FILE_UPLOAD_HANDLERS]
+        self.actifs = []
+
+    def _taille_max(self, field_name):
+        if isinstance(self.max_size, dict):
+            return self.max_size.get(field_name, MAX_UPLOAD_SIZE)
+        return self.max_size
+
+    def _types_autorises(self, field_name):
+        if isinstance(self.types, dict):
+            return self.types.get(field_name, ())
+        return self.types
+
+    def _rejeter(self, message):
+        self.erreurs.append(message)
+        for handler in self.actifs:
+            handler.upload_interrupted()
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        for handler in self.handlers:
+            handler.handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.debut = b""
+        self.type_detecte = None
+        self.taille = 0
+        self.sha256 = hashlib.sha256()
+        self.actifs = []
+        for handler in self.handlers:
+            self.actifs.append(handler)
+            try:
+                handler.new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+            except StopFutureHandlers:
+                break
+        # Le client annonce une taille : inutile d'attendre les octets
+        if content_length and content_length > self._taille_max(field_name):
+            self._rejeter(self._message_taille())
+
+    def _message_taille(self):
+        return (
+            f"{self.file_name} : la taille maximale autorisée est "
+            f"{self._taille_max(self.field_name) / 1024 / 1024:g}MB"
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.taille += len(raw_data)
+        if self.taille > self._taille_max(self.field_name):
+            self._rejeter(self._message_taille())
+
+        if self.type_detecte is None:
+            self.debut += raw_data[:SIGNATURE_MAX]
+            if len(self.debut) >= SIGNATURE_MAX:
+                self._verifier_type()
+
+        self.sha256.update(raw_data)
+        for handler in self.actifs:
+            raw_data = handler.receive_data_chunk(raw_data, start)
+            if raw_data is None:
+                break
+        return None
+
+    def _verifier_type(self):
+        self.type_detecte = detecter_type(self.debut)
+        if self.type_detecte not in self._types_autorises(self.field_name):
+            self._rejeter(f"{self.file_name} : type de fichier non autorisé")
+
+    def file_complete(self, file_size):
+        if self.type_detecte is None:
+            # Fichier plus court que les signatures
+            self._verifier_type()
+        for handler in self.actifs:
+            fichier = handler.file_complete(file_size)
+            if fichier is not None:
+                fichier.content_type = self.type_detecte
+                fichier.sha256 = self.sha256.hexdigest()
+                return fichier
+        return None
+
+    def upload_interrupted(self):
+        for handler in self.actifs:
+            handler.upload_interrupted()
+
+    def upload_complete(self):
+        for handler in self.handlers:
+            handler.upload_complete()
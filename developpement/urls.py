@@ -2,30 +2,45 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include, reverse_lazy
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, views
+from .api.views import (
+    CatalogueAPIView,
+    InscriptionSeriesAPIView,
+    InscriptionVerificationAPIView,
+    TeamMemberListAPIView,
+)
 from .views import (
     CustomPasswordResetView,
     CustomPasswordResetDoneView,
     CustomPasswordResetConfirmView,
     CustomPasswordResetCompleteView
 )
+
+# Sous ASGI, les pages publiques en lecture peuvent être servies en asynchrone
+public = async_views if settings.ASYNC_PUBLIC_VIEWS else views
+team_member_detail = (
+    async_views.team_member_detail
+    if settings.ASYNC_PUBLIC_VIEWS
+    else views.TeamMemberAPIView.as_view()
+)
+
 urlpatterns = [
     # === Pages publiques ===
-    path("", views.home, name="home"),
-    path("formation/", views.page_view, {"page_name": "formation"}, name="formation"),
-    path("contact/", views.page_view, {"page_name": "contact"}, name="contact"),
-    path("activites/", views.activite, name="activite"),
-    path("activites/<int:id>/", views.activite_detail, name="activite_detail"),
+    path("", public.home, name="home"),
+    path("formation/", public.page_view, {"page_name": "formation"}, name="formation"),
+    path("contact/", public.page_view, {"page_name": "contact"}, name="contact"),
+    path("activites/", public.activite, name="activite"),
+    path("activites/<int:id>/", public.activite_detail, name="activite_detail"),
     path(
         "presentation/",
-        views.page_view,
+        public.page_view,
         {"page_name": "presentation"},
         name="presentation",
     ),
-    path("travaux/", views.page_view, {"page_name": "travaux"}, name="travaux"),
+    path("travaux/", public.page_view, {"page_name": "travaux"}, name="travaux"),
     path(
         "inscription/",
-        views.page_view,
+        public.page_view,
         {"page_name": "inscription"},
         name="inscription",
     ),
@@ -76,11 +91,31 @@ urlpatterns = [
         "api/",
         include(
             [
+                path(
+                    "team-members/",
+                    TeamMemberListAPIView.as_view(),
+                    name="team-member-list",
+                ),
                 path(
                     "team-members/<slug:slug>/",
-                    views.TeamMemberAPIView.as_view(),
+                    team_member_detail,
                     name="team-member-detail",
                 ),
+                path(
+                    "catalogue/",
+                    CatalogueAPIView.as_view(),
+                    name="catalogue-api",
+                ),
+                path(
+                    "inscription/verifier/",
+                    InscriptionVerificationAPIView.as_view(),
+                    name="inscription-verification",
+                ),
+                path(
+                    "statistiques/inscriptions/",
+                    InscriptionSeriesAPIView.as_view(),
+                    name="inscription-series",
+                ),
             ]
         ),
     ),
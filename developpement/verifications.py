@@ -0,0 +1,128 @@
+# developpement/verifications.py
+"""
+Règles de recevabilité d'une inscription, partagées par ``inscription_formation``
+et par l'API de pré-vérification appelée pendant la saisie du formulaire.
+
+Chaque fonction accepte des données partielles : seuls les champs fournis
+sont contrôlés. Les erreurs sont retournées sous la forme ``{champ: message}``.
+"""
+import re
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Inscription
+
+TELEPHONE_RE = re.compile(r'^\+?[\d\s]{10,15}$')
+ANNEE_MIN = 1950
+
+MESSAGES_UNICITE = {
+    "email": "Cette adresse email est déjà utilisée pour une inscription.",
+    "cmu": "Ce numéro CMU est déjà utilisé pour une inscription.",
+    "cni": "Ce numéro CNI est déjà utilisé pour une inscription.",
+    "numero_bac": "Ce numéro de bac est déjà utilisé pour une inscription.",
+    "candidat": "Un candidat portant ces nom, prénom et date de naissance est déjà inscrit.",
+}
+
+
+def _valeur(data, champ):
+    return (data.get(champ) or "").strip()
+
+
+def normaliser(data):
+    """Valeurs telles qu'elles seront enregistrées (cf. ``Inscription.save``)."""
+    return {
+        "nom": _valeur(data, "nom").upper(),
+        "prenom": _valeur(data, "prenom").capitalize(),
+        "email": _valeur(data, "email").lower(),
+        "cmu": _valeur(data, "cmu"),
+        "cni": _valeur(data, "cni"),
+        "numero_bac": _valeur(data, "numero_bac").upper(),
+        "date_naissance": _valeur(data, "date_naissance"),
+    }
+
+
+def verifier_regles(data, current_year=None):
+    """Dates, années et téléphone (aucune requête)."""
+    current_year = current_year or timezone.now().year
+    erreurs = {}
+
+    email, confirmation = _valeur(data, "email"), _valeur(data, "email_confirmation")
+    if email and confirmation and email.lower() != confirmation.lower():
+        erreurs["email_confirmation"] = "Les adresses email ne correspondent pas"
+
+    date_naissance = _valeur(data, "date_naissance")
+    if date_naissance:
+        try:
+            if datetime.strptime(date_naissance, "%Y-%m-%d").date() >= timezone.localdate():
+                erreurs["date_naissance"] = "La date de naissance doit être dans le passé"
+        except ValueError:
+            erreurs["date_naissance"] = "Date de naissance invalide"
+
+    annees = {}
+    for champ in ("annee_obtentionbac", "annee_obtentionlicence"):
+        valeur = _valeur(data, champ)
+        if not valeur:
+            continue
+        try:
+            annees[champ] = int(valeur)
+        except ValueError:
+            erreurs[champ] = "Année invalide"
+            continue
+        if annees[champ] > current_year:
+            erreurs[champ] = "L'année ne peut pas être dans le futur"
+        elif annees[champ] < ANNEE_MIN:
+            erreurs[champ] = f"L'année doit être postérieure à {ANNEE_MIN}"
+    if (
+        len(annees) == 2
+        and not erreurs.keys() & annees.keys()
+        and annees["annee_obtentionlicence"] < annees["annee_obtentionbac"]
+    ):
+        erreurs["annee_obtentionlicence"] = "La licence ne peut pas être antérieure au bac"
+
+    telephone = _valeur(data, "telephone")
+    if telephone and not TELEPHONE_RE.match(telephone):
+        erreurs["telephone"] = "Numéro de téléphone invalide"
+    return erreurs
+
+
+def verifier_unicite(data):
+    """Clés uniques déjà prises, en une seule requête sur les index uniques."""
+    valeurs = normaliser(data)
+    conditions = Q()
+    for champ in ("email", "cmu", "cni", "numero_bac"):
+        if valeurs[champ]:
+            conditions |= Q(**{champ: valeurs[champ]})
+    candidat = None
+    if valeurs["nom"] and valeurs["prenom"] and valeurs["date_naissance"]:
+        try:
+            date_naissance = datetime.strptime(valeurs["date_naissance"], "%Y-%m-%d").date()
+        except ValueError:
+            date_naissance = None
+        if date_naissance:
+            candidat = (valeurs["nom"], valeurs["prenom"], date_naissance)
+            conditions |= Q(nom=candidat[0], prenom=candidat[1], date_naissance=candidat[2])
+    if not conditions:
+        return {}
+
+    erreurs = {}
+    existants = Inscription.objects.filter(conditions).order_by().values_list(
+        "email", "cmu", "cni", "numero_bac", "nom", "prenom", "date_naissance"
+    )[:5]
+    for email, cmu, cni, numero_bac, *identite in existants:
+        for champ, existant in (
+            ("email", email), ("cmu", cmu), ("cni", cni), ("numero_bac", numero_bac),
+        ):
+            if valeurs[champ] and existant == valeurs[champ]:
+                erreurs[champ] = MESSAGES_UNICITE[champ]
+        if candidat and tuple(identite) == candidat:
+            erreurs["nom"] = MESSAGES_UNICITE["candidat"]
+    return erreurs
+
+
+def verifier_inscription(data, current_year=None):
+    """Toutes les vérifications préalables à l'envoi des documents."""
+    erreurs = verifier_regles(data, current_year)
+    erreurs.update(verifier_unicite(data))
+    return erreurs
@@ -11,9 +11,8 @@ from .serializers import TeamMemberSerializer
 from django.urls import reverse_lazy
 from django.contrib.auth.hashers import make_password
 from datetime import datetime
-from django.db.models import Prefetch
 from django.http import Http404
-from .models import Formation, UE, Activite, Inscription, MarquettePedagogique, ProgrammeFormation
+from .models import Activite, Inscription
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponse, JsonResponse, HttpResponseForbidden
 from django.urls import reverse
@@ -23,13 +22,16 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView
 from django.contrib.auth import get_user_model
 from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.views.generic import DetailView
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
-from django.utils.safestring import mark_safe
 from django.core.mail import send_mail
 from django.template.loader import get_template
 from django.conf import settings
@@ -49,6 +51,13 @@ from rest_framework.response import Response
 from .models import TeamMember, Partenaire
 from .forms import InscriptionForm, CandidatProfileForm
 from .utils import send_inscription_email
+from .equipe import membres_carte, profil_membre
+from .identifiers import allouer_identifiant
+from .verifications import verifier_inscription
+from .catalog import get_catalog, get_catalog_version
+from .conditional import activites_version, home_version, page_version
+from .decorators import conditional_page, limiter_debit, verifier_uploads
+from .uploads import TYPES_DOCUMENTS, TYPES_INSCRIPTION
 from .serializers import TeamMemberSerializer
 from functools import wraps
 
@@ -56,14 +65,21 @@ from functools import wraps
 # 2. CONSTANTES
 CustomUser = get_user_model()
 
+IMAGES_AND_SLOGANS = [
+    ("cascade.jpg", "Découvrez la beauté de la nature"),
+    ("baselique.jpg", "L'architecture au cœur de l'histoire"),
+    ("man.jpg", "L'esprit humain, une aventure infinie"),
+    ("pt.jpg", "Un regard sur les horizons lointains"),
+    ("tourisme.jpg", "Explorez le monde, vivez l'expérience"),
+]
+
 PAGE_CONFIG = {
     "formation": {
         "title": "Nos Formations",
         "template": "formations/formation.html",
         "context_func": lambda request: {
-            "formations": Formation.objects.prefetch_related(
-                Prefetch("ues", queryset=UE.objects.prefetch_related("ecues"))
-            ).all()
+            "formations": get_catalog()["formations"],
+            "catalog_version": get_catalog_version(),
         },
     },
     "contact": {
@@ -81,10 +97,7 @@ PAGE_CONFIG = {
         "title": "Présentation",
         "template": "acceuil/presentation.html",
         "context_func": lambda request: {
-            "inscription": (
-                Inscription.objects.filter(email=request.user.email).first()
-                if request.user.is_authenticated else None
-            ),
+            "inscription": request.candidat.inscription,
             "year": datetime.now().year,
         },
     },
@@ -98,6 +111,7 @@ PAGE_CONFIG = {
     },
 }
 
+@conditional_page(page_version)
 def page_view(request, page_name):
     config = PAGE_CONFIG.get(page_name)
     if not config:
@@ -130,6 +144,7 @@ def role_required(role_name):
 
 
 # 4. VUES PUBLIQUES
+@conditional_page(home_version)
 def home(request):
     """Vue pour la page d'accueil."""
     partenaires = {
@@ -139,18 +154,13 @@ def home(request):
     }
     
     context = {
-        "images_and_slogans": [
-            ("cascade.jpg", "Découvrez la beauté de la nature"),
-            ("baselique.jpg", "L'architecture au cœur de l'histoire"),
-            ("man.jpg", "L'esprit humain, une aventure infinie"),
-            ("pt.jpg", "Un regard sur les horizons lointains"),
-            ("tourisme.jpg", "Explorez le monde, vivez l'expérience"),
-        ],
-        "team_members": TeamMember.objects.all(),
+        "images_and_slogans": IMAGES_AND_SLOGANS,
+        "team_members": membres_carte(),
         "partenaires": Partenaire.objects.all(),
     }
     return render(request, "acceuil/accueil.html", context)
 # 4. VUES PUBLIQUES
+@conditional_page(activites_version)
 def activite(request):
     """Liste des activités avec affichage par date décroissante."""
     activities = Activite.objects.all().order_by("-created_at")
@@ -162,6 +172,7 @@ def activite(request):
     
     
 # 5. VUES D'AUTHENTIFICATION
+@method_decorator(limiter_debit("connexion", compte="username"), name="dispatch")
 class GenericLoginView(LoginView):
     """Vue de connexion générique avec redirection par rôle."""
     template_name = "acceuil/login.html"
@@ -175,6 +186,7 @@ class GenericLoginView(LoginView):
             return reverse("gestion_publications")
         return super().get_success_url()
 
+@limiter_debit("connexion", compte="username")
 def admin_login_page(request):
     """Connexion spécifique pour les administrateurs."""
     if request.method == "POST":
@@ -214,6 +226,7 @@ def is_candidat(user):
 
 
 # --- Page de connexion candidat ---
+@limiter_debit("connexion", compte="email")
 def candidat_login_page(request):
     # Rediriger les utilisateurs déjà authentifiés
     if request.user.is_authenticated and is_candidat(request.user):
@@ -222,16 +235,10 @@ def candidat_login_page(request):
     if request.method == 'POST':
         email = request.POST.get('email')  # Champ correspondant à l'email
         password = request.POST.get('password')
-        
-    
-        try:
-            # Si vous avez un champ email dans votre modèle User
-            user_model = get_user_model()
-            user = user_model.objects.get(email=email)
-            user = authenticate(request, username=user.username, password=password)
-        except Exception:
-            user = None
-        
+
+        # EmailBackend : recherche indexée, insensible à la casse
+        user = authenticate(request, email=email, password=password)
+
         if user is not None:
             if is_candidat(user):
                 login(request, user)
@@ -252,9 +259,8 @@ def candidat_login_page(request):
 def espace_candidat(request):
     """Espace personnel du candidat."""
     try:
-        # Utilisation de l'email de l'utilisateur connecté
-        inscription = Inscription.objects.get(email=request.user.email)
-        formation = Formation.objects.filter(nom=inscription.formation).first()
+        inscription = request.candidat.get_inscription()
+        formation = request.candidat.formation
 
         # Calcul du pourcentage de complétion du dossier
         documents = {
@@ -293,7 +299,7 @@ def espace_candidat(request):
 def modifier_profil(request):
     """Modification du profil candidat."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
+        inscription = request.candidat.get_inscription()
         
         if request.method == 'POST':
             form = CandidatProfileForm(request.POST, instance=inscription)
@@ -316,7 +322,7 @@ def modifier_profil(request):
 def password_change(request):
     """Modification du mot de passe."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
+        inscription = request.candidat.get_inscription()
         
         if request.method == 'POST':
             form = CandidatProfileForm(request.POST, instance=inscription)
@@ -336,10 +342,12 @@ def password_change(request):
 
 
 @login_required
+@limiter_debit("upload", compte="user")
+@verifier_uploads(TYPES_INSCRIPTION)
 def gerer_documents(request):
     """Gestion des documents du candidat."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
+        inscription = request.candidat.get_inscription()
         
         if request.method == 'POST':
             for doc_type in ['photo_identite', 'bac_scan', 'diplome_scan', 'extrait_naissance']:
@@ -359,8 +367,8 @@ def gerer_documents(request):
 def details_formation(request):
     """Détails de la formation du candidat."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
-        formation = Formation.objects.filter(nom=inscription.formation).first()
+        inscription = request.candidat.get_inscription()
+        formation = request.candidat.formation
         
         if not formation:
             messages.error(request, "Formation non trouvée")
@@ -380,6 +388,8 @@ def details_formation(request):
 import logging
 logger = logging.getLogger(__name__)
 
+@limiter_debit("inscription")
+@verifier_uploads(TYPES_INSCRIPTION)
 def inscription_formation(request, formation_type):
     """Processus complet d'inscription à une formation."""
     current_year = timezone.now().year
@@ -404,6 +414,13 @@ def inscription_formation(request, formation_type):
         messages.error(request, "Les adresses email ne correspondent pas")
         return render(request, "formations/inscription.html", context)
 
+    # Clés uniques, dates et téléphone (mêmes règles que l'API de pré-vérification)
+    erreurs = verifier_inscription(data, current_year)
+    if erreurs:
+        for erreur in erreurs.values():
+            messages.error(request, erreur)
+        return render(request, "formations/inscription.html", context)
+
     # Validation fichiers
     required_files = {
         'photo_identite': "Photo d'identité",
@@ -422,35 +439,28 @@ def inscription_formation(request, formation_type):
         date_naissance = datetime.strptime(data.get("date_naissance", ""), "%Y-%m-%d").date()
         annee_bac = int(data.get("annee_obtentionbac", 0))
         annee_licence = int(data.get("annee_obtentionlicence", 0))
-        
-        if annee_bac > current_year or annee_licence > current_year:
-            raise ValueError("L'année ne peut pas être dans le futur")
-        if annee_licence < annee_bac:
-            raise ValueError("La licence ne peut pas être antérieure au bac")
-
-        if not re.match(r'^\+?[\d\s]{10,15}$', data.get("telephone", "")):
-            raise ValueError("Numéro de téléphone invalide")
 
         # Génération du username
         nom = data.get("nom", "").lower()
         prenom = data.get("prenom", "").lower()[:3]
         username_base = f"{nom}_{prenom}"
-        username = username_base
-        counter = 1
-        
-        while CustomUser.objects.filter(username=username).exists():
-            username = f"{username_base}_{counter}"
-            counter += 1
 
         with transaction.atomic():
-            # Création de l'utilisateur en premier
-            user = CustomUser.objects.create_user(
-                username=username,
-                email=data.get("email").lower(),
-                password=data.get("password"),
-                first_name=data.get("prenom", "").capitalize(),
-                last_name=data.get("nom", "").upper()
+            # Création de l'utilisateur en premier (username libre, sûr en concurrence)
+            user = allouer_identifiant(
+                lambda username: CustomUser.objects.create_user(
+                    username=username,
+                    email=data.get("email").lower(),
+                    password=data.get("password"),
+                    first_name=data.get("prenom", "").capitalize(),
+                    last_name=data.get("nom", "").upper()
+                ),
+                CustomUser.objects.all(),
+                "username",
+                username_base,
+                max_length=CustomUser._meta.get_field("username").max_length,
             )
+            username = user.username
             
             # Création de l'inscription
             inscription = Inscription(
@@ -504,22 +514,30 @@ def inscription_formation(request, formation_type):
 # 8. VUES GESTIONNAIRE
 @staff_member_required
 def dashboard(request):
-    """Tableau de bord administrateur."""
-    inscriptions = list(Inscription.objects.all().values(
-        'id', 'nom', 'prenom', 'email', 'telephone', 
-        'formation', 'cmu', 'cni', 'photo'
-    ))
-
-    for inscrit in inscriptions:
-        if inscrit['photo']:
-            inscrit['photo'] = f"/media/{inscrit['photo']}"
+    """Tableau de bord administrateur (graphiques chargés depuis l'API de séries)."""
+    inscriptions = Inscription.objects.only(
+        'id', 'nom', 'prenom', 'email', 'telephone', 'formation', 'cmu', 'cni',
+        'photo_identite', 'date_inscription',
+    )
+    recherche = request.GET.get('q', '').strip()
+    if recherche:
+        inscriptions = inscriptions.filter(
+            Q(nom__icontains=recherche) | Q(prenom__icontains=recherche) | Q(email__icontains=recherche)
+        )
+    formation = request.GET.get('formation', '')
+    if formation:
+        inscriptions = inscriptions.filter(formation=formation)
 
+    debut_mois = timezone.localdate().replace(day=1)
     context = {
-        "inscriptions_json": mark_safe(json.dumps(inscriptions, default=str)),
+        "page_obj": Paginator(inscriptions, 25).get_page(request.GET.get('page')),
+        "recherche": recherche,
+        "formation": formation,
+        "formations": (
+            Inscription.objects.order_by('formation').values_list('formation', flat=True).distinct()
+        ),
         "total_inscriptions": Inscription.objects.count(),
-        "inscriptions_mois": Inscription.objects.filter(
-            date_inscription__month=timezone.now().month
-        ).count(),
+        "inscriptions_mois": Inscription.objects.filter(date_inscription__date__gte=debut_mois).count(),
     }
     return render(request, "gestionnaire/dashboard.html", context)
 
@@ -564,11 +582,19 @@ def supprimer_inscrit(request):
 
 # 9. VUES API
 
+@method_decorator(cache_control(public=True, max_age=300), name="dispatch")
 class TeamMemberAPIView(RetrieveAPIView):
+    """Profil complet d'un membre (fenêtre modale de l'accueil), servi depuis le cache."""
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
     lookup_field = 'slug'
 
+    def retrieve(self, request, *args, **kwargs):
+        profil = profil_membre(request, kwargs[self.lookup_field])
+        if profil is None:
+            raise Http404
+        return Response(profil)
+
 
 
 class TeamMemberDetailView(RetrieveAPIView):
@@ -591,6 +617,8 @@ def generate_pdf(inscription):
 
 
 @login_required
+@limiter_debit("upload", compte="user", json=True)
+@verifier_uploads(TYPES_DOCUMENTS, json=True)
 @require_POST
 @csrf_exempt
 def upload_document(request):
@@ -603,7 +631,7 @@ def upload_document(request):
     MAX_SIZE = 5 * 1024 * 1024  # 5MB
 
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
+        inscription = request.candidat.get_inscription()
         document_type = request.POST.get('document_type')
         document_file = request.FILES.get('document')
 
@@ -662,7 +690,7 @@ def update_profile(request):
     Vue avancée pour mettre à jour le profil avec validation
     """
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
+        inscription = request.candidat.get_inscription()
         
         # Liste des champs autorisés à être modifiés
         allowed_fields = {
@@ -722,6 +750,7 @@ def update_profile(request):
 
 
 
+@method_decorator(limiter_debit("reinitialisation", compte="email"), name="dispatch")
 class CustomPasswordResetView(PasswordResetView):
     template_name = 'registration/password_reset_form.html'
     email_template_name = 'registration/password_reset_email.html'
@@ -751,9 +780,9 @@ class CustomPasswordResetCompleteView(PasswordResetCompleteView):
 def details_programme(request):
     """Détails complets du programme de formation."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
-        formation = Formation.objects.filter(nom=inscription.formation).first()
-        programme = ProgrammeFormation.objects.filter(formation=formation).first() if formation else None
+        inscription = request.candidat.get_inscription()
+        programme = request.candidat.programme
+        formation = request.candidat.formation
         
         context = {
             'inscription': inscription,
@@ -771,9 +800,9 @@ def details_programme(request):
 def details_maquette(request):
     """Détails complets de la maquette pédagogique."""
     try:
-        inscription = Inscription.objects.get(email=request.user.email)
-        formation = Formation.objects.filter(nom=inscription.formation).first()
-        maquette = MarquettePedagogique.objects.filter(formation=formation).first() if formation else None
+        inscription = request.candidat.get_inscription()
+        maquette = request.candidat.maquette
+        formation = request.candidat.formation
         
         context = {
             'inscription': inscription,
@@ -786,8 +815,7 @@ def details_maquette(request):
         messages.error(request, "Aucune inscription trouvée")
         return redirect('espace_candidat')
 
-from django.db.models import Q
-
+@conditional_page(activites_version)
 def activite_detail(request, id):
     """Détail d'une activité avec navigation précédente/suivante."""
     activity = get_object_or_404(Activite.objects.select_related(), id=id)
@@ -0,0 +1,98 @@
+# developpement/workflow.py
+"""
+Transitions de statut des inscriptions, unitaires ou groupées.
+
+Chaque lot est appliqué par un seul ``UPDATE ... WHERE statut IN (...)`` :
+une inscription qui n'est plus dans un statut de départ autorisé n'est pas
+modifiée. Les transitions sont historisées dans ``StatutHistory`` et les
+notifications envoyées après le commit.
+"""
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import invalider_statistiques
+from .candidat import candidat_cache_keys
+from .live import publier_changements_statut
+from .models import Inscription, StatutHistory
+from .notifications import notifier_changement_statut
+
+# Statut cible -> statuts de départ autorisés
+TRANSITIONS = {
+    "V": ("E",),
+    "R": ("E",),
+    "E": ("V", "R"),
+}
+BATCH_SIZE = 500
+
+
+class TransitionInvalide(ValueError):
+    pass
+
+
+def changer_statut(ids, nouveau_statut, user=None, notifier=True, batch_size=BATCH_SIZE):
+    """
+    Applique ``nouveau_statut`` aux inscriptions ``ids`` éligibles.
+
+    Retourne la liste des identifiants réellement modifiés.
+    """
+    if nouveau_statut not in TRANSITIONS:
+        raise TransitionInvalide(f"Statut inconnu : {nouveau_statut}")
+    depuis = TRANSITIONS[nouveau_statut]
+    # Appel interne (commande, signal) : user=None ; jamais un visiteur anonyme
+    if user is not None and not user.is_authenticated:
+        raise PermissionDenied("Changement de statut réservé aux utilisateurs connectés.")
+    ids = sorted({int(pk) for pk in ids})
+    modifies = []
+    user_ids = []
+    anciens = {}
+
+    with transaction.atomic():
+        now = timezone.now()
+        for start in range(0, len(ids), batch_size):
+            lot = ids[start:start + batch_size]
+            eligibles = list(
+                Inscription.objects.select_for_update()
+                .filter(id__in=lot, statut__in=depuis)
+                .values_list("id", "statut", "user_id")
+            )
+            if not eligibles:
+                continue
+            nombre = Inscription.objects.filter(
+                id__in=[pk for pk, _statut, _user in eligibles], statut__in=depuis
+            ).update(statut=nouveau_statut)
+            if nombre != len(eligibles):
+                # Lignes modifiées entre-temps : on ne garde que celles passées au
+                # nouveau statut (aucun statut de départ n'est le statut cible)
+                changes = set(
+                    Inscription.objects.filter(
+                        id__in=[pk for pk, _statut, _user in eligibles], statut=nouveau_statut
+                    ).values_list("id", flat=True)
+                )
+                eligibles = [ligne for ligne in eligibles if ligne[0] in changes]
+            StatutHistory.objects.bulk_create([
+                StatutHistory(
+                    inscription_id=pk,
+                    ancien_statut=ancien,
+                    nouveau_statut=nouveau_statut,
+                    modifie_par=user,
+                    date_modification=now,
+                )
+                for pk, ancien, _user in eligibles
+            ])
+            modifies.extend(pk for pk, _statut, _user in eligibles)
+            user_ids.extend(user_id for _pk, _statut, user_id in eligibles)
+            anciens.update((pk, ancien) for pk, ancien, _user in eligibles)
+
+        # L'UPDATE groupé ne déclenche pas post_save : on invalide à la main
+        keys = candidat_cache_keys(user_ids)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+        if modifies:
+            transaction.on_commit(invalider_statistiques)
+        publier_changements_statut(anciens, nouveau_statut)
+        if notifier and modifies and nouveau_statut in ("V", "R"):
+            transaction.on_commit(
+                lambda: notifier_changement_statut(modifies, nouveau_statut)
+            )
+    return modifies
@@ -0,0 +1,344 @@
+# institut/cache.py
+"""
+Cache partagé entre processus, stocké dans un fichier SQLite local.
+
+Tous les workers (gunicorn, daphne, commandes) d'une même machine lisent et
+écrivent le même fichier : les compteurs de limitation de débit, versions
+de catalogue et contextes candidats sont cohérents sans service externe.
+
+- ``incr``/``decr`` atomiques (un seul ``UPDATE``) ;
+- expiration à la lecture, purge des entrées expirées au nettoyage ;
+- taille bornée (``MAX_ENTRIES``) : les entrées les moins récemment lues
+  sont supprimées en premier ;
+- ``get_or_set`` protégé contre l'effet de meute (un seul processus
+  calcule la valeur, les autres attendent) ;
+- seaux à jetons atomiques (``take_token``, ``take_tokens``) pour la limitation de débit ;
+- espaces de noms versionnés (``namespace_version`` / ``bump_namespace``).
+"""
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+"""
+
+# Précision de la date de dernière lecture : évite une écriture à chaque get
+ACCESS_RESOLUTION = 30
+# Nombre d'écritures entre deux vérifications de la taille du cache
+CULL_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+        options = params.get("OPTIONS", {})
+        self._lock_timeout = int(options.get("LOCK_TIMEOUT", 30))
+
+    # Connexions : une par thread et par processus (sûr après fork)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    # Sérialisation : les entiers restent des entiers SQL (pour incr)
+
+    @staticmethod
+    def _dumps(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _loads(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    # API du cache
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            self._connection().execute(
+                "DELETE FROM cache WHERE key = ? AND expires <= ?", (key, now)
+            )
+            return default
+        if now - accessed > ACCESS_RESOLUTION:
+            self._connection().execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return self._loads(value)
+
+    def get_many(self, keys, version=None):
+        mapping = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not mapping:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(mapping))
+        rows = self._connection().execute(
+            f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires IS NULL OR expires > ?)",
+            (*mapping, now),
+        ).fetchall()
+        return {mapping[key]: self._loads(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+            (key, self._dumps(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = [
+            (self.make_and_validate_key(key, version=version), self._dumps(value), expires, now)
+            for key, value in data.items()
+        ]
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires = excluded.expires, accessed = excluded.accessed "
+            "WHERE cache.expires IS NOT NULL AND cache.expires <= ?",
+            (key, self._dumps(value), self.get_backend_timeout(timeout), now, now),
+        )
+        if cursor.rowcount:
+            self._maybe_cull()
+        return cursor.rowcount == 1
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, now),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            "UPDATE cache SET value = value + ? WHERE key = ? "
+            "AND typeof(value) = 'integer' AND (expires IS NULL OR expires > ?) "
+            "RETURNING value",
+            (delta, key, time.time()),
+        ).fetchall()  # fetchall : termine l'instruction et libère le verrou
+        if not row:
+            raise ValueError("Key '%s' not found" % key)
+        return row[0][0]
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            placeholders = ",".join("?" * len(keys))
+            self._connection().execute(f"DELETE FROM cache WHERE key IN ({placeholders})", keys)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+    def close(self, **kwargs):
+        # Connexion conservée d'une requête à l'autre (fichier local)
+        pass
+
+    # Protection contre l'effet de meute
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, version=version)
+        if value is not None:
+            return value
+        if not callable(default):
+            self.add(key, default, timeout=timeout, version=version)
+            return self.get(key, default, version=version)
+
+        lock_key = f"{key}:lock"
+        # Jeton propre à cet appel : seul le détenteur libère le verrou
+        token = secrets.randbits(62)
+        deadline = time.monotonic() + self._lock_timeout
+        while not self.add(lock_key, token, self._lock_timeout, version=version):
+            # Un autre processus calcule la valeur : on attend son résultat
+            time.sleep(0.05)
+            value = self.get(key, version=version)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                # Détenteur trop lent : valeur calculée pour cet appel
+                # seulement, sans toucher au cache ni à son verrou
+                return default()
+        try:
+            value = self.get(key, version=version)
+            if value is None:
+                value = default()
+                if value is not None:
+                    self.set(key, value, timeout=timeout, version=version)
+        finally:
+            self._release_lock(lock_key, token, version)
+        return value
+
+    def _release_lock(self, lock_key, token, version=None):
+        # Si le verrou a expiré pendant le calcul, un autre processus a pu
+        # le prendre : on ne supprime que le nôtre
+        lock_key = self.make_and_validate_key(lock_key, version=version)
+        self._connection().execute(
+            "DELETE FROM cache WHERE key = ? AND value = ?", (lock_key, token)
+        )
+
+    # Seau à jetons atomique (limitation de débit)
+
+    def take_token(self, key, capacity, rate, cost=1, version=None):
+        """
+        Prélève ``cost`` jetons du seau ``key`` (``capacity`` jetons au plus,
+        ``rate`` jetons regagnés par seconde). Lecture et écriture dans la
+        même transaction : les workers concurrents ne peuvent pas dépenser
+        deux fois le même jeton. Retourne ``(accepté, attente en secondes)``.
+        """
+        return self.take_tokens([(key, capacity, rate)], cost, version)
+
+    def take_tokens(self, buckets, cost=1, version=None):
+        """
+        ``take_token`` sur plusieurs seaux ``(key, capacity, rate)`` à la
+        fois : les jetons ne sont prélevés que si tous les seaux les ont.
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            etats, attente = [], 0.0
+            for key, capacity, rate in buckets:
+                key = self.make_and_validate_key(key, version=version)
+                row = connection.execute(
+                    "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                    (key, now),
+                ).fetchone()
+                tokens, last = self._loads(row[0]) if row else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+                if tokens < cost:
+                    attente = max(attente, (cost - tokens) / rate)
+                etats.append((key, capacity, rate, tokens))
+            accepted = not attente
+            if accepted:
+                for key, capacity, rate, tokens in etats:
+                    tokens -= cost
+                    # Le seau expire une fois redevenu plein : rien à conserver
+                    connection.execute(
+                        "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                        (key, self._dumps((tokens, now)), now + (capacity - tokens) / rate + 1, now),
+                    )
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return accepted, attente
+
+    # Nettoyage : entrées expirées, puis les moins récemment lues
+
+    def _maybe_cull(self):
+        self._writes += 1
+        if self._writes % CULL_EVERY == 0:
+            self.cull()
+
+    def cull(self):
+        connection = self._connection()
+        connection.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        (count,) = connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self._max_entries:
+            excess = count - self._max_entries
+            surplus = max(excess, count // self._cull_frequency) if self._cull_frequency else count
+            connection.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (surplus,),
+            )
+
+
+# Espaces de noms versionnés : changer la version invalide toutes les clés
+# de l'espace en une opération (les anciennes entrées expirent ou sont
+# évincées par le nettoyage)
+
+def namespace_version(namespace, cache=None):
+    """Version courante de l'espace de noms (initialisée à 1)."""
+    cache = cache or default_cache
+    key = f"{namespace}:version"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_namespace(namespace, cache=None):
+    """Invalide l'espace de noms en incrémentant atomiquement sa version."""
+    cache = cache or default_cache
+    key = f"{namespace}:version"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, None)
+        return cache.get(key, 2)
@@ -0,0 +1,156 @@
+# institut/journalisation.py
+"""
+Journalisation non bloquante et structurée.
+
+Les enregistrements sont déposés dans une file en mémoire par un
+``FileAsynchroneHandler`` : le thread de la requête ne touche jamais le
+disque. Un ``QueueListener`` les transmet ensuite au logger de
+destination (``journal.*``), dont les gestionnaires écrivent les fichiers
+au format JSON, une ligne par enregistrement.
+
+Les fichiers sont partagés par tous les workers : chacun y écrit en ajout
+(``FichierPartageHandler``) et la rotation, par taille ou par date, est
+confiée à logrotate (``institut/logrotate.conf``). Un
+worker qui ferait lui-même la rotation renommerait le fichier sous les
+autres, qui continueraient d'écrire dans l'ancien ou écraseraient les
+sauvegardes.
+
+Chaque enregistrement porte l'identifiant de la requête en cours
+(``request_id``), posé par ``institut.middleware.JournalRequetesMiddleware``.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# Attributs ajoutés par ``extra=`` repris dans la sortie JSON
+CHAMPS = (
+    "view", "method", "path", "status", "latency_ms", "user",
+    "destinataires", "count",
+)
+
+
+class ContexteRequeteFilter(logging.Filter):
+    """Ajoute ``record.request_id`` (exécuté dans le thread de la requête)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class EchantillonnageFilter(logging.Filter):
+    """
+    Ne conserve qu'une fraction ``taux`` des requêtes ordinaires. Les
+    avertissements, erreurs, réponses 4xx/5xx et requêtes lentes
+    (``seuil_ms``) sont toujours conservés.
+    """
+
+    def __init__(self, taux=1.0, seuil_ms=1000):
+        super().__init__()
+        self.taux = float(taux)
+        self.seuil_ms = float(seuil_ms)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        if getattr(record, "status", 0) >= 400:
+            return True
+        if getattr(record, "latency_ms", 0) >= self.seuil_ms:
+            return True
+        return random.random() < self.taux
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for champ in CHAMPS:
+            if hasattr(record, champ):
+                data[champ] = getattr(record, champ)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class FichierPartageHandler(WatchedFileHandler):
+    """
+    Fichier en ajout, rouvert dès que logrotate l'a renommé. Le répertoire
+    est créé à la première écriture, pas à l'import des réglages.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class FileAsynchroneHandler(QueueHandler):
+    """
+    Dépose les enregistrements dans une file bornée, vidée par un thread qui
+    les confie au logger ``destination``. File pleine : l'enregistrement est
+    abandonné (et compté) plutôt que de faire attendre la requête.
+    """
+
+    def __init__(self, destination, taille=10000):
+        super().__init__(queue.Queue(int(taille)))
+        self.destination = destination
+        self.listener = None
+        self.perdus = 0
+        self._pid = None
+        self._demarrage = threading.Lock()
+
+    def _demarrer(self):
+        # Démarrage à la première écriture et après un fork (workers gunicorn)
+        with self._demarrage:
+            if self._pid != os.getpid():
+                self.listener = QueueListener(self.queue, logging.getLogger(self.destination))
+                self.listener.start()
+                self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Message figé tout de suite (arguments mutables) ; le formatage
+        # complet, traceback compris, a lieu dans le thread d'écriture
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._demarrer()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.perdus += 1
+            return
+        if self.perdus:
+            perdus, self.perdus = self.perdus, 0
+            avertissement = logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{perdus} enregistrement(s) abandonné(s) : file pleine",
+            })
+            try:
+                self.queue.put_nowait(avertissement)
+            except queue.Full:
+                self.perdus += perdus
+
+    def close(self):
+        if self.listener and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        super().close()
@@ -1,9 +1,28 @@
 # institut/middleware.py
+import logging
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from django.utils.functional import empty
+
+from .journalisation import request_id_var
+
+logger = logging.getLogger("institut.requetes")
+
+
 class SubdomainMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
+    def _set_urlconf(self, request):
         # Extraire le sous-domaine
         host = request.get_host().split(":")[0]
         subdomain = host.split(".")[0]
@@ -16,5 +35,73 @@ class SubdomainMiddleware:
         else:
             request.urlconf = settings.SUBDOMAIN_URLCONFS[None]
 
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._set_urlconf(request)
         response = self.get_response(request)
         return response
+
+    async def __acall__(self, request):
+        self._set_urlconf(request)
+        return await self.get_response(request)
+
+
+class JournalRequetesMiddleware:
+    """
+    Identifiant de requête (en-tête ``X-Request-ID`` repris ou généré) et
+    enregistrement JSON de chaque réponse : vue, statut et durée.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _debut(self, request):
+        request_id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+        request.request_id = request_id
+        # Remis à zéro par request_finished, et non en sortie de middleware :
+        # django.request journalise les réponses 4xx/5xx après celle-ci
+        request_id_var.set(request_id)
+        return time.perf_counter()
+
+    def _fin(self, request, response, debut):
+        latency_ms = round((time.perf_counter() - debut) * 1000, 1)
+        match = request.resolver_match
+        user = getattr(request, "user", None)
+        logger.log(
+            logging.WARNING if response.status_code >= 500 else logging.INFO,
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                "view": match.view_name if match else None,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "latency_ms": latency_ms,
+                # Évite de charger l'utilisateur si la vue ne l'a pas fait
+                "user": user.pk if user is not None and getattr(user, "_wrapped", None) is not empty else None,
+            },
+        )
+        response.headers["X-Request-ID"] = request.request_id
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        debut = self._debut(request)
+        response = self.get_response(request)
+        return self._fin(request, response, debut)
+
+    async def __acall__(self, request):
+        debut = self._debut(request)
+        response = await self.get_response(request)
+        return self._fin(request, response, debut)
+
+
+@receiver(request_finished)
+def _oublier_request_id(sender, **kwargs):
+    request_id_var.set("-")
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken', 
     'corsheaders',
+    'channels',
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -70,7 +71,8 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        'inscription_verification': '30/min',
     }
 }
 
@@ -79,12 +81,17 @@ AUTH_USER_MODEL = 'developpement.CustomUser'
 
 # ⚙️ Middleware
 MIDDLEWARE = [
+    "institut.middleware.JournalRequetesMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "developpement.middleware.CandidatContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    # Ressource saturée (Surcharge) -> 503 + Retry-After
+    "developpement.middleware.SurchargeMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "institut.middleware.SubdomainMiddleware",
 ]
@@ -106,8 +113,41 @@ TEMPLATES = [
     },
 ]
 
-# 🌐 Configuration WSGI
+# 🌐 Configuration WSGI / ASGI
 WSGI_APPLICATION = 'institut.wsgi.application'
+ASGI_APPLICATION = 'institut.asgi.application'
+
+# 🗄️ Cache partagé par tous les processus (fichier SQLite local)
+CACHES = {
+    'default': {
+        'BACKEND': 'institut.cache.SQLiteCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'var' / 'cache.sqlite3')),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'CULL_FREQUENCY': 4,
+            'LOCK_TIMEOUT': 30,
+        },
+    },
+}
+
+# Couche Channels (tableau de bord temps réel) : mémoire par défaut,
+# Redis lorsque plusieurs processus doivent partager les événements
+# (indispensable en production : avertissement au démarrage sinon)
+if os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.getenv('REDIS_URL')]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+
+# Pages publiques en lecture servies par des vues asynchrones (sous ASGI)
+ASYNC_PUBLIC_VIEWS = os.getenv('ASYNC_PUBLIC_VIEWS', 'False') == 'True'
 
 # 🛢️ Configuration de la base de données (SQLite)
 DATABASES = {
@@ -118,6 +158,34 @@ DATABASES = {
 }
 
 # 🔑 Validation des mots de passe
+# 🔐 Authentification : email (candidats) puis identifiant (administrateurs),
+# mots de passe vérifiés dans un pool de threads borné
+AUTHENTICATION_BACKENDS = [
+    'developpement.authentification.EmailBackend',
+    'developpement.authentification.UsernameBackend',
+]
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))  # 0 : nombre de CPU
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', '32'))
+
+# Hachage des mots de passe : le premier hacheur est utilisé pour les
+# nouveaux mots de passe, les autres ne servent qu'à vérifier les anciens
+# (re-hachés à la connexion). « argon2 » nécessite argon2-cffi.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', '600000'))
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '19456'))  # Kio
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '1'))
+_HACHEURS = {
+    'pbkdf2': 'developpement.authentification.PBKDF2ReglableHasher',
+    'argon2': 'developpement.authentification.Argon2ReglableHasher',
+}
+PASSWORD_HASHERS = [_HACHEURS[PASSWORD_HASHER]] + [
+    chemin for nom, chemin in _HACHEURS.items() if nom != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -134,8 +202,40 @@ USE_TZ = True
 # 🎨 Fichiers statiques (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_DIRS = [BASE_DIR / 'static']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Bundles générés par `manage.py build_assets` (lancé aussi par collectstatic)
+ASSETS_BUILD_DIR = BASE_DIR / 'static'
+STATICFILES_DIRS = [ASSETS_BUILD_DIR]
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Noms hachés + fichiers .gz/.br précompressés, servis en cache immuable
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+WHITENOISE_MANIFEST_STRICT = False
+
+# Bundles servis par {% asset_bundle %} (chemins relatifs aux fichiers statiques)
+ASSET_BUNDLES = {
+    'public': {
+        'css': [
+            'assets/vendor/bootstrap/css/bootstrap.min.css',
+            'assets/vendor/bootstrap-icons/bootstrap-icons.min.css',
+        ],
+        'js': ['assets/vendor/bootstrap/js/bootstrap.bundle.min.js'],
+    },
+    'admin': {
+        'css': ['assets/vendor/bootstrap/css/bootstrap.min.css'],
+        'js': ['assets/vendor/bootstrap/js/bootstrap.bundle.min.js'],
+    },
+}
+
+# Classes jamais purgées des bundles : construites au rendu
+# (alert-{{ message.tags }}, bg-{{ activity.category }}) ou passées par les vues
+ASSET_PURGE_SAFELIST = [r'^alert-', r'^bg-', r'^text-']
+# Vérifiées dans chaque bundle construit : la construction échoue si l'une
+# d'elles, définie dans les sources, a été purgée
+ASSET_REQUIRED_CLASSES = [
+    'alert-success', 'alert-danger', 'alert-warning', 'alert-info',
+    'bg-success', 'bg-warning', 'bg-danger', 'text-muted',
+]
 
 # 🖼️ Configuration des fichiers média
 AUTH_USER_MODEL = 'developpement.CustomUser'
@@ -150,12 +250,22 @@ import os
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Sauvegardes (commande ``backup``) : base SQLite et instantanés de media/
+BACKUP_ROOT = os.getenv("BACKUP_ROOT", os.path.join(BASE_DIR, "backups"))
+
 # Configuration des fichiers uploadés
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 
-STATIC_URL = '/static/'
-STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Import de galeries d'activité (archives ZIP traitées en arrière-plan)
+GALLERY_IMPORT_DIR = os.getenv("GALLERY_IMPORT_DIR", os.path.join(BASE_DIR, "var", "imports"))
+GALLERY_ZIP_MAX_SIZE = int(os.getenv("GALLERY_ZIP_MAX_SIZE", str(500 * 1024 * 1024)))
+
+# Pointage le jour de l'examen : clé HMAC des QR codes des convocations et
+# des listes hors ligne. Clé distincte de SECRET_KEY pour pouvoir la confier
+# aux appareils de contrôle ; à défaut, dérivée de SECRET_KEY (vérification
+# sur le serveur uniquement).
+CHECKIN_SIGNING_KEY = os.getenv("CHECKIN_SIGNING_KEY", "")
 
 # 📧 Configuration de l'email
 if DEBUG:
@@ -183,29 +293,135 @@ if os.getenv('USE_PROXY', 'False') == 'True':
     USE_X_FORWARDED_HOST = True
     USE_X_FORWARDED_PORT = True
 
+# 🚦 Limitation de débit des vues coûteuses (seaux à jetons dans le cache
+# partagé) : « N/période », rafale de N puis N par période
+THROTTLE_RATES = {
+    'connexion': {'ip': '30/m', 'compte': '10/h'},
+    'inscription': {'ip': '20/h'},
+    'upload': {'ip': '120/h', 'compte': '60/h'},
+    'mail': {'ip': '30/h', 'compte': '20/h'},
+    'reinitialisation': {'ip': '10/h', 'compte': '3/h'},
+}
+# Mandataires de confiance devant le site (adresse client dans X-Forwarded-For)
+THROTTLE_TRUSTED_PROXIES = int(os.getenv('THROTTLE_TRUSTED_PROXIES', '1' if os.getenv('USE_PROXY', 'False') == 'True' else '0'))
+# Envois de fichiers traités simultanément (tous workers confondus) ; au-delà : 503
+UPLOAD_MAX_CONCURRENT = int(os.getenv('UPLOAD_MAX_CONCURRENT', '8'))
+
 # 🔄 Correction pour Django 4+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # settings.py
+# 📝 Journalisation : écriture déportée dans un thread (QueueListener),
+# fichiers JSON, journal des requêtes échantillonné. Les fichiers sont
+# partagés par les workers : la rotation (quotidienne, ou dès 50 Mo) est
+# faite par logrotate, configuré par institut/logrotate.conf
+LOG_DIR = Path(os.getenv('LOG_DIR', BASE_DIR / 'logs'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'handlers': {
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'logs/emails.log',
+    'formatters': {
+        'json': {
+            '()': 'institut.journalisation.JsonFormatter',
         },
+    },
+    'filters': {
+        'contexte': {
+            '()': 'institut.journalisation.ContexteRequeteFilter',
+        },
+        'echantillonnage': {
+            '()': 'institut.journalisation.EchantillonnageFilter',
+            'taux': os.getenv('LOG_REQUEST_SAMPLE_RATE', '1.0' if DEBUG else '0.1'),
+            'seuil_ms': os.getenv('LOG_SLOW_REQUEST_MS', '1000'),
+        },
+    },
+    'handlers': {
+        # Écriture effective (thread du QueueListener)
         'console': {
             'level': 'DEBUG',
             'class': 'logging.StreamHandler',
         },
+        'fichier_app': {
+            'class': 'institut.journalisation.FichierPartageHandler',
+            'filename': LOG_DIR / 'institut.log',
+            'formatter': 'json',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+        'fichier_mail': {
+            'class': 'institut.journalisation.FichierPartageHandler',
+            'filename': LOG_DIR / 'mail.log',
+            'formatter': 'json',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+        'fichier_requetes': {
+            'class': 'institut.journalisation.FichierPartageHandler',
+            'filename': LOG_DIR / 'requetes.log',
+            'formatter': 'json',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+        # Files d'attente (thread de la requête, sans entrée/sortie)
+        'file_app': {
+            '()': 'institut.journalisation.FileAsynchroneHandler',
+            'destination': 'journal.app',
+            'filters': ['contexte'],
+        },
+        'file_mail': {
+            '()': 'institut.journalisation.FileAsynchroneHandler',
+            'destination': 'journal.mail',
+            'filters': ['contexte'],
+        },
+        'file_requetes': {
+            '()': 'institut.journalisation.FileAsynchroneHandler',
+            'destination': 'journal.requetes',
+            'filters': ['echantillonnage', 'contexte'],
+        },
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['file_app'],
             'level': 'INFO',
-            'propagate': True,
+            'propagate': False,
+        },
+        'developpement': {
+            'handlers': ['file_app'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'administrateur': {
+            'handlers': ['file_app'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'institut': {
+            'handlers': ['file_app'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'institut.requetes': {
+            'handlers': ['file_requetes'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'institut.mail': {
+            'handlers': ['file_mail'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        # Destinations des QueueListener
+        'journal.app': {
+            'handlers': ['fichier_app', 'console'] if DEBUG else ['fichier_app'],
+            'propagate': False,
+        },
+        'journal.mail': {
+            'handlers': ['fichier_mail'],
+            'propagate': False,
+        },
+        'journal.requetes': {
+            'handlers': ['fichier_requetes'],
+            'propagate': False,
         },
     },
 }
@@ -5,8 +5,12 @@ from django.conf.urls.static import static
 from django.views.generic import RedirectView
 from django.http import HttpResponseRedirect
 
+from developpement.decorators import limiter_debit
+
 urlpatterns = [
-    # URL d'administration Django originale (gardée pour l'admin de base)
+    # URL d'administration Django originale (gardée pour l'admin de base) ;
+    # sa connexion partage les seaux de limitation des autres pages de connexion
+    path("admin/login/", limiter_debit("connexion", compte="username")(admin.site.login)),
     path("admin/", admin.site.urls),
     path("", include("developpement.urls")),
     # Redirection explicite de /admin/dashboard/ vers /administrateur/dashboard/